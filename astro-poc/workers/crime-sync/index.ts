@@ -110,8 +110,11 @@ const INSERT_SQL = `
   ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
 `;
 
+// FTS rowid = crimes rowid, so d1_export.py batch files can replace one story's
+// FTS row with a rowid lookup (story_id is UNINDEXED). Must run after the crimes insert.
 const INSERT_FTS_SQL = `
-  INSERT INTO crimes_fts(story_id, title, body, url) VALUES (?, ?, ?, ?)
+  INSERT OR REPLACE INTO crimes_fts(rowid, story_id, title, body, url)
+  VALUES ((SELECT rowid FROM crimes WHERE story_id = ?), ?, ?, ?, ?)
 `;
 
 async function syncCsvToD1(db: D1Database, csvUrl: string, year: string, country: 'trinidad' | 'jamaica' = 'trinidad'): Promise<number> {
@@ -210,7 +213,7 @@ async function syncCsvToD1(db: D1Database, csvUrl: string, year: string, country
       // FTS entry — title=headline, body=searchable metadata fields
       const ftsBody = [area, region, crimeType, street, summary].filter(Boolean).join(' ');
       const ftsUrl = `/${country}/crime/${slug}/`;
-      stmts.push(db.prepare(INSERT_FTS_SQL).bind(storyId, headline, ftsBody, ftsUrl));
+      stmts.push(db.prepare(INSERT_FTS_SQL).bind(storyId, storyId, headline, ftsBody, ftsUrl));
 
       upsertCount++;
     }
@@ -297,7 +300,7 @@ async function runJamaicaSync(db: D1Database): Promise<void> {
       );
 
       const ftsBody = [area, region, crimeType, street, summary].filter(Boolean).join(' ');
-      stmts.push(db.prepare(INSERT_FTS_SQL).bind(storyId, headline, ftsBody, `/jamaica/crime/${slug}/`));
+      stmts.push(db.prepare(INSERT_FTS_SQL).bind(storyId, storyId, headline, ftsBody, `/jamaica/crime/${slug}/`));
       upsertCount++;
     }
 
@@ -35,7 +35,8 @@ CREATE INDEX IF NOT EXISTS idx_old_slug ON crimes(old_slug);
 -- FTS5 virtual table for site search (/api/search endpoint)
 -- story_id and url are UNINDEXED (stored but not full-text searched)
 -- title = headline (weight 10 in bm25), body = area+region+crimeType+street+summary (weight 1)
--- Populated by sync worker on every full sync (DELETE all + re-insert)
+-- Populated by sync worker on every full sync (DELETE all + re-insert), rowid = crimes.rowid
+-- (docs/archive/automation-tools/local-tools/d1_export.py batch files rely on that)
 -- Run once to apply: wrangler d1 execute crime-hotspots-db --remote --command="CREATE VIRTUAL TABLE IF NOT EXISTS crimes_fts USING fts5(story_id UNINDEXED, title, body, url UNINDEXED)"
 CREATE VIRTUAL TABLE IF NOT EXISTS crimes_fts USING fts5(
   story_id UNINDEXED,
@@ -18,6 +18,24 @@ python archive-scraper.py --source all --output archive_review.csv
 python archive-scraper.py --source express --max-pages 50
 python archive-scraper.py --source guardian --start-date 2024-01-01 --end-date 2025-12-13
 python archive-scraper.py --cross-reference existing_urls.csv
+python archive-scraper.py --cross-reference production_mirror.db   # from sheet_mirror.py
+python archive-scraper.py --source guardian --format parquet --output guardian.parquet
+python archive-scraper.py --source newsday --discovery html --max-pages 20
+
+DISCOVERY:
+By default URLs are enumerated from each source's sitemaps / RSS feeds, filtered by
+--start-date/--end-date (see archive_discovery.py). Sources without a working feed
+fall back to HTML listing pages; --discovery html forces the old behaviour.
+
+OUTPUT:
+Results are streamed to disk as each page is scraped (see archive_output.py).
+Re-running with the same --output resumes the file and skips URLs already saved.
+
+TELEMETRY:
+Every request and page is measured (see crawl_telemetry.py); a per-source summary is
+printed at the end. --metrics crawl.json (or crawl.prom) saves the full histograms,
+--progress shows a live progress line. 429/403 spikes are flagged automatically
+and requests to a throttled host are slowed down until it recovers.
 """
 
 import requests
@@ -27,59 +45,207 @@ import re
 import time
 import argparse
 from datetime import datetime, timedelta
-from urllib.parse import urljoin
-import csv
+from urllib.parse import urlparse
+import os
 import sys
 
+from archive_discovery import FEEDS, FeedDiscovery
+from archive_output import open_result_writer, source_for_url
+from crawl_telemetry import CrawlTelemetry
+from link_extractor import ARTICLE_PATTERNS, response_links
+
 # Configuration
 CONFIG = {
     'TRINIDAD_EXPRESS': {
         'base_url': 'https://trinidadexpress.com/news/local/',
         'page_param': '?page=',
         'max_pages': 50,
-        'url_pattern': re.compile(r'https://trinidadexpress\.com/[^"\'\\s]+/article_[a-f0-9-]+\.html')
+        'url_pattern': re.compile(ARTICLE_PATTERNS['TRINIDAD_EXPRESS'])
     },
     'GUARDIAN': {
         'base_url': 'https://www.guardian.co.tt/archive/',
-        'url_pattern': re.compile(r'https://www\.guardian\.co\.tt/[^"\'\\s]+')
+        'url_pattern': re.compile(ARTICLE_PATTERNS['GUARDIAN'])
     },
     'NEWSDAY': {
         'base_url': 'https://newsday.co.tt/category/news/',
         'page_param': 'page/',
         'max_pages': 50,
-        'url_pattern': re.compile(r'https://newsday\.co\.tt/\d{4}/\d{2}/\d{2}/[^"\'\\s]+')
+        'url_pattern': re.compile(ARTICLE_PATTERNS['NEWSDAY'])
     }
 }
 
+# Parquet rows are only committed once a row group is full (see archive_output.py)
+PARQUET_ROW_GROUP_SIZE = 100
+
+# Retry policy for transient failures (each attempt is recorded in telemetry)
+MAX_RETRIES = 2
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF = 2.0   # seconds, doubled per attempt (Retry-After wins if larger)
+THROTTLED_DELAY_FACTOR = 4   # While telemetry flags a host as throttled, wait this many --delays per request
+
 # Crime keywords for simple scoring
 CRIME_KEYWORDS = ['murder', 'kill', 'shot', 'robbery', 'rape', 'assault', 'kidnap', 'theft', 'burglary', 'shooting', 'stabbing', 'crime', 'police', 'victim', 'arrested']
 NON_CRIME_KEYWORDS = ['minister', 'rowley', 'court', 'case collapse', 'venezuela', 'election', 'parliament', 'festival', 'carnival', 'sports', 'cricket']
 
 
 class ArchiveScraper:
-    def __init__(self, delay=1.0):
+    def __init__(self, delay=1.0, writer=None, score_urls=False, exclude_urls=None, telemetry=None):
         self.delay = delay
+        self.telemetry = telemetry or CrawlTelemetry()
+        self.writer = writer
+        self.score_urls = score_urls
+        self.exclude_urls = exclude_urls or set()
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         })
 
+    def _get(self, url, timeout=30, stream=False, **kwargs):
+        """
+        Single place every scraper request goes through: retries transient
+        failures and records host, status, bytes, TTFB and total time per attempt.
+        """
+        source = source_for_url(url)
+        host = urlparse(url).netloc
+        attempt = 0
+
+        while True:
+            if self.telemetry.is_throttled(host):
+                # Back off the whole host, not just the request that got the 429
+                time.sleep(max(self.delay, 1.0) * THROTTLED_DELAY_FACTOR)
+
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, timeout=timeout, stream=stream, **kwargs)
+            except requests.RequestException as e:
+                self.telemetry.record_request(source, host, None, 0, None, time.perf_counter() - start,
+                                              retries=attempt, error=type(e).__name__)
+                if attempt >= MAX_RETRIES:
+                    raise
+                attempt += 1
+                time.sleep(RETRY_BACKOFF * 2 ** (attempt - 1))
+                continue
+
+            # requests sets elapsed once headers are parsed, before the body is read.
+            # Status/TTFB are recorded now, so responses closed unread still count
+            ttfb = response.elapsed.total_seconds()
+            self.telemetry.record_response(source, host, response.status_code, ttfb, retries=attempt)
+            if stream:
+                self._track_stream(response, source, host, start)
+            else:
+                self.telemetry.record_body(source, host, len(response.content), time.perf_counter() - start)
+
+            if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                attempt += 1
+                backoff = RETRY_BACKOFF * 2 ** (attempt - 1)
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    backoff = max(backoff, min(int(retry_after), 120))
+                response.close()
+                time.sleep(backoff)
+                continue
+
+            return response
+
+    def _track_stream(self, response, source, host, start):
+        """Count bytes of a streamed body as it is consumed; record them when it is closed"""
+        iter_content = response.iter_content
+        close = response.close
+        telemetry = self.telemetry
+        state = {'bytes': 0, 'recorded': False}
+
+        def counted(chunk_size=1, decode_unicode=False):
+            for chunk in iter_content(chunk_size=chunk_size, decode_unicode=decode_unicode):
+                state['bytes'] += len(chunk)
+                yield chunk
+
+        def closing():
+            if not state['recorded']:
+                state['recorded'] = True
+                telemetry.record_body(source, host, state['bytes'], time.perf_counter() - start)
+            close()
+
+        response.iter_content = counted
+        response.close = closing
+
+    def emit(self, urls, published=None):
+        """Stream newly found URLs to the output writer (called once per scraped page)"""
+        if not self.writer:
+            return
+        published = published or {}
+
+        for url in urls:
+            if url in self.exclude_urls or url in self.writer.seen:
+                continue
+
+            # Optional: Fetch title and score
+            title = ""
+            score = ''
+            if self.score_urls:
+                title = self.fetch_title(url)
+                score = self.score_url(url, title)
+                time.sleep(1)
+
+            date = published.get(url)
+            notes = f"Published {date.strftime('%Y-%m-%d')}" if date else ''
+            self.writer.write(url, title=title, score=score, notes=notes)
+
+        self.writer.flush()
+
+    def discover_from_feeds(self, source_key, start_date, end_date):
+        """
+        Enumerate article URLs from the source's sitemaps / RSS feeds.
+
+        Returns:
+            List of URLs, or None if the source has no readable feed (use HTML fallback)
+        """
+        feeds = FEEDS.get(source_key)
+        if not feeds or not (feeds.get('sitemaps') or feeds.get('rss')):
+            return None
+
+        print(f"🗺️  Reading {source_key} sitemaps/RSS from {start_date.date()} to {end_date.date()}...")
+        source = source_for_url(CONFIG[source_key]['base_url'])
+
+        def on_batch(batch):
+            self.telemetry.record_page(source, None, len(batch))
+            self.emit(batch.keys(), published=batch)
+
+        discovery = FeedDiscovery(
+            self._get,
+            article_filter=lambda url: is_article_url(source_key, url),
+            delay=min(self.delay, 0.5)
+        )
+        found = discovery.discover(
+            feeds, start_date, end_date,
+            on_batch=on_batch
+        )
+        if found is None:
+            print(f"ℹ️  No readable feed for {source_key}, falling back to HTML pages")
+            return None
+
+        print(f"✅ {source_key}: {len(found)} URLs found via feeds")
+        return list(found)
+
     def scrape_trinidad_express(self, max_pages=50):
         """Scrape Trinidad Express archives (pagination-based)"""
         print(f"📰 Scraping Trinidad Express (up to {max_pages} pages)...")
         urls = set()
-        config = CONFIG['TRINIDAD_EXPRESS']
+        source_key = 'TRINIDAD_EXPRESS'
+        config = CONFIG[source_key]
+        source = source_for_url(config['base_url'])
 
         for page in range(1, max_pages + 1):
             try:
                 page_url = f"{config['base_url']}{config['page_param']}{page}"
-                response = self.session.get(page_url, timeout=30)
-                response.raise_for_status()
+                with self._get(page_url, stream=True) as response:
+                    response.raise_for_status()
 
-                # Extract URLs using regex
-                matches = config['url_pattern'].findall(response.text)
-                for url in matches:
-                    urls.add(url.strip('\'"'))
+                    # Stream article URLs out of the body as it downloads
+                    parse_start = time.process_time()
+                    page_urls = set(response_links(response, source_key))
+                    self.telemetry.record_page(source, time.process_time() - parse_start, len(page_urls - urls))
+                self.emit(page_urls - urls)
+                urls.update(page_urls)
 
                 if page % 10 == 0:
                     print(f"  Page {page}/{max_pages} - {len(urls)} URLs so far")
@@ -87,6 +253,7 @@ class ArchiveScraper:
                 time.sleep(self.delay)
 
             except Exception as e:
+                self.telemetry.record_error(source, e)
                 print(f"⚠️  Error scraping Trinidad Express page {page}: {e}")
 
         print(f"✅ Trinidad Express: {len(urls)} URLs found")
@@ -102,6 +269,7 @@ class ArchiveScraper:
         print(f"📰 Scraping Guardian TT from {start_date.date()} to {end_date.date()}...")
         urls = set()
         config = CONFIG['GUARDIAN']
+        source = source_for_url(config['base_url'])
 
         current_date = start_date
         while current_date <= end_date:
@@ -109,28 +277,29 @@ class ArchiveScraper:
                 date_str = current_date.strftime('%Y-%m-%d')
                 archive_url = f"{config['base_url']}{date_str}"
 
-                response = self.session.get(archive_url, timeout=30)
-                if response.status_code == 200:
-                    # Extract article URLs
-                    matches = config['url_pattern'].findall(response.text)
-                    for url in matches:
-                        clean_url = url.strip('\'"')
-                        # Only include article URLs, not category/archive pages
-                        if '/archive/' not in clean_url and '/category/' not in clean_url:
-                            urls.add(clean_url)
+                with self._get(archive_url, stream=True) as response:
+                    if response.status_code == 200:
+                        # Stream article URLs (the pattern already excludes archive/category/asset links)
+                        parse_start = time.process_time()
+                        page_urls = set(response_links(response, 'GUARDIAN'))
+                        self.telemetry.record_page(source, time.process_time() - parse_start,
+                                                   len(page_urls - urls))
+                        self.emit(page_urls - urls)
+                        urls.update(page_urls)
 
-                # Next day
-                current_date += timedelta(days=1)
+            except Exception as e:
+                # Dates without archives are expected (non-200s are counted by telemetry);
+                # exceptions are recorded so a bad run shows up in the report
+                self.telemetry.record_error(source, e)
 
-                # Log progress monthly
-                if current_date.day == 1:
-                    print(f"  {current_date.strftime('%Y-%m')} - {len(urls)} URLs so far")
+            # Next day (always advance — a failing date must not be retried forever)
+            current_date += timedelta(days=1)
 
-                time.sleep(0.5)
+            # Log progress monthly
+            if current_date.day == 1:
+                print(f"  {current_date.strftime('%Y-%m')} - {len(urls)} URLs so far")
 
-            except Exception as e:
-                # Silent fail for dates without archives
-                pass
+            time.sleep(0.5)
 
         print(f"✅ Guardian TT: {len(urls)} URLs found")
         return list(urls)
@@ -139,18 +308,22 @@ class ArchiveScraper:
         """Scrape Newsday archives (pagination-based)"""
         print(f"📰 Scraping Newsday (up to {max_pages} pages)...")
         urls = set()
-        config = CONFIG['NEWSDAY']
+        source_key = 'NEWSDAY'
+        config = CONFIG[source_key]
+        source = source_for_url(config['base_url'])
 
         for page in range(1, max_pages + 1):
             try:
                 page_url = f"{config['base_url']}{config['page_param']}{page}"
-                response = self.session.get(page_url, timeout=30)
-                response.raise_for_status()
+                with self._get(page_url, stream=True) as response:
+                    response.raise_for_status()
 
-                # Extract URLs using regex
-                matches = config['url_pattern'].findall(response.text)
-                for url in matches:
-                    urls.add(url.strip('\'"'))
+                    # Stream article URLs out of the body as it downloads
+                    parse_start = time.process_time()
+                    page_urls = set(response_links(response, source_key))
+                    self.telemetry.record_page(source, time.process_time() - parse_start, len(page_urls - urls))
+                self.emit(page_urls - urls)
+                urls.update(page_urls)
 
                 if page % 10 == 0:
                     print(f"  Page {page}/{max_pages} - {len(urls)} URLs so far")
@@ -158,6 +331,7 @@ class ArchiveScraper:
                 time.sleep(self.delay)
 
             except Exception as e:
+                self.telemetry.record_error(source, e)
                 print(f"⚠️  Error scraping Newsday page {page}: {e}")
 
         print(f"✅ Newsday: {len(urls)} URLs found")
@@ -181,7 +355,7 @@ class ArchiveScraper:
     def fetch_title(self, url):
         """Fetch article title for pre-filter scoring"""
         try:
-            response = self.session.get(url, timeout=10)
+            response = self._get(url, timeout=10)
             soup = BeautifulSoup(response.text, 'lxml')
             title_tag = soup.find('title')
             return title_tag.text.strip() if title_tag else ""
@@ -189,68 +363,37 @@ class ArchiveScraper:
             return ""
 
 
-def cross_reference_urls(scraped_urls, existing_csv):
-    """Cross-reference scraped URLs with existing CSV to find missing ones"""
-    print(f"🔍 Cross-referencing with {existing_csv}...")
+def is_article_url(source_key, url):
+    """True if url has the shape of an article for the given source (see link_extractor.py)"""
+    return CONFIG[source_key]['url_pattern'].fullmatch(url) is not None
+
+
+def load_existing_urls(existing_csv):
+    """Load the set of already-known URLs from an existing CSV (or sheet_mirror.py database)"""
+    print(f"🔍 Loading existing URLs from {existing_csv}...")
+
+    if existing_csv.endswith('.db'):
+        # Local Production mirror — no Sheets export needed
+        import sheet_mirror
+        if not os.path.exists(existing_csv):
+            # connect() would create an empty mirror and nothing would be excluded
+            print(f"❌ Mirror not found: {existing_csv} (run: python3 sheet_mirror.py sync)")
+            sys.exit(1)
+        existing_urls = sheet_mirror.known_urls(sheet_mirror.connect(existing_csv))
+        print(f"📊 Existing: {len(existing_urls)}")
+        return existing_urls
 
     try:
         existing_df = pd.read_csv(existing_csv)
         # Assuming URL column is named 'URL' or first column
         url_column = 'URL' if 'URL' in existing_df.columns else existing_df.columns[0]
         existing_urls = set(existing_df[url_column].dropna().str.strip())
-
-        missing_urls = [url for url in scraped_urls if url not in existing_urls]
-
-        print(f"📊 Total scraped: {len(scraped_urls)}")
         print(f"📊 Existing: {len(existing_urls)}")
-        print(f"🆕 Missing: {len(missing_urls)}")
-
-        return missing_urls
+        return existing_urls
 
     except Exception as e:
         print(f"⚠️  Error reading existing CSV: {e}")
-        return scraped_urls
-
-
-def save_to_csv(urls, output_file, score_urls=False, scraper=None):
-    """Save URLs to CSV for manual review"""
-    print(f"💾 Saving {len(urls)} URLs to {output_file}...")
-
-    data = []
-    for i, url in enumerate(urls):
-        # Determine source
-        if 'trinidadexpress.com' in url:
-            source = 'Trinidad Express'
-        elif 'guardian.co.tt' in url:
-            source = 'Guardian TT'
-        elif 'newsday.co.tt' in url:
-            source = 'Newsday'
-        else:
-            source = 'Unknown'
-
-        # Optional: Fetch title and score
-        title = ""
-        score = 0
-        if score_urls and scraper:
-            if (i + 1) % 10 == 0:
-                print(f"  Scoring URL {i + 1}/{len(urls)}...")
-            title = scraper.fetch_title(url)
-            score = scraper.score_url(url, title)
-            time.sleep(1)
-
-        data.append({
-            'URL': url,
-            'Source': source,
-            'Date Found': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'Status': 'Pending Review',
-            'Pre-filter Score': score if score_urls else '',
-            'Title': title,
-            'Notes': ''
-        })
-
-    df = pd.DataFrame(data)
-    df.to_csv(output_file, index=False)
-    print(f"✅ Saved to {output_file}")
+        return set()
 
 
 def main():
@@ -260,51 +403,79 @@ def main():
     parser.add_argument('--max-pages', type=int, default=50,
                         help='Maximum pages to scrape (for pagination-based sources)')
     parser.add_argument('--start-date', type=str,
-                        help='Start date for Guardian scraping (YYYY-MM-DD)')
+                        help='Start date for Guardian archives and sitemap/RSS discovery (YYYY-MM-DD)')
     parser.add_argument('--end-date', type=str,
-                        help='End date for Guardian scraping (YYYY-MM-DD)')
+                        help='End date for Guardian archives and sitemap/RSS discovery (YYYY-MM-DD)')
+    parser.add_argument('--discovery', choices=['feeds', 'html'], default='feeds',
+                        help='Enumerate URLs from sitemaps/RSS (falls back to HTML per source) or HTML pages only')
     parser.add_argument('--output', type=str, default='archive_review.csv',
-                        help='Output CSV file')
+                        help='Output file (CSV file, or dataset directory for --format parquet)')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv',
+                        help='Output format (parquet needs pyarrow; rows are committed in row groups of '
+                             f'{PARQUET_ROW_GROUP_SIZE}, so a crash loses at most the last unfinished group)')
+    parser.add_argument('--flush-every', type=int, default=50,
+                        help='Flush output to disk at least every N rows')
     parser.add_argument('--cross-reference', type=str,
-                        help='CSV file with existing URLs to cross-reference')
+                        help='CSV file (or sheet_mirror.py .db) with existing URLs to cross-reference')
     parser.add_argument('--score', action='store_true',
                         help='Fetch titles and calculate pre-filter scores (slower)')
     parser.add_argument('--delay', type=float, default=1.0,
                         help='Delay between requests in seconds')
+    parser.add_argument('--metrics', type=str,
+                        help='Write crawl telemetry to this file (.json, or .prom for Prometheus)')
+    parser.add_argument('--progress', action='store_true',
+                        help='Show a live progress line')
 
     args = parser.parse_args()
 
-    scraper = ArchiveScraper(delay=args.delay)
+    # Cross-reference set is loaded up front so results can be filtered as they stream
+    existing_urls = load_existing_urls(args.cross_reference) if args.cross_reference else set()
+
+    writer = open_result_writer(args.output, fmt=args.format, flush_every=args.flush_every,
+                                row_group_size=PARQUET_ROW_GROUP_SIZE)
+    telemetry = CrawlTelemetry(live=args.progress)
+    scraper = ArchiveScraper(delay=args.delay, writer=writer, score_urls=args.score,
+                             exclude_urls=existing_urls, telemetry=telemetry)
     all_urls = []
 
-    # Scrape sources
-    if args.source in ['express', 'all']:
-        urls = scraper.scrape_trinidad_express(max_pages=args.max_pages)
-        all_urls.extend(urls)
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d') if args.start_date else datetime(2024, 1, 1)
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d') if args.end_date else datetime.now()
 
-    if args.source in ['guardian', 'all']:
-        start_date = datetime.strptime(args.start_date, '%Y-%m-%d') if args.start_date else datetime(2024, 1, 1)
-        end_date = datetime.strptime(args.end_date, '%Y-%m-%d') if args.end_date else datetime.now()
-        urls = scraper.scrape_guardian(start_date=start_date, end_date=end_date)
-        all_urls.extend(urls)
+    # source arg -> (CONFIG key, HTML fallback)
+    sources = {
+        'express': ('TRINIDAD_EXPRESS', lambda: scraper.scrape_trinidad_express(max_pages=args.max_pages)),
+        'guardian': ('GUARDIAN', lambda: scraper.scrape_guardian(start_date=start_date, end_date=end_date)),
+        'newsday': ('NEWSDAY', lambda: scraper.scrape_newsday(max_pages=args.max_pages)),
+    }
 
-    if args.source in ['newsday', 'all']:
-        urls = scraper.scrape_newsday(max_pages=args.max_pages)
-        all_urls.extend(urls)
+    with writer:
+        # Scrape sources
+        for name, (source_key, scrape_html) in sources.items():
+            if args.source not in [name, 'all']:
+                continue
+
+            urls = None
+            if args.discovery == 'feeds':
+                urls = scraper.discover_from_feeds(source_key, start_date, end_date)
+            if urls is None:
+                urls = scrape_html()
+            all_urls.extend(urls)
 
     # Remove duplicates
-    all_urls = list(set(all_urls))
+    all_urls = set(all_urls)
     print(f"\n📊 Total unique URLs scraped: {len(all_urls)}")
 
-    # Cross-reference if provided
     if args.cross_reference:
-        all_urls = cross_reference_urls(all_urls, args.cross_reference)
+        print(f"🆕 Missing: {len(all_urls - existing_urls)}")
 
-    # Save to CSV
-    if all_urls:
-        save_to_csv(all_urls, args.output, score_urls=args.score, scraper=scraper if args.score else None)
+    if writer.rows_written:
+        print(f"✅ Saved {writer.rows_written} new URLs to {writer.output_file}")
     else:
-        print("ℹ️  No URLs to save")
+        print("ℹ️  No new URLs to save")
+
+    telemetry.print_summary()
+    if args.metrics:
+        telemetry.write_report(args.metrics)
 
 
 if __name__ == '__main__':
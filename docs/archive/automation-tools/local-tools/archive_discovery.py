@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Sitemap / RSS discovery backend for archive-scraper.py
+
+Enumerates article URLs from each source's sitemap index, dated sitemaps and RSS
+feeds instead of regex-scraping full HTML listing pages. Much less bandwidth, and
+every URL comes with a publish (or lastmod) date attached.
+
+XML is parsed incrementally (ElementTree.XMLPullParser fed chunk by chunk) so a
+50MB sitemap never has to sit in memory as one string.
+
+The parser works on any iterable of bytes chunks, so it can be exercised against
+XML fixtures (see tests/test_archive_discovery.py):
+
+    with open('tests/fixtures/newsday-post-sitemap.xml', 'rb') as f:
+        for kind, url, date in iter_feed_entries(iter(lambda: f.read(65536), b'')):
+            print(kind, url, date)
+"""
+
+import time
+import zlib
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from xml.etree import ElementTree as ET
+
+# Feed endpoints per source (keys match CONFIG in archive-scraper.py).
+# A source with no working feed falls back to HTML pagination.
+FEEDS = {
+    'TRINIDAD_EXPRESS': {
+        # BLOX CMS editorial sitemap index + the RSS search feed used by config.gs
+        'sitemaps': ['https://trinidadexpress.com/tncms/sitemap/editorial.xml'],
+        'rss': ['https://trinidadexpress.com/search/?f=rss&t=article&c=news&l=50&s=start_time&sd=desc'],
+    },
+    'GUARDIAN': {
+        # No RSS feed as of Feb 2026 (see google-apps-script/trinidad/config.gs)
+        'sitemaps': ['https://www.guardian.co.tt/sitemap.xml'],
+        'rss': [],
+    },
+    'NEWSDAY': {
+        # WordPress (Yoast) sitemap index -> post-sitemapN.xml
+        'sitemaps': ['https://newsday.co.tt/sitemap_index.xml'],
+        'rss': ['https://newsday.co.tt/feed/'],
+    },
+}
+
+CHUNK_SIZE = 64 * 1024
+MAX_SITEMAP_DEPTH = 3
+
+# Container elements we emit an entry for, and the child tags holding URL / date
+_ENTRY_TAGS = {
+    'sitemap': 'sitemap',   # <sitemapindex><sitemap><loc/><lastmod/></sitemap>
+    'url': 'url',           # <urlset><url><loc/><lastmod/><news:news>...</news:news></url>
+    'item': 'url',          # RSS 2.0 <item><link/><pubDate/></item>
+    'entry': 'url',         # Atom <entry><link href=""/><published/></entry>
+}
+_DATE_TAGS = ('publication_date', 'pubDate', 'published', 'date', 'lastmod', 'updated')
+
+
+def _local(tag):
+    """Strip the XML namespace from a tag: '{http://...}loc' -> 'loc'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_feed_date(text):
+    """Parse sitemap (W3C/ISO 8601) or RSS (RFC 822) dates to a naive datetime"""
+    if not text:
+        return None
+    text = text.strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(text)
+        except (TypeError, ValueError):
+            return None
+    return parsed.replace(tzinfo=None)
+
+
+def _entry_from_element(elem):
+    """Pull (url, date) out of a finished sitemap/RSS/Atom entry element"""
+    url = None
+    dates = {}
+    for child in elem.iter():
+        tag = _local(child.tag)
+        if tag == 'loc' and url is None:
+            url = (child.text or '').strip()
+        elif tag == 'link' and url is None:
+            # RSS puts the URL in the text, Atom in href
+            href = child.get('href')
+            if href and child.get('rel', 'alternate') == 'alternate':
+                url = href.strip()
+            elif child.text and child.text.strip():
+                url = child.text.strip()
+        elif tag in _DATE_TAGS and tag not in dates:
+            dates[tag] = child.text
+
+    date = None
+    for tag in _DATE_TAGS:
+        date = parse_feed_date(dates.get(tag))
+        if date:
+            break
+    return url, date
+
+
+def _drain(parser):
+    for _, elem in parser.read_events():
+        kind = _ENTRY_TAGS.get(_local(elem.tag))
+        if kind is None:
+            continue
+        url, date = _entry_from_element(elem)
+        # Free the subtree — keeps memory flat on very large sitemaps
+        elem.clear()
+        if url:
+            yield kind, url, date
+
+
+def iter_feed_entries(chunks):
+    """
+    Stream-parse a sitemap index, urlset, RSS or Atom document.
+
+    Args:
+        chunks: Iterable of bytes chunks (response.iter_content(), file reads, ...)
+
+    Yields:
+        (kind, url, date) — kind is 'sitemap' for child sitemaps, 'url' for articles
+    """
+    parser = ET.XMLPullParser(events=('end',))
+    for chunk in chunks:
+        if chunk:
+            parser.feed(chunk)
+            yield from _drain(parser)
+    parser.close()
+    yield from _drain(parser)
+
+
+def _gunzip_chunks(chunks):
+    """Decompress a .xml.gz sitemap on the fly"""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield decompressor.decompress(chunk)
+    yield decompressor.flush()
+
+
+class FeedDiscovery:
+    """Walks a source's sitemaps and RSS feeds, filtering entries by date range."""
+
+    def __init__(self, fetch, article_filter=None, delay=0.5):
+        """
+        Args:
+            fetch: Callable(url, stream=True) -> requests.Response (ArchiveScraper._get)
+            article_filter: Callable(url) -> bool, True for article URLs
+            delay: Seconds to wait between feed requests
+        """
+        self.fetch = fetch
+        self.article_filter = article_filter or (lambda url: True)
+        self.delay = delay
+
+    def _read_document(self, url):
+        """Fetch one XML document and yield its entries; None if it can't be fetched"""
+        try:
+            response = self.fetch(url, stream=True)
+        except Exception as e:
+            print(f"⚠️  Error fetching feed {url}: {e}")
+            return None
+        if response is None:
+            print(f"⚠️  Feed unavailable (no response): {url}")
+            return None
+        if response.status_code != 200:
+            # Release the pooled connection (and let telemetry record the attempt)
+            response.close()
+            print(f"⚠️  Feed unavailable ({response.status_code}): {url}")
+            return None
+
+        return self._entries(response, url)
+
+    @staticmethod
+    def _entries(response, url):
+        try:
+            chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+            if url.endswith('.gz'):
+                chunks = _gunzip_chunks(chunks)
+            yield from iter_feed_entries(chunks)
+        finally:
+            response.close()
+
+    def discover(self, feeds, start_date, end_date, on_batch=None):
+        """
+        Enumerate article URLs published between start_date and end_date.
+
+        Args:
+            feeds: Dict with 'sitemaps' and 'rss' URL lists (see FEEDS)
+            start_date / end_date: datetime range (inclusive, by day)
+            on_batch: Optional callable({url: date}) after each document, for streaming output
+
+        Returns:
+            Dict of url -> publish datetime (or None if the feed had no date),
+            or None if no feed document could be read (caller should fall back to HTML)
+        """
+        start_day = start_date.date()
+        end_day = end_date.date()
+        found = {}
+        documents_read = 0
+
+        # (url, depth) — sitemap indexes push their child sitemaps onto the queue
+        queue = [(url, 0) for url in feeds.get('sitemaps', []) + feeds.get('rss', [])]
+        visited = set()
+
+        while queue:
+            doc_url, depth = queue.pop(0)
+            if doc_url in visited:
+                continue
+            visited.add(doc_url)
+
+            entries = self._read_document(doc_url)
+            if entries is None:
+                continue
+
+            batch = {}
+            entry_count = 0
+            try:
+                for kind, url, date in entries:
+                    entry_count += 1
+                    if kind == 'sitemap':
+                        # lastmod on a child sitemap = its newest entry; skip whole
+                        # sitemaps that stopped changing before the range starts
+                        if date and date.date() < start_day:
+                            continue
+                        if depth < MAX_SITEMAP_DEPTH:
+                            queue.append((url, depth + 1))
+                        continue
+
+                    if date and not (start_day <= date.date() <= end_day):
+                        continue
+                    if url in found or not self.article_filter(url):
+                        continue
+                    found[url] = date
+                    batch[url] = date
+            except ET.ParseError as e:
+                print(f"⚠️  Malformed XML in {doc_url}: {e}")
+            except (zlib.error, OSError) as e:
+                # Bad .gz, or the connection dropped mid-stream (requests' errors are OSErrors);
+                # keep what was parsed so far and move on to the next document
+                print(f"⚠️  Error reading feed {doc_url}: {type(e).__name__}: {e}")
+
+            # Only a document that parsed as a feed counts — a 200 HTML error page
+            # must not stop the source from falling back to HTML pagination
+            if entry_count:
+                documents_read += 1
+            if batch and on_batch:
+                on_batch(batch)
+
+            time.sleep(self.delay)
+
+        if documents_read == 0:
+            return None
+        return found
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Streaming output writers for archive-scraper.py
+
+Rows are written as each source/page produces them instead of once at the end,
+so a crash at hour three of a Guardian crawl keeps everything found so far.
+
+Both writers keep the manual review schema:
+URL | Source | Date Found | Status | Pre-filter Score | Title | Notes
+
+- CSVResultWriter: append-mode CSV, flushed every page and every N rows.
+  Every row is written as one complete line, so the file is valid at any moment.
+- ParquetResultWriter: optional (needs pyarrow). Each row group is written as its
+  own closed part file inside a dataset directory, so pd.read_parquet(dir) works
+  on a partial crawl too. Rows reach disk a whole row group at a time, so a
+  crash loses at most row_group_size rows (smaller groups = more part files).
+"""
+
+import csv
+import io
+import os
+from datetime import datetime
+
+# Review CSV schema (shared with archive-scraper-playwright.js and archiveScraper.gs)
+OUTPUT_COLUMNS = ['URL', 'Source', 'Date Found', 'Status', 'Pre-filter Score', 'Title', 'Notes']
+
+DEFAULT_STATUS = 'Pending Review'
+
+
+def source_for_url(url):
+    """Map an article URL to its display source name"""
+    if 'trinidadexpress.com' in url:
+        return 'Trinidad Express'
+    elif 'guardian.co.tt' in url:
+        return 'Guardian TT'
+    elif 'newsday.co.tt' in url:
+        return 'Newsday'
+    return 'Unknown'
+
+
+class _ResultWriter:
+    """Shared row building / dedup logic for the streaming writers"""
+
+    def __init__(self, output_file, flush_every=50):
+        self.output_file = output_file
+        self.flush_every = max(1, flush_every)
+        self.rows_written = 0
+        self.seen = set()
+        self._pending = 0
+        self._stamp = self._now()
+
+    @staticmethod
+    def _now():
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def _build_row(self, url, title='', score='', notes=''):
+        # 'Date Found' is stamped per flush rather than per row (one clock call per page)
+        return [url, source_for_url(url), self._stamp, DEFAULT_STATUS, score, title, notes]
+
+    def write(self, url, title='', score='', notes=''):
+        """Write one result row. Returns False if the URL was already written."""
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self._write_row(self._build_row(url, title, score, notes))
+        self.rows_written += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+        return True
+
+    def flush(self):
+        """Push buffered rows to disk (call after every scraped page)"""
+        self._flush()
+        self._pending = 0
+        self._stamp = self._now()
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _write_row(self, row):
+        raise NotImplementedError
+
+    def _flush(self):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class CSVResultWriter(_ResultWriter):
+    """Append-mode CSV writer. Re-running with the same output file resumes it."""
+
+    def __init__(self, output_file, flush_every=50):
+        super().__init__(output_file, flush_every)
+
+        if os.path.exists(output_file):
+            self._drop_partial_row()
+        resume = os.path.exists(output_file) and os.path.getsize(output_file) > 0
+        if resume:
+            # Resume: skip URLs already in the file and don't repeat the header
+            with open(output_file, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if row.get('URL'):
+                        self.seen.add(row['URL'].strip())
+
+        self._file = open(output_file, 'a', newline='', encoding='utf-8')
+        self._line = io.StringIO()
+        self._csv = csv.writer(self._line)
+        if not resume:
+            self._write_line(OUTPUT_COLUMNS)
+            self._file.flush()
+        else:
+            print(f"↪️  Resuming {output_file} ({len(self.seen)} URLs already saved)")
+
+    def _drop_partial_row(self):
+        # A hard kill can leave a half-written last line. Cut the file back to the last
+        # complete row, so its truncated URL isn't taken as seen and the row is rewritten
+        with open(self.output_file, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if not size:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                block = f.read(end - start)
+                newline = block.rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    break
+                end = start
+            else:
+                f.truncate(0)   # Not even the header was complete
+        print(f"✂️  Dropped a partial last row from {self.output_file}")
+
+    def _write_line(self, row):
+        # Format the whole row first, then hand it to the file in a single write
+        self._line.seek(0)
+        self._line.truncate()
+        self._csv.writerow(row)
+        self._file.write(self._line.getvalue())
+
+    def _write_row(self, row):
+        self._write_line(row)
+
+    def _flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetResultWriter(_ResultWriter):
+    """
+    Parquet dataset writer. Rows are buffered and written one row group per part
+    file (part-00000.parquet, part-00001.parquet, ...) in the output directory.
+    """
+
+    def __init__(self, output_file, flush_every=50, row_group_size=500):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("❌ Parquet output needs pyarrow. Please run:")
+            print("   pip install pyarrow")
+            raise SystemExit(1)
+
+        super().__init__(output_file, flush_every)
+        self._pa = pa
+        self._pq = pq
+        self.row_group_size = max(1, row_group_size)
+        self._schema = pa.schema([(name, pa.string()) for name in OUTPUT_COLUMNS])
+        self._buffer = []
+
+        os.makedirs(output_file, exist_ok=True)
+        parts = sorted(p for p in os.listdir(output_file) if p.endswith('.parquet'))
+        self._part = len(parts)
+        if parts:
+            # Resume: skip URLs already written to earlier parts
+            for part in parts:
+                table = pq.read_table(os.path.join(output_file, part), columns=['URL'])
+                self.seen.update(table.column('URL').to_pylist())
+            print(f"↪️  Resuming {output_file} ({len(self.seen)} URLs already saved)")
+
+    def _write_row(self, row):
+        self._buffer.append(row)
+
+    def flush(self):
+        # Only close out a row group when it is full (or on close), so part files
+        # stay reasonably sized even though flush() is called every page
+        if len(self._buffer) >= self.row_group_size:
+            super().flush()
+        else:
+            self._stamp = self._now()
+
+    def close(self):
+        super().flush()
+        self._close()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        columns = list(zip(*self._buffer))
+        table = self._pa.table(
+            [self._pa.array([str(v) for v in col], type=self._pa.string()) for col in columns],
+            schema=self._schema
+        )
+        path = os.path.join(self.output_file, f"part-{self._part:05d}.parquet")
+        tmp_path = path + '.tmp'
+        self._pq.write_table(table, tmp_path)
+        # Atomic rename — readers never see a half-written part file
+        os.replace(tmp_path, path)
+        self._part += 1
+        self._buffer = []
+
+
+def open_result_writer(output_file, fmt='csv', flush_every=50, row_group_size=500):
+    """Create the streaming writer for the requested output format"""
+    if fmt == 'parquet':
+        if output_file.endswith('.csv'):
+            output_file = output_file[:-4] + '.parquet'
+        return ParquetResultWriter(output_file, flush_every=flush_every, row_group_size=row_group_size)
+    return CSVResultWriter(output_file, flush_every=flush_every)
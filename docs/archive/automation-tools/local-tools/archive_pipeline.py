@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Archive Backfill Pipeline - Approved URLs → LLM Extractor → Production
+
+Takes the manual review CSV produced by archive-scraper.py and feeds every row
+marked "Approved" through FBCrimeExtractor, so a backfill no longer means
+copy-pasting article bodies by hand.
+
+Stages (bounded queues between each, so memory stays flat on a 5,000-article backfill):
+1. Reader      - streams Approved rows from the review CSV
+2. Fetchers    - N threads download article HTML concurrently
+3. Extractors  - same threads strip boilerplate down to the article text
+4. LLM         - main thread runs FBCrimeExtractor.process_text one article at a time
+                 and writes to Production with the article URL in the URL column
+
+Usage:
+    python3 archive_pipeline.py archive_review.csv
+    python3 archive_pipeline.py archive_review.csv --workers 6 --limit 50
+
+Processed URLs are appended to <input>.done.txt; re-running skips them.
+"""
+
+import argparse
+import csv
+import os
+import queue
+import re
+import sys
+import threading
+import time
+
+try:
+    import requests
+    from lxml import html as lxml_html
+except ImportError:
+    print("❌ Missing dependencies. Please run:")
+    print("   pip3 install requests lxml")
+    sys.exit(1)
+
+try:
+    # Optional: better boilerplate removal when installed
+    import trafilatura
+except ImportError:
+    trafilatura = None
+
+from fb_crime_extractor import FBCrimeExtractor
+
+
+# Configuration
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+FETCH_TIMEOUT = 30
+MAX_ARTICLE_CHARS = 4000   # Keeps prompts bounded; crime facts are in the first paragraphs
+TEXT_QUEUE_SIZE = 8        # Articles waiting for the LLM (the slow stage)
+
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'iframe', 'figure']
+
+PUBLISHED_RE = re.compile(r'Published (\d{4}-\d{2}-\d{2})')
+
+_DONE = object()
+
+
+def extract_main_text(page_html):
+    """
+    Strip navigation/ads/comments and return the article headline + body text.
+
+    Uses trafilatura when installed, otherwise a paragraph-density heuristic:
+    the element whose direct <p> children hold the most text is the article body.
+
+    Args:
+        page_html: Raw page bytes (or str)
+
+    Returns:
+        Article text, truncated to MAX_ARTICLE_CHARS
+    """
+    if trafilatura is not None:
+        text = trafilatura.extract(page_html, include_comments=False, include_tables=False)
+        if text:
+            return text[:MAX_ARTICLE_CHARS]
+
+    try:
+        doc = lxml_html.fromstring(page_html)
+    except Exception:
+        return ''
+
+    for element in list(doc.iter(*BOILERPLATE_TAGS)):
+        if element.getparent() is not None:
+            element.drop_tree()
+
+    headline = ''
+    h1 = doc.find('.//h1')
+    if h1 is not None:
+        headline = h1.text_content().strip()
+
+    # Score each paragraph container by the text its paragraphs carry
+    scores = {}
+    for p in doc.iter('p'):
+        parent = p.getparent()
+        if parent is None:
+            continue
+        length = len(p.text_content().strip())
+        if length >= 40:
+            scores[parent] = scores.get(parent, 0) + length
+
+    if not scores:
+        return headline
+
+    body = max(scores, key=scores.get)
+    paragraphs = [p.text_content().strip() for p in body.iter('p')]
+    text = '\n\n'.join(p for p in paragraphs if p)
+    if headline and not text.startswith(headline):
+        text = f"{headline}\n\n{text}"
+    return text[:MAX_ARTICLE_CHARS]
+
+
+def read_approved_urls(review_csv, done_urls, limit=None):
+    """
+    Yield (url, published) for rows marked Approved in the review CSV (streamed, not loaded).
+
+    published is the 'Published YYYY-MM-DD' date archive-scraper.py notes for
+    sitemap/RSS finds, or None — it windows the near-duplicate check.
+    """
+    count = 0
+    with open(review_csv, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if (row.get('Status') or '').strip().lower() != 'approved':
+                continue
+            url = (row.get('URL') or '').strip()
+            if not url or url in done_urls:
+                continue
+            published = PUBLISHED_RE.search(row.get('Notes') or '')
+            yield url, published.group(1) if published else None
+            count += 1
+            if limit and count >= limit:
+                return
+
+
+class ArchivePipeline:
+    def __init__(self, extractor, workers=4, delay=0.5):
+        self.extractor = extractor
+        self.workers = workers
+        self.delay = delay
+        self.url_queue = queue.Queue(maxsize=workers * 2)
+        self.text_queue = queue.Queue(maxsize=TEXT_QUEUE_SIZE)
+        self._local = threading.local()
+        self.feed_error = None
+
+    def _session(self):
+        # requests.Session isn't thread-safe — one per fetch thread
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+            self._local.session.headers.update({'User-Agent': USER_AGENT})
+        return self._local.session
+
+    def _fetch_worker(self):
+        while True:
+            item = self.url_queue.get()
+            if item is _DONE:
+                self.text_queue.put(_DONE)
+                return
+            url, published = item
+            try:
+                response = self._session().get(url, timeout=FETCH_TIMEOUT)
+                response.raise_for_status()
+                # Raw bytes: lets the parser honour the page's own charset declaration
+                text = extract_main_text(response.content)
+                self.text_queue.put((url, published, text, None))
+            except Exception as e:
+                self.text_queue.put((url, published, None, str(e)))
+            time.sleep(self.delay)
+
+    def _feed_urls(self, urls):
+        try:
+            for item in urls:
+                self.url_queue.put(item)   # Blocks while fetchers are busy (back-pressure)
+        except Exception as e:
+            # Reading the review CSV failed part-way; finish what was queued
+            print(f"❌ Error reading URLs: {e}")
+            self.feed_error = e
+        finally:
+            # Always release the fetchers, or run() waits on text_queue forever
+            for _ in range(self.workers):
+                self.url_queue.put(_DONE)
+
+    def run(self, urls, done_file=None):
+        """
+        Run the pipeline over an iterable of (url, published date or None).
+
+        Returns:
+            Dictionary with processing stats
+        """
+        stats = {
+            'total': 0,
+            'fetch_errors': 0,
+            'empty': 0,
+            'processed': 0,
+            'written': 0,
+            'skipped': 0,
+            'merged': 0,
+            'errors': 0
+        }
+
+        threads = [threading.Thread(target=self._feed_urls, args=(urls,), daemon=True)]
+        threads += [threading.Thread(target=self._fetch_worker, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+
+        done_log = open(done_file, 'a', encoding='utf-8') if done_file else None
+        finished_workers = 0
+        try:
+            while finished_workers < self.workers:
+                item = self.text_queue.get()
+                if item is _DONE:
+                    finished_workers += 1
+                    continue
+
+                url, published, text, error = item
+                stats['total'] += 1
+                print(f"\n[{stats['total']}] {url[:80]}")
+
+                if error:
+                    print(f"⚠️  Fetch failed: {error}")
+                    stats['fetch_errors'] += 1
+                    continue
+                if not text or len(text) < 100:
+                    print("⚠️  No article text found, skipping")
+                    stats['empty'] += 1
+                    continue
+
+                # Duplicate check (same incident already in from Facebook or another
+                # paper?), extraction and the Production write with the article URL
+                status = self.extractor.process_text(text, url, when=published)['status']
+                if status in ('written', 'error'):
+                    stats['processed'] += 1
+                if status == 'error':
+                    stats['errors'] += 1
+                    continue
+                stats[status] += 1
+                if status == 'skipped':
+                    continue
+
+                if done_log:
+                    done_log.write(url + '\n')
+                    done_log.flush()
+        finally:
+            if done_log:
+                done_log.close()
+            self.extractor.incidents.save()
+
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Feed approved archive URLs through the LLM extractor')
+    parser.add_argument('review_csv', help='Review CSV from archive-scraper.py (Status = Approved rows are processed)')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Concurrent article fetchers')
+    parser.add_argument('--delay', type=float, default=0.5,
+                        help='Delay between requests per fetcher in seconds')
+    parser.add_argument('--limit', type=int,
+                        help='Process at most N approved URLs')
+    parser.add_argument('--done-file', type=str,
+                        help='Log of processed URLs (default: <review_csv>.done.txt)')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.review_csv):
+        print(f"❌ Review CSV not found: {args.review_csv}")
+        print("   Run archive-scraper.py first, then mark rows as Approved.")
+        sys.exit(1)
+
+    done_file = args.done_file or f"{args.review_csv}.done.txt"
+    done_urls = set()
+    if os.path.exists(done_file):
+        with open(done_file, encoding='utf-8') as f:
+            done_urls = {line.strip() for line in f if line.strip()}
+        print(f"↪️  Skipping {len(done_urls)} URLs already processed ({done_file})")
+
+    print("\n" + "=" * 60)
+    print("  Archive Backfill Pipeline - Approved URLs → Production")
+    print(f"  Boilerplate removal: {'trafilatura' if trafilatura else 'lxml paragraph density'}")
+    print("=" * 60)
+
+    extractor = FBCrimeExtractor()
+    pipeline = ArchivePipeline(extractor, workers=args.workers, delay=args.delay)
+
+    try:
+        urls = read_approved_urls(args.review_csv, done_urls, limit=args.limit)
+        stats = pipeline.run(urls, done_file=done_file)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Cancelled by user. Re-run to resume.")
+        sys.exit(0)
+
+    # Print summary
+    print("\n" + "=" * 60)
+    print("📊 Pipeline Complete!")
+    print("=" * 60)
+    print(f"Approved articles: {stats['total']}")
+    print(f"✅ Successfully processed: {stats['processed']}")
+    print(f"📝 Written to sheet: {stats['written']}")
+    print(f"⚠️  Skipped (extraction failed): {stats['skipped']}")
+    print(f"🔁 Merged (near-duplicates): {stats['merged']}")
+    print(f"⚠️  No article text: {stats['empty']}")
+    print(f"❌ Fetch errors: {stats['fetch_errors']}")
+    print(f"❌ Sheet errors: {stats['errors']}")
+    print("=" * 60)
+
+    if pipeline.feed_error:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
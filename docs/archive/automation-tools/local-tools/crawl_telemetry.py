@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Crawl telemetry for archive-scraper.py
+
+Records every request (host, status, bytes, TTFB, total time, retry count) and
+every parsed page (parse time, URLs yielded), aggregated into per-source and
+per-host histograms. At the end of a run the aggregate can be written as JSON
+or Prometheus text exposition format.
+
+Throttling is surfaced automatically: when 429/403 responses make up
+THROTTLE_RATIO of a host's last THROTTLE_WINDOW responses, a warning is printed
+(once per episode), the host is flagged in the report and is_throttled() is
+True until it recovers.
+
+Streamed responses are recorded in two halves: status, headers and TTFB when
+the response arrives (record_response), bytes and total time when the body is
+consumed or closed (record_body) — so error pages that are never read still
+count.
+"""
+
+import json
+import sys
+import time
+from collections import Counter, defaultdict, deque
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+BYTES_BUCKETS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 5_000_000)
+PARSE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1)
+URLS_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250)
+
+THROTTLE_STATUSES = (429, 403)
+THROTTLE_WINDOW = 20
+THROTTLE_RATIO = 0.3
+THROTTLE_MIN_SAMPLES = 5
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative buckets, Prometheus-style)"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot = +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        if value is None:
+            return
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket holding it"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return float('inf')
+
+    def to_dict(self):
+        cumulative, buckets = 0, {}
+        for bound, n in zip(list(self.buckets) + ['+Inf'], self.counts):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 4),
+            'mean': round(self.sum / self.count, 4) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': buckets,
+        }
+
+
+class _SourceStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.bytes = 0
+        self.pages = 0
+        self.urls = 0
+        self.status = Counter()
+        self.errors = Counter()
+        self.ttfb = Histogram(LATENCY_BUCKETS)
+        self.total_time = Histogram(LATENCY_BUCKETS)
+        self.response_bytes = Histogram(BYTES_BUCKETS)
+        self.parse_time = Histogram(PARSE_BUCKETS)
+        self.urls_per_page = Histogram(URLS_BUCKETS)
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'bytes': self.bytes,
+            'pages': self.pages,
+            'urls': self.urls,
+            'status': {str(k): v for k, v in sorted(self.status.items(), key=lambda kv: str(kv[0]))},
+            'errors': dict(self.errors),
+            'ttfb_seconds': self.ttfb.to_dict(),
+            'total_seconds': self.total_time.to_dict(),
+            'response_bytes': self.response_bytes.to_dict(),
+            'parse_seconds': self.parse_time.to_dict(),
+            'urls_per_page': self.urls_per_page.to_dict(),
+        }
+
+
+class CrawlTelemetry:
+    def __init__(self, live=False):
+        """
+        Args:
+            live: Print a single updating progress line to stderr
+        """
+        self.live = live
+        self.started = time.time()
+        self.sources = defaultdict(_SourceStats)
+        self.hosts = defaultdict(_SourceStats)
+        self._recent = defaultdict(lambda: deque(maxlen=THROTTLE_WINDOW))
+        self.throttled = {}   # host -> {'episodes': n, 'active': bool}
+
+    # ------------------------------------------------------------------ recording
+
+    def record_request(self, source, host, status, nbytes, ttfb, total, retries=0, error=None):
+        """One HTTP attempt. status is None when the request raised (error = exception name)."""
+        self.record_response(source, host, status, ttfb, retries=retries, error=error)
+        self.record_body(source, host, nbytes if status is not None else None, total)
+
+    def record_response(self, source, host, status, ttfb, retries=0, error=None):
+        """
+        First half of an attempt: the response headers arrived (or the request raised).
+        Streamed bodies are recorded with record_body() once consumed or closed.
+        """
+        for stats in (self.sources[source], self.hosts[host]):
+            stats.requests += 1
+            if retries:
+                stats.retries += 1
+            stats.status[status if status is not None else 'error'] += 1
+            if error:
+                stats.errors[error] += 1
+            stats.ttfb.observe(ttfb)
+
+        if status is not None:
+            self._check_throttling(host, status)
+
+    def record_body(self, source, host, nbytes, total):
+        """Second half of an attempt: body bytes read (None if no response) and total time"""
+        for stats in (self.sources[source], self.hosts[host]):
+            stats.bytes += nbytes or 0
+            stats.total_time.observe(total)
+            stats.response_bytes.observe(nbytes)
+
+    def record_page(self, source, parse_time, urls_yielded):
+        """One listing page / feed document parsed"""
+        stats = self.sources[source]
+        stats.pages += 1
+        stats.urls += urls_yielded
+        stats.parse_time.observe(parse_time)
+        stats.urls_per_page.observe(urls_yielded)
+        if self.live:
+            self._print_progress(source)
+
+    def record_error(self, source, error):
+        """An exception outside the HTTP layer (parsing, writing...)"""
+        self.sources[source].errors[type(error).__name__] += 1
+
+    def _check_throttling(self, host, status):
+        recent = self._recent[host]
+        recent.append(status)
+        if len(recent) < THROTTLE_MIN_SAMPLES:
+            return
+        ratio = sum(1 for s in recent if s in THROTTLE_STATUSES) / len(recent)
+        state = self.throttled.setdefault(host, {'episodes': 0, 'active': False})
+
+        if ratio >= THROTTLE_RATIO and not state['active']:
+            state['active'] = True
+            state['episodes'] += 1
+            codes = Counter(s for s in recent if s in THROTTLE_STATUSES)
+            detail = ', '.join(f"{n}x {code}" for code, n in codes.items())
+            print(f"\n🚦 Throttling detected on {host}: {detail} in last {len(recent)} responses "
+                  f"— backing off until it recovers", file=sys.stderr)
+        elif ratio < THROTTLE_RATIO / 2 and state['active']:
+            state['active'] = False
+            print(f"\n✅ {host} no longer throttling", file=sys.stderr)
+
+    def is_throttled(self, host):
+        """True while a host is in a throttling episode (the scraper slows down for it)"""
+        return self.throttled.get(host, {}).get('active', False)
+
+    # ------------------------------------------------------------------ output
+
+    def _print_progress(self, source):
+        stats = self.sources[source]
+        p50 = stats.total_time.quantile(0.5)
+        errors = sum(stats.errors.values())
+        line = (f"[{source}] pages {stats.pages} | requests {stats.requests} | URLs {stats.urls} | "
+                f"{stats.bytes / 1_000_000:.1f}MB | p50 {p50 if p50 is not None else '-'}s | errors {errors}")
+        sys.stderr.write('\r' + line.ljust(110))
+        sys.stderr.flush()
+
+    def report(self):
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'duration_seconds': round(time.time() - self.started, 1),
+            'sources': {name: stats.to_dict() for name, stats in self.sources.items()},
+            'hosts': {name: stats.to_dict() for name, stats in self.hosts.items()},
+            'throttled_hosts': {host: state['episodes'] for host, state in self.throttled.items()
+                                if state['episodes']},
+        }
+
+    def to_prometheus(self):
+        """Prometheus text exposition of the per-source metrics"""
+        lines = []
+
+        def counter(name, help_text, values):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, value in values:
+                lines.append(f"{name}{{{labels}}} {value}")
+
+        def histogram(name, help_text, attr):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for source, stats in self.sources.items():
+                h = getattr(stats, attr)
+                cumulative = 0
+                for bound, n in zip(list(h.buckets) + ['+Inf'], h.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{source="{source}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{source="{source}"}} {h.sum}')
+                lines.append(f'{name}_count{{source="{source}"}} {h.count}')
+
+        counter('scraper_requests_total', 'HTTP requests by source and status',
+                [(f'source="{src}",status="{status}"', n)
+                 for src, stats in self.sources.items() for status, n in stats.status.items()])
+        counter('scraper_retries_total', 'Retried HTTP requests',
+                [(f'source="{src}"', stats.retries) for src, stats in self.sources.items()])
+        counter('scraper_bytes_total', 'Response bytes received',
+                [(f'source="{src}"', stats.bytes) for src, stats in self.sources.items()])
+        counter('scraper_errors_total', 'Errors by type',
+                [(f'source="{src}",type="{err}"', n)
+                 for src, stats in self.sources.items() for err, n in stats.errors.items()])
+        counter('scraper_urls_total', 'Article URLs yielded',
+                [(f'source="{src}"', stats.urls) for src, stats in self.sources.items()])
+        counter('scraper_throttle_episodes_total', 'Throttling episodes (429/403 spikes)',
+                [(f'host="{host}"', state['episodes']) for host, state in self.throttled.items()])
+        histogram('scraper_ttfb_seconds', 'Time to first byte', 'ttfb')
+        histogram('scraper_request_seconds', 'Total request time', 'total_time')
+        histogram('scraper_response_bytes', 'Response size', 'response_bytes')
+        histogram('scraper_parse_seconds', 'Listing page parse time', 'parse_time')
+        histogram('scraper_urls_per_page', 'URLs yielded per page', 'urls_per_page')
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path):
+        """Write .prom (Prometheus text) or anything else as JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith('.prom'):
+                f.write(self.to_prometheus())
+            else:
+                json.dump(self.report(), f, indent=2)
+        print(f"📈 Crawl metrics saved to {path}")
+
+    def print_summary(self):
+        if self.live:
+            sys.stderr.write('\n')
+        print("\n📈 Crawl telemetry:")
+        for source, stats in self.sources.items():
+            p50, p95 = stats.total_time.quantile(0.5), stats.total_time.quantile(0.95)
+            ttfb = stats.ttfb.quantile(0.5)
+            errors = sum(stats.errors.values())
+            print(f"  {source}: {stats.requests} requests ({stats.retries} retries), "
+                  f"{stats.bytes / 1_000_000:.1f}MB, {stats.pages} pages, {stats.urls} URLs")
+            print(f"    latency p50 ≤{p50}s p95 ≤{p95}s (TTFB p50 ≤{ttfb}s), "
+                  f"parse mean {stats.parse_time.to_dict()['mean']}s, errors {errors}")
+            non_ok = {k: v for k, v in stats.status.items() if k != 200}
+            if non_ok:
+                print(f"    non-200: {dict(non_ok)}")
+        for host, state in self.throttled.items():
+            if state['episodes']:
+                print(f"  🚦 {host} throttled {state['episodes']}x")
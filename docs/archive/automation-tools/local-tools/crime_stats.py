@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Crime Statistics Engine - NumPy, columnar
+
+Loads Production rows (from the sheet_mirror.py database or a CSV export) into
+columnar NumPy arrays and computes, in vectorized passes:
+- crime counts per region, per area and per crime type
+- the same counts over rolling 7/30/90-day windows, plus trailing daily series
+- weighted regional risk scores and their share of the national total
+
+Counting rules match the site (see .memory L009 / D003 / L007):
+- "All crimes" = primary crime type + each related crime type, per row
+- Murder is the exception: the primary counts victimCount (double murder = 2)
+- Related crime types count +1 per occurrence — repeats are intentional, never deduplicated
+- Risk score = primary weight × victimCount (victim-count types only) + Σ related weights
+
+Usage:
+    python3 crime_stats.py                          # from production_mirror.db
+    python3 crime_stats.py --csv production.csv
+    python3 crime_stats.py --json stats.json        # precompute for the site
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+try:
+    import numpy as np
+except ImportError:
+    print("❌ Missing dependencies. Please run:")
+    print("   pip3 install numpy")
+    sys.exit(1)
+
+import sheet_mirror
+
+
+# Severity weights — mirror of CRIME_TYPES in astro-poc/src/config/crimeSchema.ts (keep in sync)
+CRIME_SEVERITY = {
+    'Murder': 10,
+    'Attempted Murder': 9,
+    'Kidnapping': 8,
+    'Sexual Assault': 7,
+    'Shooting': 6,
+    'Assault': 5,
+    'Home Invasion': 5,
+    'Carjacking': 5,
+    'Arson': 4,
+    'Robbery': 4,
+    'Domestic Violence': 4,
+    'Extortion': 3,
+    'Fraud': 3,
+    'Burglary': 3,
+    'Theft': 2,
+    'Seizures': 1,
+}
+
+# useVictimCount: true — mirror of astro-poc/src/config/crimeTypeConfig.ts (risk scoring)
+VICTIM_COUNT_TYPES = {
+    'Murder', 'Attempted Murder', 'Assault', 'Sexual Assault', 'Kidnapping',
+    'Robbery', 'Shooting', 'Carjacking', 'Domestic Violence',
+}
+
+# "All crimes" counting: only murder multiplies by victim count (L009)
+COUNT_BY_VICTIM_TYPES = {'Murder'}
+
+# Region share of national weighted score → label (astro-poc/src/config/riskWeights.ts)
+RISK_LABELS = [(3, 'Low'), (8, 'Medium'), (15, 'Concerning'), (25, 'High'), (40, 'Dangerous')]
+
+WINDOWS = (7, 30, 90)
+NO_DAY = -1
+
+
+def risk_label(share_pct):
+    for limit, label in RISK_LABELS:
+        if share_pct < limit:
+            return label
+    return 'Extremely Dangerous'
+
+
+def _parse_day(value):
+    if not value:
+        return NO_DAY
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y'):
+        try:
+            return datetime.strptime(value.strip(), fmt).toordinal()
+        except ValueError:
+            continue
+    return NO_DAY
+
+
+def _victim_count(value):
+    """NULL/blank/invalid victim count defaults to 1 (2025 rows have none)"""
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return 1
+    return n if n > 0 else 1
+
+
+class _Labels:
+    """String → small int code, so grouping is a bincount instead of a dict walk"""
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+
+    def code(self, name):
+        name = (name or '').strip() or 'Unknown'
+        if name not in self._codes:
+            self._codes[name] = len(self.names)
+            self.names.append(name)
+        return self._codes[name]
+
+    def __len__(self):
+        return len(self.names)
+
+
+class CrimeStats:
+    """
+    Columnar view of Production.
+
+    Each row expands into "events" — one for the primary crime type and one per
+    related crime type occurrence. All aggregations are bincounts over event arrays.
+    """
+
+    def __init__(self, rows):
+        """
+        Args:
+            rows: Iterable of dicts with date, crime_type, related_crime_types,
+                  victim_count, area, region (sheet_mirror column names)
+        """
+        self.regions = _Labels()
+        self.areas = _Labels()
+        self.types = _Labels()
+
+        ev_row, ev_type, ev_count, ev_risk_mult = [], [], [], []
+        row_day, row_region, row_area = [], [], []
+
+        for i, row in enumerate(rows):
+            row_day.append(_parse_day(row.get('date')))
+            row_region.append(self.regions.code(row.get('region')))
+            row_area.append(self.areas.code(row.get('area')))
+
+            primary = (row.get('crime_type') or '').strip()
+            if primary:
+                victims = _victim_count(row.get('victim_count'))
+                ev_row.append(i)
+                ev_type.append(self.types.code(primary))
+                ev_count.append(victims if primary in COUNT_BY_VICTIM_TYPES else 1)
+                ev_risk_mult.append(victims if primary in VICTIM_COUNT_TYPES else 1)
+
+            for related in (row.get('related_crime_types') or '').split(','):
+                related = related.strip()
+                if related:
+                    ev_row.append(i)
+                    ev_type.append(self.types.code(related))
+                    ev_count.append(1)
+                    ev_risk_mult.append(1)
+
+        self.num_rows = len(row_day)
+        self.row_day = np.array(row_day, dtype=np.int64)
+        self.row_region = np.array(row_region, dtype=np.int32)
+        self.row_area = np.array(row_area, dtype=np.int32)
+
+        ev_row = np.array(ev_row, dtype=np.int64)
+        self.ev_type = np.array(ev_type, dtype=np.int32)
+        self.ev_count = np.array(ev_count, dtype=np.float64)
+        weights = np.array([CRIME_SEVERITY.get(name, 1) for name in self.types.names], dtype=np.float64)
+        self.ev_risk = weights[self.ev_type] * np.array(ev_risk_mult, dtype=np.float64)
+        # Denormalise row columns onto events once; every query below is a mask + bincount
+        self.ev_day = self.row_day[ev_row] if len(ev_row) else np.zeros(0, dtype=np.int64)
+        self.ev_region = self.row_region[ev_row] if len(ev_row) else np.zeros(0, dtype=np.int32)
+        self.ev_area = self.row_area[ev_row] if len(ev_row) else np.zeros(0, dtype=np.int32)
+
+    # ------------------------------------------------------------------ loading
+
+    @classmethod
+    def from_mirror(cls, db_path=sheet_mirror.DB_FILE):
+        conn = sheet_mirror.connect(db_path)
+        cursor = conn.execute(
+            "SELECT date, crime_type, related_crime_types, victim_count, area, region FROM production")
+        return cls(dict(r) for r in cursor)
+
+    @classmethod
+    def from_csv(cls, csv_path):
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            mapping = sheet_mirror.column_map(header)
+
+            def rows():
+                for values in reader:
+                    yield {name: values[i] if i < len(values) else ''
+                           for name, i in mapping.items()}
+            return cls(rows())
+
+    # ------------------------------------------------------------------ queries
+
+    @property
+    def latest_day(self):
+        valid = self.row_day[self.row_day != NO_DAY]
+        return int(valid.max()) if len(valid) else date.today().toordinal()
+
+    def _mask(self, window=None, as_of=None):
+        if window is None:
+            return slice(None)
+        end = as_of if as_of is not None else self.latest_day
+        return (self.ev_day > end - window) & (self.ev_day <= end)
+
+    @staticmethod
+    def _named(labels, values):
+        out = {labels.names[i]: (int(v) if float(v).is_integer() else float(v))
+               for i, v in enumerate(values) if v}
+        return dict(sorted(out.items(), key=lambda kv: kv[1], reverse=True))
+
+    def counts(self, by, window=None, as_of=None):
+        """Crime counts grouped by 'region', 'area' or 'crime_type' (optionally last N days)"""
+        mask = self._mask(window, as_of)
+        keys, labels = {
+            'region': (self.ev_region, self.regions),
+            'area': (self.ev_area, self.areas),
+            'crime_type': (self.ev_type, self.types),
+        }[by]
+        totals = np.bincount(keys[mask], weights=self.ev_count[mask], minlength=len(labels))
+        return self._named(labels, totals)
+
+    def total(self, window=None, as_of=None):
+        return int(self.ev_count[self._mask(window, as_of)].sum())
+
+    def region_risk(self, window=None, as_of=None):
+        """Weighted risk score, national share and label per region (Unknown excluded)"""
+        mask = self._mask(window, as_of)
+        scores = np.bincount(self.ev_region[mask], weights=self.ev_risk[mask], minlength=len(self.regions))
+        if 'Unknown' in self.regions.names:
+            scores[self.regions.names.index('Unknown')] = 0
+        national = scores.sum()
+        shares = scores / national * 100 if national else np.zeros_like(scores)
+
+        result = {}
+        for i in np.argsort(-scores):
+            if not scores[i]:
+                continue
+            result[self.regions.names[i]] = {
+                'score': float(scores[i]),
+                'share': round(float(shares[i]), 2),
+                'label': risk_label(shares[i]),
+            }
+        return result
+
+    def rolling(self, window, days=365):
+        """Trailing N-day national crime totals for each of the last `days` days"""
+        end = self.latest_day
+        start = end - days - window + 1
+        valid = (self.ev_day >= start) & (self.ev_day <= end)
+        daily = np.bincount(self.ev_day[valid] - start, weights=self.ev_count[valid],
+                            minlength=end - start + 1)
+        cumulative = np.concatenate(([0.0], np.cumsum(daily)))
+        trailing = cumulative[window:] - cumulative[:-window]
+        first = date.fromordinal(start + window - 1)
+        return {(first + timedelta(days=i)).isoformat(): int(v) for i, v in enumerate(trailing)}
+
+    def summary(self):
+        """Everything the site needs, as a JSON-serialisable dict"""
+        as_of = self.latest_day
+        return {
+            'as_of': date.fromordinal(as_of).isoformat(),
+            'rows': self.num_rows,
+            'total': self.total(),
+            'by_region': self.counts('region'),
+            'by_area': self.counts('area'),
+            'by_crime_type': self.counts('crime_type'),
+            'region_risk': self.region_risk(),
+            'windows': {
+                str(w): {
+                    'total': self.total(w, as_of),
+                    'by_region': self.counts('region', w, as_of),
+                    'by_area': self.counts('area', w, as_of),
+                    'by_crime_type': self.counts('crime_type', w, as_of),
+                    'region_risk': self.region_risk(w, as_of),
+                } for w in WINDOWS
+            },
+            'rolling': {str(w): self.rolling(w) for w in WINDOWS},
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vectorized crime statistics over Production rows')
+    parser.add_argument('--db', default=sheet_mirror.DB_FILE, help='sheet_mirror.py database')
+    parser.add_argument('--csv', help='Read a Production CSV export instead of the mirror')
+    parser.add_argument('--json', help='Write the full statistics summary to this JSON file')
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = CrimeStats.from_csv(args.csv) if args.csv else CrimeStats.from_mirror(args.db)
+    loaded = time.perf_counter()
+    summary = stats.summary()
+    computed = time.perf_counter()
+
+    print(f"\n📊 {summary['rows']} rows → {summary['total']} crimes (as of {summary['as_of']})")
+    print(f"⏱️  Load {(loaded - start) * 1000:.1f}ms, full recompute {(computed - loaded) * 1000:.1f}ms")
+
+    for w in WINDOWS:
+        print(f"   Last {w} days: {summary['windows'][str(w)]['total']} crimes")
+
+    print("\n🗺️  Regional risk:")
+    for region, risk in list(summary['region_risk'].items())[:10]:
+        print(f"   {region}: {risk['share']}% ({risk['label']})")
+
+    print("\n🔪 By crime type:")
+    for crime_type, count in summary['by_crime_type'].items():
+        print(f"   {crime_type}: {count}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
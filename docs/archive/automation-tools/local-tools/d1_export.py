@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+D1 Export - crimes + crimes_fts as a local SQLite file and wrangler SQL batches
+
+The site reads the D1 `crimes` table and the `crimes_fts` FTS5 index. Until now
+data only reached them through Sheets → published CSV → crime-sync worker, which
+lags by hours and rebuilds crimes_fts from scratch (DELETE all + re-insert).
+
+This writes the same two tables (schema mirrors astro-poc/workers/crime-sync/schema.sql,
+rows/slugs/FTS text mirror index.ts — keep in sync) into a D1-compatible SQLite file,
+straight from:
+- the sheet mirror (sheet_mirror.py)  → d1_export.py mirror, or sheet_mirror.py sync --d1
+- the extractor (fb_crime_extractor.py, D1_EXPORT_FILE) → one row per written crime
+
+Loads are incremental per story_id: each row is checksummed, unchanged rows are
+skipped, and a changed row replaces its crimes row and only its own FTS row.
+Bulk loads run as one transaction with executemany() over prepared statements.
+
+Changed rows are exported as chunked SQL files for:
+    wrangler d1 execute crime-hotspots-db --remote --file=d1_batches/batch_0001.sql
+
+On D1 a story's crimes_fts row has rowid = its crimes rowid (crime-sync inserts
+it that way), so the batch files find it with a rowid lookup; story_id is
+UNINDEXED in crimes_fts and `WHERE story_id = ...` would scan the whole index.
+FTS rows written by a crime-sync older than that are realigned by its next full
+sync — let one run before applying batch files.
+
+Extractor rows have no sheet story_id yet, so they get a provisional one
+(<year>-x<hash>) and stay local: they are searchable in this file but never
+written to the SQL batches (crime-sync skips rows without a story_id too, and a
+provisional slug would disappear from the live site later). When the mirror
+exports the same URL with its real story_id, the provisional row is replaced.
+Mirror rows without a story_id are skipped, as crime-sync does.
+
+Crimes rows are replaced whole (INSERT OR REPLACE, like crime-sync), so every
+column — including date_published / date_updated — comes from the mirror.
+
+Usage:
+    python3 d1_export.py mirror                    # production_mirror.db → crimes_d1.db
+    python3 d1_export.py batches --out d1_batches  # changed rows → wrangler SQL files
+    python3 d1_export.py stats
+    python3 d1_export.py --benchmark 10000
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from archive_output import source_for_url
+import sheet_mirror
+
+# Configuration
+DB_FILE = 'crimes_d1.db'
+BATCH_DIR = 'd1_batches'
+D1_DATABASE = 'crime-hotspots-db'
+COUNTRY = 'trinidad'
+CHUNK_ROWS = 2000          # Rows per executemany() round inside the load transaction
+BATCH_FILE_ROWS = 250      # Crimes per SQL batch file (3 statements each)
+
+# Mirror of astro-poc/workers/crime-sync/schema.sql (keep in sync)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS crimes (
+  story_id            TEXT PRIMARY KEY,
+  date                TEXT NOT NULL,
+  headline            TEXT NOT NULL,
+  summary             TEXT,
+  crime_type          TEXT,
+  primary_crime_type  TEXT,
+  related_crime_types TEXT,
+  victim_count        INTEGER,
+  street              TEXT,
+  area                TEXT,
+  region              TEXT,
+  url                 TEXT,
+  source              TEXT,
+  latitude            REAL,
+  longitude           REAL,
+  date_published      TEXT,
+  date_updated        TEXT,
+  slug                TEXT,
+  old_slug            TEXT,
+  year                INTEGER NOT NULL,
+  month               INTEGER NOT NULL,
+  day                 INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_year     ON crimes(year);
+CREATE INDEX IF NOT EXISTS idx_area     ON crimes(area);
+CREATE INDEX IF NOT EXISTS idx_region   ON crimes(region);
+CREATE INDEX IF NOT EXISTS idx_slug     ON crimes(slug);
+CREATE INDEX IF NOT EXISTS idx_old_slug ON crimes(old_slug);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS crimes_fts USING fts5(
+  story_id UNINDEXED,
+  title,
+  body,
+  url UNINDEXED
+);
+"""
+
+# Local bookkeeping only — never part of the SQL batches sent to D1
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS export_state (
+  story_id    TEXT PRIMARY KEY,
+  checksum    TEXT NOT NULL,
+  fts_rowid   INTEGER,
+  url         TEXT,
+  provisional INTEGER NOT NULL DEFAULT 0,
+  dirty       INTEGER NOT NULL DEFAULT 1,   -- changed since the last SQL batch export
+  deleted     INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_export_state_url ON export_state(url);
+CREATE INDEX IF NOT EXISTS idx_export_state_dirty ON export_state(dirty);
+"""
+
+CRIME_COLUMNS = [
+    'story_id', 'date', 'headline', 'summary', 'crime_type', 'primary_crime_type',
+    'related_crime_types', 'victim_count', 'street', 'area', 'region', 'url', 'source',
+    'latitude', 'longitude', 'date_published', 'date_updated', 'slug', 'old_slug',
+    'year', 'month', 'day',
+]
+
+INSERT_SQL = (f"INSERT OR REPLACE INTO crimes ({', '.join(CRIME_COLUMNS)}) "
+              f"VALUES ({', '.join('?' * len(CRIME_COLUMNS))})")
+INSERT_FTS_SQL = "INSERT INTO crimes_fts(rowid, story_id, title, body, url) VALUES (?, ?, ?, ?, ?)"
+DELETE_FTS_SQL = "DELETE FROM crimes_fts WHERE rowid = ?"
+STATE_SQL = ("INSERT OR REPLACE INTO export_state (story_id, checksum, fts_rowid, url, provisional, dirty, deleted) "
+             "VALUES (?, ?, ?, ?, ?, 1, 0)")
+
+
+# ============================================================================
+# ROW BUILDING (mirrors workers/crime-sync/index.ts)
+# ============================================================================
+
+def generate_slug(headline, day):
+    """Old date-suffixed slug: headline-text-YYYY-MM-DD"""
+    text = re.sub(r'[^a-z0-9]+', '-', headline.lower()).strip('-')[:80]
+    return f"{text}-{day.strftime('%Y-%m-%d')}"
+
+
+def generate_slug_with_id(raw_id, headline):
+    """Public slug: <raw story id>-<first six headline words>"""
+    words = re.sub(r'[^a-z0-9\s]+', ' ', headline.lower()).split()[:6]
+    return f"{raw_id}-{'-'.join(words)}"
+
+
+def _parse_date(value):
+    value = (value or '').strip()
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y'):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _text(value):
+    value = '' if value is None else str(value).strip()
+    return None if value.lower() in ('', 'null', 'none') else value
+
+
+def crime_record(fields, raw_id, year=None, country=COUNTRY):
+    """
+    Build the crimes row and FTS row for one crime.
+
+    Args:
+        fields: Dict with date, headline and optional summary, crime_type,
+                related_crime_types, victim_count, street, area, region, url,
+                source, latitude, longitude, date_published, date_updated
+        raw_id: Sheet story_id (or provisional id)
+        year: Story-id year prefix (the sheet's year); defaults to the crime's year
+
+    Returns:
+        (story_id, crimes tuple, fts tuple without rowid), or None if date/headline missing
+    """
+    headline = _text(fields.get('headline'))
+    day = _parse_date(fields.get('date'))
+    if not headline or day is None or not raw_id:
+        return None
+
+    story_id = f"{year or day.year}-{raw_id}"
+    slug = generate_slug_with_id(raw_id, headline)
+    crime_type = _text(fields.get('crime_type'))
+    summary = _text(fields.get('summary'))
+    street, area, region = (_text(fields.get(k)) for k in ('street', 'area', 'region'))
+
+    victim_count = fields.get('victim_count')
+    try:
+        victim_count = int(victim_count) if victim_count not in (None, '') else None
+        if victim_count is not None and victim_count < 0:
+            victim_count = None
+    except (TypeError, ValueError):
+        victim_count = None
+
+    record = (
+        story_id, day.strftime('%Y-%m-%d'), headline, summary, crime_type, crime_type,
+        _text(fields.get('related_crime_types')), victim_count, street, area, region,
+        _text(fields.get('url')), _text(fields.get('source')),
+        fields.get('latitude'), fields.get('longitude'),
+        _text(fields.get('date_published')), _text(fields.get('date_updated')),
+        slug, generate_slug(headline, day), day.year, day.month, day.day,
+    )
+    body = ' '.join(v for v in (area, region, crime_type, street, summary) if v)
+    fts = (story_id, headline, body, f"/{country}/crime/{slug}/")
+    return story_id, record, fts
+
+
+def records_from_mirror(mirror_conn, year=None):
+    """crime_record() for every Production row in the sheet mirror that has a story_id"""
+    year = year or datetime.now().year
+    cursor = mirror_conn.execute(
+        "SELECT story_id, date, headline, summary, crime_type, related_crime_types, victim_count, "
+        "street, area, region, url, source, latitude, longitude, date_published, date_updated "
+        "FROM production ORDER BY row_number")
+    for row in cursor:
+        fields = dict(row)
+        raw_id = _text(fields.pop('story_id'))
+        if raw_id is None:
+            # Sheet hasn't assigned an id yet — crime-sync skips these too
+            continue
+        built = crime_record(fields, raw_id, year)
+        if built:
+            yield built + (False,)
+
+
+def provisional_id(fields):
+    key = _text(fields.get('url')) or f"{fields.get('headline')}|{fields.get('date')}"
+    return 'x' + hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]
+
+
+def record_from_extraction(crime_data, url=''):
+    """crime_record() for one fb_crime_extractor.py result (provisional story_id)"""
+    fields = {
+        'date': crime_data.get('date'),
+        'headline': crime_data.get('headline'),
+        'summary': crime_data.get('summary'),
+        'crime_type': crime_data.get('crimeType'),
+        'street': crime_data.get('street'),
+        'area': crime_data.get('area'),
+        'region': crime_data.get('region'),
+        'url': url,
+        'source': ('Facebook' if 'facebook.com' in url or 'fb.watch' in url
+                   else source_for_url(url)) if url else None,
+    }
+    built = crime_record(fields, provisional_id(fields))
+    return built + (True,) if built else None
+
+
+def _sql(value):
+    """SQL literal for the wrangler batch files"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _checksum(record, fts):
+    return hashlib.sha1(repr((record, fts)).encode('utf-8')).hexdigest()[:16]
+
+
+# ============================================================================
+# EXPORT DATABASE
+# ============================================================================
+
+class D1Export:
+    def __init__(self, db_path=DB_FILE):
+        self.db_path = db_path
+        # The extractor daemon opens this in the main thread and writes from its worker thread
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA + STATE_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _delete(self, story_ids):
+        rows = []
+        for story_id in story_ids:
+            row = self.conn.execute("SELECT fts_rowid FROM export_state WHERE story_id = ?", (story_id,)).fetchone()
+            if row:
+                rows.append((story_id, row[0]))
+        self.conn.executemany("DELETE FROM crimes WHERE story_id = ?", [(s,) for s, _ in rows])
+        self.conn.executemany(DELETE_FTS_SQL, [(r,) for _, r in rows if r is not None])
+        self.conn.executemany(
+            "UPDATE export_state SET deleted = 1, dirty = 1, fts_rowid = NULL WHERE story_id = ?",
+            [(s,) for s, _ in rows])
+        return len(rows)
+
+    def upsert(self, records):
+        """
+        Incrementally load (story_id, crimes tuple, fts tuple, provisional) records.
+
+        One transaction for the whole load; executemany() per CHUNK_ROWS.
+
+        Returns:
+            Dict with inserted / updated / unchanged / replaced / skipped counts
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'replaced': 0, 'skipped': 0}
+        with self.conn:
+            next_rowid = self.conn.execute("SELECT COALESCE(MAX(rowid), 0) + 1 FROM crimes_fts").fetchone()[0]
+            has_provisional = self.conn.execute(
+                "SELECT 1 FROM export_state WHERE provisional = 1 AND deleted = 0 LIMIT 1").fetchone()
+
+            chunk = []
+            for item in records:
+                chunk.append(item)
+                if len(chunk) >= CHUNK_ROWS:
+                    next_rowid = self._upsert_chunk(chunk, next_rowid, has_provisional, counts)
+                    chunk = []
+            if chunk:
+                self._upsert_chunk(chunk, next_rowid, has_provisional, counts)
+        return counts
+
+    def _upsert_chunk(self, chunk, next_rowid, has_provisional, counts):
+        ids = list({item[0] for item in chunk})
+        existing = {}
+        for i in range(0, len(ids), 500):
+            part = ids[i:i + 500]
+            existing.update((row[0], row[1:]) for row in self.conn.execute(
+                f"SELECT story_id, checksum, fts_rowid, deleted FROM export_state "
+                f"WHERE story_id IN ({', '.join('?' * len(part))})", part))
+
+        crimes, fts_rows, fts_deletes, states, replaced = [], [], [], [], []
+        for story_id, record, fts, provisional in chunk:
+            checksum = _checksum(record, fts)
+            previous = existing.get(story_id)
+            if previous and previous[0] == checksum and not previous[2]:
+                counts['unchanged'] += 1
+                continue
+
+            url = record[CRIME_COLUMNS.index('url')]
+            if url:
+                if provisional and self.conn.execute(
+                        "SELECT 1 FROM export_state WHERE url = ? AND provisional = 0 AND deleted = 0",
+                        (url,)).fetchone():
+                    counts['skipped'] += 1   # Already exported under its real story_id
+                    continue
+                if not provisional and has_provisional:
+                    replaced += [r[0] for r in self.conn.execute(
+                        "SELECT story_id FROM export_state WHERE url = ? AND provisional = 1 AND deleted = 0",
+                        (url,)) if r[0] != story_id]
+
+            if previous and previous[1] is not None:
+                fts_deletes.append((previous[1],))
+            crimes.append(record)
+            fts_rows.append((next_rowid,) + fts)
+            states.append((story_id, checksum, next_rowid, url, int(provisional)))
+            existing[story_id] = (checksum, next_rowid, 0)   # Repeated id later in the chunk
+            next_rowid += 1
+            counts['updated' if previous and not previous[2] else 'inserted'] += 1
+
+        if replaced:
+            counts['replaced'] += self._delete(replaced)
+        self.conn.executemany(DELETE_FTS_SQL, fts_deletes)
+        self.conn.executemany(INSERT_SQL, crimes)
+        self.conn.executemany(INSERT_FTS_SQL, fts_rows)
+        self.conn.executemany(STATE_SQL, states)
+        return next_rowid
+
+    def add_extracted(self, crime_data, url=''):
+        """Extractor sink: export one written crime. Returns its story_id (None if undated)."""
+        built = record_from_extraction(crime_data, url)
+        if built is None:
+            return None
+        self.upsert([built])
+        return built[0]
+
+    def sync_from_mirror(self, mirror_conn, year=None, prune=True):
+        """Load every mirror row; with prune, drop this year's rows no longer in the sheet"""
+        year = year or datetime.now().year
+        seen = set()
+
+        def tracked():
+            for item in records_from_mirror(mirror_conn, year):
+                seen.add(item[0])
+                yield item
+
+        counts = self.upsert(tracked())
+        counts['deleted'] = 0
+        if prune:
+            stale = [r[0] for r in self.conn.execute(
+                "SELECT story_id FROM export_state WHERE deleted = 0 AND provisional = 0 AND story_id LIKE ?",
+                (f"{year}-%",)) if r[0] not in seen]
+            with self.conn:
+                counts['deleted'] = self._delete(stale)
+        return counts
+
+    # ------------------------------------------------------------------ SQL batches
+
+    def write_batches(self, out_dir=BATCH_DIR, rows_per_file=BATCH_FILE_ROWS):
+        """
+        Write every changed story_id since the last call as wrangler-ready SQL files.
+
+        D1 rejects BEGIN/COMMIT in --file imports, so each file is a plain list of
+        statements: drop the story's FTS row (by the crimes rowid, before INSERT OR
+        REPLACE gives the crimes row a new one), upsert the crimes row, insert the
+        FTS row under the new rowid. Provisional (extractor) rows are local only
+        and never exported.
+
+        Returns:
+            List of file paths written
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        existing = [n for n in os.listdir(out_dir) if re.match(r'batch_\d+\.sql$', n)]
+        number = max((int(n[6:-4]) for n in existing), default=0)
+
+        cursor = self.conn.execute(
+            f"SELECT s.story_id, s.deleted, {', '.join('c.' + c for c in CRIME_COLUMNS)}, "
+            f"f.title, f.body, f.url "
+            f"FROM export_state s LEFT JOIN crimes c ON c.story_id = s.story_id "
+            f"LEFT JOIN crimes_fts f ON f.rowid = s.fts_rowid "
+            f"WHERE s.dirty = 1 AND s.provisional = 0 ORDER BY s.story_id")
+
+        paths, lines, rows = [], [], 0
+
+        def flush():
+            nonlocal number, lines, rows
+            number += 1
+            path = os.path.join(out_dir, f"batch_{number:04d}.sql")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(f"-- wrangler d1 execute {D1_DATABASE} --remote --file={path}\n")
+                f.write('\n'.join(lines) + '\n')
+            paths.append(path)
+            lines, rows = [], 0
+
+        for row in cursor:
+            story_id, deleted = _sql(row[0]), row[1]
+            record, fts = row[2:2 + len(CRIME_COLUMNS)], row[2 + len(CRIME_COLUMNS):]
+            # Remote FTS rowids are D1's crimes rowids, not this file's fts_rowid
+            crimes_rowid = f"(SELECT rowid FROM crimes WHERE story_id = {story_id})"
+            lines.append(f"DELETE FROM crimes_fts WHERE rowid = {crimes_rowid} AND story_id = {story_id};")
+            if deleted:
+                lines.append(f"DELETE FROM crimes WHERE story_id = {story_id};")
+            else:
+                lines.append(f"INSERT OR REPLACE INTO crimes ({', '.join(CRIME_COLUMNS)}) "
+                             f"VALUES ({', '.join(_sql(v) for v in record)});")
+                lines.append(f"INSERT OR REPLACE INTO crimes_fts(rowid, story_id, title, body, url) "
+                             f"VALUES ({crimes_rowid}, {story_id}, {', '.join(_sql(v) for v in fts)});")
+            rows += 1
+            if rows >= rows_per_file:
+                flush()
+        if lines:
+            flush()
+
+        with self.conn:
+            self.conn.execute("DELETE FROM export_state WHERE dirty = 1 AND deleted = 1")
+            self.conn.execute("UPDATE export_state SET dirty = 0 WHERE dirty = 1")
+        return paths
+
+    def stats(self):
+        count = lambda sql: self.conn.execute(sql).fetchone()[0]
+        return {
+            'crimes': count("SELECT COUNT(*) FROM crimes"),
+            'fts_rows': count("SELECT COUNT(*) FROM crimes_fts"),
+            'provisional': count("SELECT COUNT(*) FROM export_state WHERE provisional = 1 AND deleted = 0"),
+            'pending_export': count("SELECT COUNT(*) FROM export_state WHERE dirty = 1 AND provisional = 0"),
+        }
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def _synthetic_rows(n, seed=0):
+    import random
+    rng = random.Random(seed)
+    areas = [('Laventille', 'Port of Spain'), ('Arima', 'Arima'), ('Chaguanas', 'Chaguanas'),
+             ('Couva', 'Couva-Tabaquite-Talparo'), ('Morvant', 'San Juan-Laventille'),
+             ('Point Fortin', 'Point Fortin'), ('Scarborough', 'Tobago')]
+    types = ['Murder', 'Robbery', 'Shooting', 'Theft', 'Home Invasion', 'Assault', 'Seizures']
+    for i in range(1, n + 1):
+        area, region = rng.choice(areas)
+        crime_type = rng.choice(types)
+        fields = {
+            'date': f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'headline': f"{crime_type} reported in {area} near {rng.choice(['main road', 'bar', 'school', 'junction'])} {i}",
+            'summary': f"Police are investigating a {crime_type.lower()} in {area}. " * rng.randint(1, 4),
+            'crime_type': crime_type,
+            'related_crime_types': rng.choice(['', 'Robbery', 'Shooting,Robbery']),
+            'victim_count': rng.randint(1, 3),
+            'street': f"{rng.randint(1, 99)} Main Street",
+            'area': area,
+            'region': region,
+            'url': f"https://www.facebook.com/example/posts/{i}",
+            'source': 'Facebook',
+            'latitude': 10.5 + rng.random() / 10,
+            'longitude': -61.3 + rng.random() / 10,
+        }
+        yield crime_record(fields, str(i), 2026) + (False,)
+
+
+def _naive_load(db_path, items):
+    """Old pattern for comparison: one statement + commit per row, FTS delete by story_id"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    for story_id, record, fts, _ in items:
+        conn.execute(INSERT_SQL, record)
+        conn.execute("DELETE FROM crimes_fts WHERE story_id = ?", (story_id,))
+        conn.execute("INSERT INTO crimes_fts(story_id, title, body, url) VALUES (?, ?, ?, ?)", fts)
+        conn.commit()
+    conn.close()
+
+
+def benchmark(n):
+    tmp = tempfile.mkdtemp(prefix='d1_bench_')
+    try:
+        rows = list(_synthetic_rows(n))
+        export = D1Export(os.path.join(tmp, 'bench.db'))
+
+        def timed(label, fn, count):
+            start = time.perf_counter()
+            result = fn()
+            elapsed = time.perf_counter() - start
+            print(f"   {label:<38} {count:>7} rows  {elapsed:7.3f}s  {count / elapsed:>10,.0f} rows/sec")
+            return result
+
+        print(f"\n⏱️  D1 export benchmark ({n} rows, SQLite {sqlite3.sqlite_version})")
+        timed("Initial load (1 transaction)", lambda: export.upsert(rows), n)
+        files = timed("SQL batch files", lambda: export.write_batches(os.path.join(tmp, 'batches')), n)
+        timed("Re-load, nothing changed", lambda: export.upsert(rows), n)
+
+        changed = list(_synthetic_rows(n, seed=1))[::10]
+        changed = [(sid, rec[:3] + ('Updated summary',) + rec[4:], fts, prov)
+                   for sid, rec, fts, prov in changed]
+        counts = timed("Re-load, 10% of rows changed", lambda: export.upsert(changed), len(changed))
+
+        naive_n = min(n, 1000)
+        timed("Row-at-a-time + commit (old pattern)",
+              lambda: _naive_load(os.path.join(tmp, 'naive.db'), rows[:naive_n]), naive_n)
+
+        stats = export.stats()
+        hits = export.conn.execute("SELECT COUNT(*) FROM crimes_fts WHERE crimes_fts MATCH 'laventille'").fetchone()[0]
+        print(f"\n   {stats['crimes']} crimes, {stats['fts_rows']} FTS rows, {len(files)} batch files, "
+              f"{counts['updated']} updated in place, FTS 'laventille' → {hits} hits")
+        export.close()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def print_stats(export):
+    stats = export.stats()
+    print(f"\n📊 {export.db_path}: {stats['crimes']} crimes, {stats['fts_rows']} FTS rows, "
+          f"{stats['provisional']} provisional (local only), {stats['pending_export']} pending SQL export")
+
+
+def export_mirror(db_path=DB_FILE, mirror_db=sheet_mirror.DB_FILE, year=None, prune=True):
+    """Load the sheet mirror into the D1 export file (used by sheet_mirror.py sync --d1)"""
+    export = D1Export(db_path)
+    start = time.perf_counter()
+    counts = export.sync_from_mirror(sheet_mirror.connect(mirror_db), year=year, prune=prune)
+    elapsed = time.perf_counter() - start
+    print(f"✅ D1 export: {counts['inserted']} new, {counts['updated']} updated, "
+          f"{counts['unchanged']} unchanged, {counts['deleted']} deleted, "
+          f"{counts['replaced']} provisional replaced ({elapsed:.2f}s)")
+    return export
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export crimes + crimes_fts for Cloudflare D1')
+    parser.add_argument('command', nargs='?', choices=['mirror', 'batches', 'stats'])
+    parser.add_argument('--db', default=DB_FILE, help='D1 export SQLite file')
+    parser.add_argument('--mirror-db', default=sheet_mirror.DB_FILE, help='sheet_mirror.py database')
+    parser.add_argument('--year', type=int, help='Sheet year used as story_id prefix (default: current year)')
+    parser.add_argument('--no-prune', action='store_true',
+                        help="mirror: keep this year's rows that are no longer in the sheet")
+    parser.add_argument('--out', default=BATCH_DIR, help='batches: output directory')
+    parser.add_argument('--rows-per-file', type=int, default=BATCH_FILE_ROWS)
+    parser.add_argument('--benchmark', type=int, metavar='N', help='Benchmark loading N synthetic rows')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    if not args.command:
+        parser.error('a command (mirror, batches, stats) or --benchmark N is required')
+
+    if args.command == 'mirror':
+        if not os.path.exists(args.mirror_db):
+            print(f"❌ Mirror not found: {args.mirror_db} (run: python3 sheet_mirror.py sync)")
+            sys.exit(1)
+        export = export_mirror(args.db, args.mirror_db, args.year, prune=not args.no_prune)
+    else:
+        export = D1Export(args.db)
+
+    if args.command == 'batches':
+        paths = export.write_batches(args.out, args.rows_per_file)
+        if paths:
+            print(f"✅ {len(paths)} SQL batch files in {args.out}/ — apply in order with:")
+            print(f"   for f in {args.out}/batch_*.sql; do wrangler d1 execute {D1_DATABASE} --remote --file=$f; done")
+        else:
+            print("ℹ️  Nothing changed since the last export")
+
+    print_stats(export)
+    export.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Extraction prompts for fb_crime_extractor.py
+
+EXTRACTION_PROMPT is the original monolithic prompt: every headline pattern,
+every date rule and all three summary tiers, whatever the post is about. On CPU
+the prompt tokens dominate the cost of each call, so build_prompt() assembles
+the same rules from blocks and only sends the ones a post needs, picked by a
+cheap local pre-classification (classify_post):
+
+- licence plate / stolen vehicle   → vehicle-theft headline block
+- named person                     → named-victim headline + victim details blocks
+- neither                          → unnamed-victim headline block
+- numeric / text / relative dates  → matching date conversion rules
+- post length                      → one summary tier (short / medium / detailed)
+
+The crime type, location and general rules are always sent.
+prompt_report.py compares both prompts on the sample posts.
+"""
+
+import json
+import re
+
+# Ollama options shared by every extraction call
+LLM_OPTIONS = {
+    'temperature': 0.1,  # Low temperature for consistent extraction
+    'num_predict': 500   # Limit response length
+}
+
+# Summary tier by post length (characters, URL already stripped)
+SHORT_POST_CHARS = 200
+MEDIUM_POST_CHARS = 450
+
+# Extraction prompt optimized for SEO-friendly headlines (monolithic, kept for comparison)
+EXTRACTION_PROMPT = """You are a crime data analyst for Trinidad & Tobago. Extract structured information from this Facebook post.
+
+IMPORTANT: All posts provided are confirmed crime stories from trusted sources (Ian Alleyne Network, DJ Sheriff). Process EVERY post as a crime incident.
+
+Facebook Post:
+{post_text}
+
+Extract the following information and return ONLY valid JSON (no markdown, no code blocks):
+
+{{
+  "crimeType": "Murder" | "Robbery" | "Shooting" | "Assault" | "Home Invasion" | "Sexual Assault" | "Kidnapping" | "Theft" | "Seizures",
+  "headline": "SEO-friendly headline (see rules below)",
+  "victims": "<name(s) and age(s) if mentioned, or null>",
+  "street": "<specific street name or null>",
+  "area": "<neighborhood/area name>",
+  "region": "<one of: Port of Spain, San Fernando, Arima, Chaguanas, Point Fortin, Princes Town, Sangre Grande, Penal-Debe, Couva-Tabaquite-Talparo, Tunapuna-Piarco, Diego Martin, Siparia, Mayaro-Rio Claro, Tobago, or null>",
+  "date": "<M/D/YYYY format if date mentioned in post, or null if not specified>",
+  "summary": "<REQUIRED: 2-3 informative sentences about the incident, MUST be provided even for short posts>"
+}}
+
+CRITICAL RULES:
+
+1. HEADLINE GENERATION (SEO-optimized, STRICTLY FACTUAL):
+   - Pattern varies by crime type:
+
+   FOR VEHICLE THEFTS:
+     * Pattern: "[Vehicle type] [License plate] stolen from [Street], [Area]"
+     * Examples:
+       - "Nissan Tida Hatchback PCK 5839 stolen from Jackson St., Curepe"
+       - "White Toyota Fielder PDZ 6479 stolen from Belmont area"
+       - "Honda City stolen from Princes Town"
+     * Always include license plate if mentioned
+     * Keep location concise: "Jackson St., Curepe" NOT "Curepe Jackson St. Curepe"
+     * NO repetition of area name
+     * NO gender/ownership assumptions (NO "man's car")
+
+   FOR CRIMES WITH NAMED VICTIMS:
+     * Pattern: "[Location descriptor] [Victim name (age)] [action verb] [crime context]"
+     * Examples:
+       - "Central man Luke Rampersad (25) escapes abductors after being beaten"
+       - "Preacher David Charles beaten and robbed by fake passenger along Priority Bus Route"
+     * Include victim name and age in parentheses if known
+
+   FOR CRIMES WITHOUT NAMED VICTIMS:
+     * Pattern: "[Occupation/descriptor] [action verb] in [Area]"
+     * Examples:
+       - "Taxi driver robbed in Santa Cruz"
+       - "Man shot dead in Laventille"
+
+   GENERAL RULES:
+   - Use ACTIVE voice and descriptive verbs
+   - Keep under 100 characters
+   - NO clickbait - be factual and descriptive
+   - NO ASSUMPTIONS about gender, ownership, or details not in post
+   - Avoid repetition (don't say location twice)
+
+2. DATE EXTRACTION (CRITICAL - Trinidad uses dd/mm/yyyy format):
+   - Trinidad posts use dd/mm/yyyy format (e.g., "6/12/25" = December 6, 2025)
+   - CONVERT to mm/dd/yyyy format for the sheet
+   - Examples:
+     * "6/12/25" → "12/6/2025" (December 6, 2025)
+     * "7/12/25" → "12/7/2025" (December 7, 2025)
+     * "15/01/25" → "1/15/2025" (January 15, 2025)
+   - Also handle text dates: "Tuesday, December 2nd, 2025" → "12/2/2025"
+   - Handle relative dates: "yesterday", "last Tuesday", "this morning"
+   - If NO date in post → return null (do NOT use today's date)
+
+3. CRIME TYPE CLASSIFICATION:
+   - ALL posts are crime stories - select the most appropriate crime type
+   - Use "Seizures" for police seizures of guns, drugs, contraband (recovery operations)
+   - Use "Theft" for stealing without victim present (vehicle theft, burglary when no one home)
+   - Use "Robbery" for stealing with victim present or armed theft
+   - Use "Home Invasion" for break-ins where people were home
+   - Use "Kidnapping" for abductions
+   - Use "Assault" for physical attacks without theft
+   - Use "Shooting" for gun violence incidents where victim survived
+   - Use "Murder" for killings/homicides
+
+4. LOCATION DETAILS:
+   - Street: Specific street name, landmark, or business (e.g., "Priority Bus Route", "Charlotte Street", "KFC Arima")
+   - Area: Neighborhood/district (e.g., "Mt. Hope", "Port of Spain", "Diego Martin")
+   - Region: Match to one of Trinidad's 14 regions or Tobago
+
+5. VICTIM DETAILS:
+   - Extract full name if mentioned
+   - Extract age if mentioned
+   - Format: "Name (age)" or just "Name" if age unknown
+   - NO ASSUMPTIONS about gender or identity if not explicitly stated
+
+6. SUMMARY GENERATION (REQUIRED - MUST ALWAYS PROVIDE):
+   - CRITICAL: Summary field is REQUIRED and cannot be empty or null
+   - Write 1-3 natural, factual sentences about the incident
+   - Include ALL key details from the post (license plate, date, time, location, suspects, amounts)
+
+   FOR VERY SHORT POSTS (vehicle thefts with minimal info):
+   - One cohesive sentence with key facts
+   - Example: "A Nissan Tida Hatchback, license plate PCK 5839, was reported stolen from Jackson St. in Curepe on December 8, 2025."
+   - Include vehicle type, license plate, location, date
+
+   FOR MEDIUM POSTS (some details):
+   - 2 sentences: Main facts + additional context
+   - Example: "A white Toyota Fielder, license plate PDZ 6479, was stolen from the Belmont area on Saturday night, December 6, 2025. No details about suspects were provided."
+
+   FOR DETAILED POSTS (full information):
+   - 2-3 sentences: Incident + Suspect description + Outcome
+   - Example: "A taxi driver was robbed of $1,050 TTD around 9:15am on Sunday, December 7, 2025. The suspect, described as a man of African descent with dark complexion, slim build, and kinky afro hairstyle, boarded the taxi on 1st Street, San Juan and asked to be taken to Santa Cruz. He placed an object on the driver's neck during the robbery and fled on Orange Field Road."
+
+   NO ASSUMPTIONS OR SPECULATION:
+   - DON'T say: "The victim's car was stolen"
+   - DO say: "A Nissan Tida Hatchback was stolen"
+   - Write naturally but stick to facts
+   - If details limited: Write one simple sentence with what's known
+
+Return ONLY the JSON object, nothing else."""
+
+
+# ---------------------------------------------------------------------------
+# Rule blocks (same wording as EXTRACTION_PROMPT, split so they can be selected)
+# ---------------------------------------------------------------------------
+
+PROMPT_HEADER = EXTRACTION_PROMPT[:EXTRACTION_PROMPT.index('CRITICAL RULES:')] + 'CRITICAL RULES:'
+
+HEADLINE_INTRO = """HEADLINE GENERATION (SEO-optimized, STRICTLY FACTUAL):
+   - Pattern varies by crime type:"""
+
+HEADLINE_VEHICLE = """   FOR VEHICLE THEFTS:
+     * Pattern: "[Vehicle type] [License plate] stolen from [Street], [Area]"
+     * Examples:
+       - "Nissan Tida Hatchback PCK 5839 stolen from Jackson St., Curepe"
+       - "White Toyota Fielder PDZ 6479 stolen from Belmont area"
+       - "Honda City stolen from Princes Town"
+     * Always include license plate if mentioned
+     * Keep location concise: "Jackson St., Curepe" NOT "Curepe Jackson St. Curepe"
+     * NO repetition of area name
+     * NO gender/ownership assumptions (NO "man's car")"""
+
+HEADLINE_NAMED = """   FOR CRIMES WITH NAMED VICTIMS:
+     * Pattern: "[Location descriptor] [Victim name (age)] [action verb] [crime context]"
+     * Examples:
+       - "Central man Luke Rampersad (25) escapes abductors after being beaten"
+       - "Preacher David Charles beaten and robbed by fake passenger along Priority Bus Route"
+     * Include victim name and age in parentheses if known"""
+
+HEADLINE_UNNAMED = """   FOR CRIMES WITHOUT NAMED VICTIMS:
+     * Pattern: "[Occupation/descriptor] [action verb] in [Area]"
+     * Examples:
+       - "Taxi driver robbed in Santa Cruz"
+       - "Man shot dead in Laventille\""""
+
+HEADLINE_GENERAL = """   GENERAL RULES:
+   - Use ACTIVE voice and descriptive verbs
+   - Keep under 100 characters
+   - NO clickbait - be factual and descriptive
+   - NO ASSUMPTIONS about gender, ownership, or details not in post
+   - Avoid repetition (don't say location twice)"""
+
+DATE_NUMERIC = """DATE EXTRACTION (CRITICAL - Trinidad uses dd/mm/yyyy format):
+   - Trinidad posts use dd/mm/yyyy format (e.g., "6/12/25" = December 6, 2025)
+   - CONVERT to mm/dd/yyyy format for the sheet
+   - Examples:
+     * "6/12/25" → "12/6/2025" (December 6, 2025)
+     * "7/12/25" → "12/7/2025" (December 7, 2025)
+     * "15/01/25" → "1/15/2025" (January 15, 2025)"""
+
+DATE_BASIC = """DATE EXTRACTION:
+   - Return the date in M/D/YYYY format"""
+
+DATE_TEXT = """   - Also handle text dates: "Tuesday, December 2nd, 2025" → "12/2/2025\""""
+
+DATE_RELATIVE = """   - Handle relative dates: "yesterday", "last Tuesday", "this morning\""""
+
+DATE_NONE = """   - If NO date in post → return null (do NOT use today's date)"""
+
+CRIME_TYPE_RULES = EXTRACTION_PROMPT[
+    EXTRACTION_PROMPT.index('CRIME TYPE CLASSIFICATION:'):EXTRACTION_PROMPT.index('\n\n4. LOCATION DETAILS')]
+
+LOCATION_RULES = EXTRACTION_PROMPT[
+    EXTRACTION_PROMPT.index('LOCATION DETAILS:'):EXTRACTION_PROMPT.index('\n\n5. VICTIM DETAILS')]
+
+VICTIM_RULES = EXTRACTION_PROMPT[
+    EXTRACTION_PROMPT.index('VICTIM DETAILS:'):EXTRACTION_PROMPT.index('\n\n6. SUMMARY GENERATION')]
+
+SUMMARY_INTRO = """SUMMARY GENERATION (REQUIRED - MUST ALWAYS PROVIDE):
+   - CRITICAL: Summary field is REQUIRED and cannot be empty or null
+   - Write 1-3 natural, factual sentences about the incident
+   - Include ALL key details from the post (license plate, date, time, location, suspects, amounts)"""
+
+SUMMARY_TIERS = {
+    'short': """   FOR VERY SHORT POSTS (vehicle thefts with minimal info):
+   - One cohesive sentence with key facts
+   - Example: "A Nissan Tida Hatchback, license plate PCK 5839, was reported stolen from Jackson St. in Curepe on December 8, 2025."
+   - Include vehicle type, license plate, location, date""",
+    'medium': """   FOR MEDIUM POSTS (some details):
+   - 2 sentences: Main facts + additional context
+   - Example: "A white Toyota Fielder, license plate PDZ 6479, was stolen from the Belmont area on Saturday night, December 6, 2025. No details about suspects were provided.\"""",
+    'detailed': """   FOR DETAILED POSTS (full information):
+   - 2-3 sentences: Incident + Suspect description + Outcome
+   - Example: "A taxi driver was robbed of $1,050 TTD around 9:15am on Sunday, December 7, 2025. The suspect, described as a man of African descent with dark complexion, slim build, and kinky afro hairstyle, boarded the taxi on 1st Street, San Juan and asked to be taken to Santa Cruz. He placed an object on the driver's neck during the robbery and fled on Orange Field Road.\"""",
+}
+
+SUMMARY_GUARDRAILS = """   NO ASSUMPTIONS OR SPECULATION:
+   - DON'T say: "The victim's car was stolen"
+   - DO say: "A Nissan Tida Hatchback was stolen"
+   - Write naturally but stick to facts
+   - If details limited: Write one simple sentence with what's known"""
+
+PROMPT_FOOTER = "Return ONLY the JSON object, nothing else."
+
+
+# ---------------------------------------------------------------------------
+# Local pre-classification
+# ---------------------------------------------------------------------------
+
+# T&T plates: P (private), T (taxi), H (hired), R (rental) + 1-2 letters + up to 4 digits.
+# "PC 1234" / "WPC 1234" / "W/PC 1234" are police regimental numbers, not plates
+PLATE_RE = re.compile(r'\b(?!PC\s?\d)[PTHR][A-Z]{1,2}\s?\d{1,4}\b')
+VEHICLE_THEFT_RE = re.compile(
+    r'\b(?:car|vehicle|van|truck|suv|hatchback|sedan|pickup|motorcycle|toyota|nissan|honda|'
+    r'mazda|hyundai|kia|suzuki|mitsubishi|bmw|mercedes)\b[^.]{0,80}\bstolen\b|'
+    r'\bstolen\b[^.]{0,80}\b(?:car|vehicle|van|truck|suv|hatchback|sedan|pickup|motorcycle)\b',
+    re.IGNORECASE)
+
+_NAME = r"[A-Z][a-z'’]+(?:\s+[A-Z][a-z'’]+)+"
+NAMED_PERSON_RE = re.compile(
+    r'(?:identified as|named|known as|\bMr\.?|\bMrs\.?|\bMs\.?)\s+' + _NAME + r'|'  # identified as John Doe
+    + _NAME + r',?\s*\(\d{1,3}\)|'                                                # John Doe (25)
+    + _NAME + r',\s*\d{1,3}\s*,|'                                                 # John Doe, 25,
+    r'\b\d{1,3}\s*(?i:-?\s*year|yr)s?\.?[-\s]*(?i:old),?\s+' + _NAME              # 19 yr. Old Rondel Mills
+)
+
+# dd/mm/yyyy and bare dd/mm ("on 6/12 around 9pm"); dots/dashes only with a year, so
+# scores and decimals ("3-2", "6.5") don't pull in the conversion rule
+NUMERIC_DATE_RE = re.compile(r'\b\d{1,2}/\d{1,2}(?:/\d{2,4})?\b|\b\d{1,2}[.-]\d{1,2}[.-]\d{2,4}\b')
+TEXT_DATE_RE = re.compile(
+    r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+\d{1,2}|'
+    r'\b\d{1,2}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\b|'
+    r'\b(?:mon|tues?|wed(?:nes)?|thu(?:rs?)?|fri|sat(?:ur)?|sun)(?:day)?\b\.?,?\s+\d{1,2}',
+    re.IGNORECASE)
+RELATIVE_DATE_RE = re.compile(
+    r'\b(?:yesterday|today|tonight|last night|this (?:morning|afternoon|evening)|'
+    r'(?:last|this past)\s+(?:mon|tues|wednes|thurs|fri|satur|sun)day|'
+    r'(?:mon|tues|wednes|thurs|fri|satur|sun)day)\b',
+    re.IGNORECASE)
+
+
+def summary_tier(post_text: str) -> str:
+    """'short', 'medium' or 'detailed' by post length"""
+    length = len(post_text.strip())
+    if length < SHORT_POST_CHARS:
+        return 'short'
+    if length < MEDIUM_POST_CHARS:
+        return 'medium'
+    return 'detailed'
+
+
+def classify_post(post_text: str) -> dict:
+    """
+    Cheap local pre-classification used to pick prompt blocks.
+
+    Returns:
+        Dictionary of features: vehicle, named_victim, numeric_date,
+        text_date, relative_date (bools) and summary_tier
+    """
+    return {
+        'vehicle': bool(PLATE_RE.search(post_text) or VEHICLE_THEFT_RE.search(post_text)),
+        'named_victim': bool(NAMED_PERSON_RE.search(post_text)),
+        'numeric_date': bool(NUMERIC_DATE_RE.search(post_text)),
+        'text_date': bool(TEXT_DATE_RE.search(post_text)),
+        'relative_date': bool(RELATIVE_DATE_RE.search(post_text)),
+        'summary_tier': summary_tier(post_text),
+    }
+
+
+def selected_blocks(features: dict) -> list:
+    """Short names of the optional blocks a post gets (for logging/reports)"""
+    blocks = []
+    if features['vehicle']:
+        blocks.append('vehicle')
+    if features['named_victim']:
+        blocks.append('named-victim')
+    if not features['vehicle'] and not features['named_victim']:
+        blocks.append('unnamed-victim')
+    for key in ('numeric_date', 'text_date', 'relative_date'):
+        if features[key]:
+            blocks.append(key.replace('_', '-'))
+    blocks.append(f"summary-{features['summary_tier']}")
+    return blocks
+
+
+def build_prompt(post_text: str, features: dict = None) -> str:
+    """
+    Assemble the extraction prompt from the rule blocks relevant to this post.
+
+    Args:
+        post_text: Cleaned post text
+        features: From classify_post() (computed if not given)
+
+    Returns:
+        Prompt string
+    """
+    if features is None:
+        features = classify_post(post_text)
+
+    headline = [HEADLINE_INTRO]
+    if features['vehicle']:
+        headline.append(HEADLINE_VEHICLE)
+    if features['named_victim']:
+        headline.append(HEADLINE_NAMED)
+    if not features['vehicle'] and not features['named_victim']:
+        headline.append(HEADLINE_UNNAMED)
+    headline.append(HEADLINE_GENERAL)
+
+    date = [DATE_NUMERIC if features['numeric_date'] else DATE_BASIC]
+    if features['text_date']:
+        date.append(DATE_TEXT)
+    if features['relative_date']:
+        date.append(DATE_RELATIVE)
+    date.append(DATE_NONE)
+
+    sections = ['\n\n'.join(headline), '\n'.join(date), CRIME_TYPE_RULES, LOCATION_RULES]
+    if features['named_victim']:
+        sections.append(VICTIM_RULES)
+    sections.append('\n\n'.join([SUMMARY_INTRO, SUMMARY_TIERS[features['summary_tier']], SUMMARY_GUARDRAILS]))
+
+    rules = '\n\n'.join(f"{i}. {section}" for i, section in enumerate(sections, 1))
+    return f"{PROMPT_HEADER.format(post_text=post_text)}\n\n{rules}\n\n{PROMPT_FOOTER}"
+
+
+def monolithic_prompt(post_text: str) -> str:
+    return EXTRACTION_PROMPT.format(post_text=post_text)
+
+
+# ---------------------------------------------------------------------------
+# LLM response handling
+# ---------------------------------------------------------------------------
+
+def parse_llm_json(response_text: str) -> dict:
+    """
+    Parse the JSON object from an LLM reply, unwrapping markdown code fences.
+
+    Raises:
+        json.JSONDecodeError if the reply is not valid JSON
+    """
+    response_text = response_text.strip()
+
+    # Handle code blocks if LLM wraps in markdown
+    if response_text.startswith('```'):
+        lines = response_text.split('\n')
+        response_text = '\n'.join(lines[1:-1])
+
+    return json.loads(response_text)
+
+
+def approx_tokens(text: str) -> int:
+    """Rough Llama-style token count (words + punctuation) for offline comparisons"""
+    return len(re.findall(r"\w+|[^\w\s]", text))
@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Extractor Daemon - resident FBCrimeExtractor with a local submit API
+
+Every run of fb_crime_extractor.py pays for Python startup, gspread OAuth,
+ollama.list() and a cold model load before the first post. The daemon does that
+once and keeps the extractor, the sheet handle and a warm model (Ollama keep_alive)
+resident, so a batch costs only its inference time.
+
+Posts come in through:
+- HTTP on 127.0.0.1 (POST /submit, GET /stats, GET /batches/<id>)
+- optionally the same API on a Unix socket (--socket)
+- optionally a watched inbox directory (--inbox): drop a .txt file of posts
+  (blank-line separated, like the extractor's stdin); results land in inbox/done/,
+  unreadable files (not UTF-8, ...) are moved to inbox/failed/
+
+Inbox files are claimed into inbox/processing/ and every finished post is logged
+next to them (<name>.progress.jsonl). After a crash the file is picked up again
+and resumes after the last logged post, so posts already written to Production
+are not written twice (at most the one post in flight during the crash is).
+
+All batches go through one internal queue and a single worker thread (the sheet
+handle, incident index and a CPU-bound model don't benefit from parallel calls).
+
+Every request must carry the shared token from TOKEN_FILE (created by serve with
+mode 0600; the submit/stats commands send it in an X-Extractor-Token header), a
+Host of 127.0.0.1:<port> or localhost:<port>, and POSTs must be application/json —
+so other local users, and web pages rebinding a hostname to 127.0.0.1, can't
+queue posts that end up in Production.
+
+Usage:
+    python3 extractor_daemon.py serve [--inbox inbox/] [--socket /tmp/fb-extractor.sock]
+    python3 extractor_daemon.py submit my_fb_posts.txt      # or pipe posts on stdin
+    python3 extractor_daemon.py stats
+"""
+
+import argparse
+import hmac
+import http.client
+import json
+import os
+import queue
+import secrets
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Configuration
+HOST = '127.0.0.1'
+PORT = 8765
+KEEP_ALIVE = '2h'              # Ollama keep_alive for the resident model
+INBOX_POLL_SECONDS = 2
+INBOX_SETTLE_SECONDS = 1       # Ignore inbox files modified more recently (still being written)
+THROUGHPUT_WINDOW = 600        # Seconds of completed posts used for the posts/min figure
+MAX_REQUEST_BYTES = 5_000_000
+CLIENT_TIMEOUT = 3600
+TOKEN_FILE = '.extractor_daemon_token'   # Shared secret for clients (mode 0600)
+TOKEN_HEADER = 'X-Extractor-Token'
+
+_STOP = object()
+
+
+def load_token(path=TOKEN_FILE, create=False):
+    """
+    Read the shared API token.
+
+    Args:
+        path: Token file
+        create: Generate the file (mode 0600) if it doesn't exist (serve)
+
+    Returns:
+        Token string
+    """
+    if create and not os.path.exists(path):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(secrets.token_urlsafe(32) + '\n')
+    elif create:
+        os.chmod(path, 0o600)
+    with open(path, encoding='utf-8') as f:
+        token = f.read().strip()
+    if not token:
+        raise ValueError(f"empty token file: {path}")
+    return token
+
+
+def split_posts(text):
+    """Blank-line separated posts, same as fb_crime_extractor.py's stdin format"""
+    return [p.strip() for p in text.split('\n\n') if p.strip()]
+
+
+class Batch:
+    def __init__(self, batch_id, posts, source, progress_path=None, results=None):
+        self.id = batch_id
+        self.posts = posts
+        self.source = source
+        self.progress_path = progress_path   # Per-post completion log (inbox files)
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.results = list(results or [])   # Results carried over from before a restart
+        self.done = threading.Event()
+
+    def to_dict(self, include_results=True):
+        data = {
+            'id': self.id,
+            'source': self.source,
+            'posts': len(self.posts),
+            'status': 'done' if self.finished else ('running' if self.started else 'queued'),
+            'queue_seconds': round((self.started or time.time()) - self.submitted, 2),
+            'latency_seconds': round(self.finished - self.submitted, 2) if self.finished else None,
+        }
+        if include_results:
+            data['results'] = self.results
+        return data
+
+
+class ExtractorDaemon:
+    def __init__(self, extractor, inbox=None, keep_batches=200):
+        """
+        Args:
+            extractor: Initialized FBCrimeExtractor (sheet + Ollama already connected)
+            inbox: Directory to watch for .txt files of posts (optional)
+            keep_batches: Finished batches kept for GET /batches/<id>
+        """
+        self.extractor = extractor
+        self.inbox = inbox
+        self.jobs = queue.Queue()
+        self.batches = {}
+        self._finished_ids = deque()
+        self._keep_batches = keep_batches
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._stopping = threading.Event()
+
+        self.started = time.time()
+        self.pending_posts = 0
+        self.current = None
+        self.totals = {'batches': 0, 'posts': 0, 'written': 0, 'merged': 0, 'skipped': 0, 'error': 0,
+                       'failed': 0}
+        self.post_seconds = 0.0
+        self.batch_latency = 0.0
+        self._completed = deque()   # completion timestamps for throughput
+
+    # ------------------------------------------------------------------ queue
+
+    def submit(self, posts, source='http', progress_path=None, results=None):
+        """
+        Queue posts as one batch.
+
+        Args:
+            posts: List of post texts
+            source: Where the batch came from (shown in stats/logs)
+            progress_path: Append each finished post's result here (JSON lines)
+            results: Results of posts finished before a restart; the first
+                len(results) posts are skipped
+        """
+        with self._lock:
+            batch = Batch(f"b{self._next_id}", posts, source, progress_path, results)
+            self._next_id += 1
+            self.batches[batch.id] = batch
+            self.pending_posts += len(posts) - len(batch.results)
+        self.jobs.put(batch)
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self.jobs.get()
+            if batch is _STOP:
+                return
+            batch.started = time.time()
+            self.current = batch
+            print(f"\n📥 Batch {batch.id} ({len(batch.posts)} posts from {batch.source})")
+
+            for i, post in enumerate(batch.posts, 1):
+                if i <= len(batch.results):
+                    continue   # Finished before a restart (see _resume_progress)
+                print(f"\n[{batch.id} {i}/{len(batch.posts)}]")
+                try:
+                    result = self.extractor.process_post(post)
+                except Exception as e:
+                    # One bad post must not take the daemon down
+                    print(f"❌ Unexpected error: {e}")
+                    result = {'status': 'failed', 'error': str(e)}
+                batch.results.append(result)
+                if batch.progress_path:
+                    self._log_progress(batch.progress_path, result)
+                with self._lock:
+                    self.pending_posts -= 1
+                    self.totals['posts'] += 1
+                    self.totals[result['status']] += 1
+                    self.post_seconds += result.get('seconds', 0)
+                    self._completed.append(time.time())
+
+            try:
+                self.extractor.incidents.save()
+            except OSError as e:
+                print(f"⚠️  Could not save incident index: {e}")
+
+            batch.finished = time.time()
+            self.current = None
+            with self._lock:
+                self.totals['batches'] += 1
+                self.batch_latency += batch.finished - batch.submitted
+                self._finished_ids.append(batch.id)
+                while len(self._finished_ids) > self._keep_batches:
+                    self.batches.pop(self._finished_ids.popleft(), None)
+            batch.done.set()
+            print(f"✅ Batch {batch.id} done in {batch.finished - batch.submitted:.1f}s")
+
+    @staticmethod
+    def _log_progress(path, result):
+        try:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result) + '\n')
+        except OSError as e:
+            print(f"⚠️  Could not log progress to {path}: {e}")
+
+    # ------------------------------------------------------------------ stats
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            while self._completed and self._completed[0] < now - THROUGHPUT_WINDOW:
+                self._completed.popleft()
+            window = min(THROUGHPUT_WINDOW, now - self.started) or 1
+            done = self.totals['posts']
+            return {
+                'uptime_seconds': round(now - self.started),
+                'queue_depth': {'batches': self.jobs.qsize(), 'posts': self.pending_posts},
+                'current_batch': self.current.id if self.current else None,
+                'totals': dict(self.totals),
+                'throughput_posts_per_min': round(len(self._completed) / window * 60, 2),
+                'avg_post_seconds': round(self.post_seconds / done, 2) if done else None,
+                'avg_batch_latency_seconds': (round(self.batch_latency / self.totals['batches'], 2)
+                                              if self.totals['batches'] else None),
+            }
+
+    # ------------------------------------------------------------------ inbox
+
+    def _claim_inbox_files(self, processing_dir):
+        now = time.time()
+        for name in sorted(os.listdir(self.inbox)):
+            path = os.path.join(self.inbox, name)
+            if not name.endswith('.txt') or not os.path.isfile(path):
+                continue
+            if now - os.path.getmtime(path) < INBOX_SETTLE_SECONDS:
+                continue
+            claimed = os.path.join(processing_dir, name)
+            os.replace(path, claimed)
+            yield claimed
+
+    def _watch_inbox(self):
+        processing_dir = os.path.join(self.inbox, 'processing')
+        done_dir = os.path.join(self.inbox, 'done')
+        os.makedirs(processing_dir, exist_ok=True)
+        os.makedirs(done_dir, exist_ok=True)
+
+        # Files claimed before a crash/restart are picked up again (resuming after
+        # their last finished post)
+        leftovers = [os.path.join(processing_dir, n) for n in sorted(os.listdir(processing_dir))
+                     if n.endswith('.txt')]
+        while not self._stopping.is_set():
+            claimed = leftovers + list(self._claim_inbox_files(processing_dir))
+            leftovers = []
+            for path in claimed:
+                try:
+                    self._submit_inbox_file(path, done_dir)
+                except (OSError, UnicodeDecodeError) as e:
+                    # One bad file must not stop the watcher (or kill it again after a restart)
+                    self._fail_inbox_file(path, e)
+            self._stopping.wait(INBOX_POLL_SECONDS)
+
+    def _submit_inbox_file(self, path, done_dir):
+        with open(path, encoding='utf-8') as f:
+            posts = split_posts(f.read())
+        name = os.path.basename(path)
+        if not posts:
+            os.replace(path, os.path.join(done_dir, name))
+            return
+
+        progress_path = path + '.progress.jsonl'
+        results = self._resume_progress(progress_path)
+        if results:
+            print(f"↪️  Resuming {name} after {len(results)}/{len(posts)} finished posts")
+        batch = self.submit(posts, source=f"inbox:{name}", progress_path=progress_path, results=results)
+        threading.Thread(target=self._finish_inbox_file, args=(batch, path, done_dir),
+                         daemon=True).start()
+
+    @staticmethod
+    def _resume_progress(progress_path):
+        """Results logged for a file before a restart (a torn last line is ignored)"""
+        results = []
+        if os.path.exists(progress_path):
+            with open(progress_path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        results.append(json.loads(line))
+                    except ValueError:
+                        break
+        return results
+
+    def _fail_inbox_file(self, path, error):
+        failed_dir = os.path.join(self.inbox, 'failed')
+        name = os.path.basename(path)
+        print(f"❌ Could not read inbox file {name}: {error} (moved to {failed_dir})")
+        try:
+            os.makedirs(failed_dir, exist_ok=True)
+            os.replace(path, os.path.join(failed_dir, name))
+            with open(os.path.join(failed_dir, name + '.error.txt'), 'w', encoding='utf-8') as f:
+                f.write(f"{type(error).__name__}: {error}\n")
+        except OSError as e:
+            print(f"⚠️  Could not move {name} to {failed_dir}: {e}")
+
+    @staticmethod
+    def _finish_inbox_file(batch, path, done_dir):
+        batch.done.wait()
+        name = os.path.basename(path)
+        with open(os.path.join(done_dir, name[:-len('.txt')] + '.json'), 'w', encoding='utf-8') as f:
+            json.dump(batch.to_dict(), f, indent=2)
+        os.replace(path, os.path.join(done_dir, name))
+        if batch.progress_path and os.path.exists(batch.progress_path):
+            os.remove(batch.progress_path)
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def run(self, servers):
+        worker = threading.Thread(target=self._worker, name='extractor-worker')
+        worker.start()
+        if self.inbox:
+            threading.Thread(target=self._watch_inbox, name='inbox', daemon=True).start()
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        def stop(signum, frame):
+            self._stopping.set()
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        self._stopping.wait()
+
+        print("\n🛑 Stopping: no new submissions, finishing queued batches...")
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+        self.jobs.put(_STOP)
+        worker.join()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'FBExtractorDaemon/1.0'
+
+    def log_message(self, format, *args):
+        # Unix-socket peers have no address; the worker logs batches itself
+        pass
+
+    def _send_json(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        """Host allowlist + shared token; sends the error response and returns False if rejected"""
+        allowed_hosts = self.server.allowed_hosts
+        if allowed_hosts is not None and self.headers.get('Host') not in allowed_hosts:
+            self._send_json(403, {'error': 'host not allowed'})
+            return False
+        token = self.headers.get(TOKEN_HEADER) or ''
+        if not hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')):
+            self._send_json(401, {'error': 'missing or invalid token'})
+            return False
+        return True
+
+    def do_GET(self):
+        daemon = self.server.extractor_daemon
+        if not self._authorized():
+            return
+        if self.path == '/stats':
+            self._send_json(200, daemon.stats())
+        elif self.path.startswith('/batches/'):
+            batch = daemon.batches.get(self.path.rsplit('/', 1)[-1])
+            if batch is None:
+                self._send_json(404, {'error': 'unknown batch'})
+            else:
+                self._send_json(200, batch.to_dict())
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        daemon = self.server.extractor_daemon
+        if not self._authorized():
+            return
+        if self.path != '/submit':
+            self._send_json(404, {'error': 'not found'})
+            return
+
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            self._send_json(415, {'error': 'Content-Type must be application/json'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {'error': 'invalid Content-Length'})
+            return
+        if length > MAX_REQUEST_BYTES:
+            self._send_json(413, {'error': 'request too large'})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send_json(400, {'error': 'invalid JSON'})
+            return
+        if not isinstance(payload, dict):
+            self._send_json(400, {'error': 'request body must be a JSON object'})
+            return
+
+        posts = payload.get('posts')
+        if isinstance(posts, str):
+            posts = split_posts(posts)
+        if not isinstance(posts, list):
+            posts = []
+        posts = [p.strip() for p in posts if isinstance(p, str) and p.strip()]
+        if not posts:
+            self._send_json(400, {'error': 'no posts'})
+            return
+
+        batch = daemon.submit(posts, source='http')
+        if not payload.get('wait', True):
+            self._send_json(202, batch.to_dict(include_results=False))
+            return
+        batch.done.wait()
+        self._send_json(200, batch.to_dict())
+
+
+class _TCPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_servers(daemon, token, host=HOST, port=PORT, socket_path=None):
+    """
+    HTTP server on host:port, plus one on a Unix socket if socket_path is given.
+
+    Args:
+        daemon: ExtractorDaemon the handlers submit to
+        token: Shared token every request must send (see load_token)
+    """
+    tcp = _TCPServer((host, port), _Handler)
+    bound_port = tcp.server_address[1]
+    tcp.allowed_hosts = {f"127.0.0.1:{bound_port}", f"localhost:{bound_port}"}
+    servers = [tcp]
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)   # Stale socket from a previous run
+        unix = _UnixServer(socket_path, _Handler)
+        os.chmod(socket_path, 0o600)
+        unix.allowed_hosts = None    # Not reachable from a browser; file mode guards it
+        servers.append(unix)
+    for server in servers:
+        server.extractor_daemon = daemon
+        server.token = token
+    return servers
+
+
+# ---------------------------------------------------------------------- client
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=CLIENT_TIMEOUT):
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def request(method, path, payload=None, host=HOST, port=PORT, socket_path=None, token_file=TOKEN_FILE):
+    """Call the daemon; returns the decoded JSON response"""
+    token = load_token(token_file)
+    if socket_path:
+        conn = _UnixHTTPConnection(socket_path)
+    else:
+        conn = http.client.HTTPConnection(host, port, timeout=CLIENT_TIMEOUT)
+    body = json.dumps(payload).encode('utf-8') if payload is not None else None
+    headers = {TOKEN_HEADER: token}
+    if body:
+        headers['Content-Type'] = 'application/json'
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = json.loads(response.read() or b'{}')
+        if response.status >= 400:
+            raise RuntimeError(data.get('error', f"HTTP {response.status}"))
+        return data
+    finally:
+        conn.close()
+
+
+def cmd_submit(args):
+    if args.file:
+        if not os.path.isfile(args.file):
+            print(f"❌ File not found: {args.file}")
+            sys.exit(1)
+        with open(args.file, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = sys.stdin.read()
+    posts = split_posts(text)
+    if not posts:
+        print("❌ No posts provided.")
+        sys.exit(1)
+
+    print(f"📤 Submitting {len(posts)} posts...")
+    start = time.perf_counter()
+    batch = request('POST', '/submit', {'posts': posts, 'wait': not args.no_wait},
+                    port=args.port, socket_path=args.socket, token_file=args.token_file)
+    elapsed = time.perf_counter() - start
+
+    if args.no_wait:
+        print(f"✅ Queued as batch {batch['id']}")
+        return
+
+    for i, result in enumerate(batch['results'], 1):
+        label = result.get('headline') or result.get('error') or ''
+        print(f"  [{i}] {result['status']:<8} {result.get('seconds', 0):>6.1f}s  {label}")
+    counts = {}
+    for result in batch['results']:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print(f"\n📊 Batch {batch['id']}: {counts} in {elapsed:.1f}s "
+          f"(queued {batch['queue_seconds']:.1f}s)")
+
+
+def cmd_stats(args):
+    print(json.dumps(request('GET', '/stats', port=args.port, socket_path=args.socket,
+                             token_file=args.token_file), indent=2))
+
+
+def cmd_serve(args):
+    # Heavy imports only in the daemon itself — the client stays stdlib-only
+    import ollama
+    import fb_crime_extractor
+    from fb_crime_extractor import FBCrimeExtractor
+
+    print("\n" + "=" * 60)
+    print("  FB Crime Extractor Daemon")
+    print("=" * 60)
+
+    extractor = FBCrimeExtractor()
+    extractor.keep_alive = args.keep_alive
+
+    print(f"🔥 Loading {fb_crime_extractor.MODEL_NAME} (keep_alive {args.keep_alive})...")
+    start = time.perf_counter()
+    ollama.chat(model=fb_crime_extractor.MODEL_NAME, messages=[{'role': 'user', 'content': 'OK'}],
+                options={'num_predict': 1}, keep_alive=args.keep_alive)
+    print(f"✅ Model warm ({time.perf_counter() - start:.1f}s)")
+
+    if args.inbox:
+        os.makedirs(args.inbox, exist_ok=True)
+    daemon = ExtractorDaemon(extractor, inbox=args.inbox)
+    token = load_token(args.token_file, create=True)
+    servers = make_servers(daemon, token, port=args.port, socket_path=args.socket)
+
+    print(f"🌐 Listening on http://{HOST}:{args.port}" + (f" and {args.socket}" if args.socket else ""))
+    print(f"🔑 Clients authenticate with the token in {args.token_file}")
+    if args.inbox:
+        print(f"📂 Watching inbox: {args.inbox}")
+    print("   Ctrl+C to stop\n")
+
+    try:
+        daemon.run(servers)
+    finally:
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+    print("👋 Daemon stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Resident FB crime extractor with a local submit API')
+    parser.add_argument('--port', type=int, default=PORT, help='HTTP port on 127.0.0.1')
+    parser.add_argument('--socket', type=str, help='Unix socket path (serve: also listen; clients: use it)')
+    parser.add_argument('--token-file', default=TOKEN_FILE,
+                        help='Shared API token (serve creates it with mode 0600)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help='Run the daemon')
+    serve.add_argument('--inbox', type=str, help='Directory to watch for .txt files of posts')
+    serve.add_argument('--keep-alive', default=KEEP_ALIVE,
+                       help='How long Ollama keeps the model loaded between posts')
+    serve.set_defaults(func=cmd_serve)
+
+    submit = subparsers.add_parser('submit', help='Submit posts and wait for results')
+    submit.add_argument('file', nargs='?', help='Posts file (default: stdin)')
+    submit.add_argument('--no-wait', action='store_true', help='Queue and return immediately')
+    submit.set_defaults(func=cmd_submit)
+
+    stats = subparsers.add_parser('stats', help='Show queue depth and throughput')
+    stats.set_defaults(func=cmd_stats)
+
+    args = parser.parse_args()
+    try:
+        args.func(args)
+    except (ConnectionError, FileNotFoundError) as e:
+        print(f"❌ Daemon not reachable ({e}). Start it with: python3 extractor_daemon.py serve")
+        sys.exit(1)
+    except RuntimeError as e:
+        print(f"❌ Daemon refused the request: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,7 @@ Then paste Facebook posts (one or more), press Ctrl+D when done.
 import json
 import re
 import sys
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
@@ -28,128 +29,37 @@ except ImportError:
     print("   pip3 install ollama gspread oauth2client")
     sys.exit(1)
 
+from d1_export import D1Export
+from extraction_prompt import (LLM_OPTIONS, build_prompt, classify_post, monolithic_prompt,
+                               parse_llm_json, selected_blocks)
+from incident_dedup import IncidentIndex, fingerprint, key_relation, key_tokens, minhash_signature
+
 
 # Configuration
 CREDENTIALS_FILE = '../google-credentials.json'
 SPREADSHEET_NAME = 'Data - Trinidad and Tobago - Crime Reports - Data'
 WORKSHEET_NAME = 'Production'
 MODEL_NAME = 'llama3'
+OLLAMA_KEEP_ALIVE = None       # How long Ollama keeps the model loaded after a call (None = Ollama default)
+
+# Near-duplicate detection (see incident_dedup.py)
+DEDUP_INDEX_FILE = 'incident_index.json'
+DEDUP_WINDOW_DAYS = 3          # Reposts/articles about the same incident land within days
+# Before extraction: only near-verbatim reposts that share a plate or victim name are merged
+DEDUP_MERGE_THRESHOLD = 0.8
+DEDUP_SHORT_TEXT_WORDS = 40          # Short posts differ by a plate digit or a name, not by wording
+DEDUP_SHORT_MERGE_THRESHOLD = 0.95
+# After extraction: same crime type, area and incident date, plus a shared plate/name
+# or this much text/summary similarity (Jaccard or containment)
+DEDUP_CONFIRM_THRESHOLD = 0.3
+DEDUP_FLAG_THRESHOLD = 0.25    # Warn about a possible duplicate but still extract
 
-# Extraction prompt optimized for SEO-friendly headlines
-EXTRACTION_PROMPT = """You are a crime data analyst for Trinidad & Tobago. Extract structured information from this Facebook post.
-
-IMPORTANT: All posts provided are confirmed crime stories from trusted sources (Ian Alleyne Network, DJ Sheriff). Process EVERY post as a crime incident.
-
-Facebook Post:
-{post_text}
-
-Extract the following information and return ONLY valid JSON (no markdown, no code blocks):
-
-{{
-  "crimeType": "Murder" | "Robbery" | "Shooting" | "Assault" | "Home Invasion" | "Sexual Assault" | "Kidnapping" | "Theft" | "Seizures",
-  "headline": "SEO-friendly headline (see rules below)",
-  "victims": "<name(s) and age(s) if mentioned, or null>",
-  "street": "<specific street name or null>",
-  "area": "<neighborhood/area name>",
-  "region": "<one of: Port of Spain, San Fernando, Arima, Chaguanas, Point Fortin, Princes Town, Sangre Grande, Penal-Debe, Couva-Tabaquite-Talparo, Tunapuna-Piarco, Diego Martin, Siparia, Mayaro-Rio Claro, Tobago, or null>",
-  "date": "<M/D/YYYY format if date mentioned in post, or null if not specified>",
-  "summary": "<REQUIRED: 2-3 informative sentences about the incident, MUST be provided even for short posts>"
-}}
-
-CRITICAL RULES:
-
-1. HEADLINE GENERATION (SEO-optimized, STRICTLY FACTUAL):
-   - Pattern varies by crime type:
-
-   FOR VEHICLE THEFTS:
-     * Pattern: "[Vehicle type] [License plate] stolen from [Street], [Area]"
-     * Examples:
-       - "Nissan Tida Hatchback PCK 5839 stolen from Jackson St., Curepe"
-       - "White Toyota Fielder PDZ 6479 stolen from Belmont area"
-       - "Honda City stolen from Princes Town"
-     * Always include license plate if mentioned
-     * Keep location concise: "Jackson St., Curepe" NOT "Curepe Jackson St. Curepe"
-     * NO repetition of area name
-     * NO gender/ownership assumptions (NO "man's car")
-
-   FOR CRIMES WITH NAMED VICTIMS:
-     * Pattern: "[Location descriptor] [Victim name (age)] [action verb] [crime context]"
-     * Examples:
-       - "Central man Luke Rampersad (25) escapes abductors after being beaten"
-       - "Preacher David Charles beaten and robbed by fake passenger along Priority Bus Route"
-     * Include victim name and age in parentheses if known
-
-   FOR CRIMES WITHOUT NAMED VICTIMS:
-     * Pattern: "[Occupation/descriptor] [action verb] in [Area]"
-     * Examples:
-       - "Taxi driver robbed in Santa Cruz"
-       - "Man shot dead in Laventille"
-
-   GENERAL RULES:
-   - Use ACTIVE voice and descriptive verbs
-   - Keep under 100 characters
-   - NO clickbait - be factual and descriptive
-   - NO ASSUMPTIONS about gender, ownership, or details not in post
-   - Avoid repetition (don't say location twice)
-
-2. DATE EXTRACTION (CRITICAL - Trinidad uses dd/mm/yyyy format):
-   - Trinidad posts use dd/mm/yyyy format (e.g., "6/12/25" = December 6, 2025)
-   - CONVERT to mm/dd/yyyy format for the sheet
-   - Examples:
-     * "6/12/25" → "12/6/2025" (December 6, 2025)
-     * "7/12/25" → "12/7/2025" (December 7, 2025)
-     * "15/01/25" → "1/15/2025" (January 15, 2025)
-   - Also handle text dates: "Tuesday, December 2nd, 2025" → "12/2/2025"
-   - Handle relative dates: "yesterday", "last Tuesday", "this morning"
-   - If NO date in post → return null (do NOT use today's date)
-
-3. CRIME TYPE CLASSIFICATION:
-   - ALL posts are crime stories - select the most appropriate crime type
-   - Use "Seizures" for police seizures of guns, drugs, contraband (recovery operations)
-   - Use "Theft" for stealing without victim present (vehicle theft, burglary when no one home)
-   - Use "Robbery" for stealing with victim present or armed theft
-   - Use "Home Invasion" for break-ins where people were home
-   - Use "Kidnapping" for abductions
-   - Use "Assault" for physical attacks without theft
-   - Use "Shooting" for gun violence incidents where victim survived
-   - Use "Murder" for killings/homicides
-
-4. LOCATION DETAILS:
-   - Street: Specific street name, landmark, or business (e.g., "Priority Bus Route", "Charlotte Street", "KFC Arima")
-   - Area: Neighborhood/district (e.g., "Mt. Hope", "Port of Spain", "Diego Martin")
-   - Region: Match to one of Trinidad's 14 regions or Tobago
-
-5. VICTIM DETAILS:
-   - Extract full name if mentioned
-   - Extract age if mentioned
-   - Format: "Name (age)" or just "Name" if age unknown
-   - NO ASSUMPTIONS about gender or identity if not explicitly stated
-
-6. SUMMARY GENERATION (REQUIRED - MUST ALWAYS PROVIDE):
-   - CRITICAL: Summary field is REQUIRED and cannot be empty or null
-   - Write 1-3 natural, factual sentences about the incident
-   - Include ALL key details from the post (license plate, date, time, location, suspects, amounts)
-
-   FOR VERY SHORT POSTS (vehicle thefts with minimal info):
-   - One cohesive sentence with key facts
-   - Example: "A Nissan Tida Hatchback, license plate PCK 5839, was reported stolen from Jackson St. in Curepe on December 8, 2025."
-   - Include vehicle type, license plate, location, date
-
-   FOR MEDIUM POSTS (some details):
-   - 2 sentences: Main facts + additional context
-   - Example: "A white Toyota Fielder, license plate PDZ 6479, was stolen from the Belmont area on Saturday night, December 6, 2025. No details about suspects were provided."
-
-   FOR DETAILED POSTS (full information):
-   - 2-3 sentences: Incident + Suspect description + Outcome
-   - Example: "A taxi driver was robbed of $1,050 TTD around 9:15am on Sunday, December 7, 2025. The suspect, described as a man of African descent with dark complexion, slim build, and kinky afro hairstyle, boarded the taxi on 1st Street, San Juan and asked to be taken to Santa Cruz. He placed an object on the driver's neck during the robbery and fled on Orange Field Road."
-
-   NO ASSUMPTIONS OR SPECULATION:
-   - DON'T say: "The victim's car was stolen"
-   - DO say: "A Nissan Tida Hatchback was stolen"
-   - Write naturally but stick to facts
-   - If details limited: Write one simple sentence with what's known
-
-Return ONLY the JSON object, nothing else."""
+# Optional D1 sink (see d1_export.py): also write each crime to this D1-compatible SQLite file
+D1_EXPORT_FILE = None          # e.g. 'crimes_d1.db'
+
+# Prompt assembly (see extraction_prompt.py)
+# 'dynamic' sends only the rule blocks relevant to each post; 'monolithic' sends every rule
+PROMPT_MODE = 'dynamic'
 
 
 class FBCrimeExtractor:
@@ -211,6 +121,95 @@ class FBCrimeExtractor:
             print(f"   ollama pull {MODEL_NAME}")
             sys.exit(1)
 
+        self.keep_alive = OLLAMA_KEEP_ALIVE
+
+        # Load recent incidents for near-duplicate detection
+        self.incidents = IncidentIndex.load(DEDUP_INDEX_FILE, window_days=DEDUP_WINDOW_DAYS)
+        print(f"✅ Incident index loaded: {len(self.incidents.incidents)} recent incidents")
+
+        self.d1 = D1Export(D1_EXPORT_FILE) if D1_EXPORT_FILE else None
+        if self.d1:
+            print(f"✅ D1 export enabled: {D1_EXPORT_FILE}")
+
+    def check_duplicate(self, text: str, url: str = '', when=None) -> Tuple[Dict, Optional[Dict]]:
+        """
+        Look up a post/article in the near-duplicate index before extraction.
+
+        Only near-verbatim reposts that share a plate or victim name are merged
+        here (their URL is recorded on the existing incident); everything else is
+        extracted and re-checked by confirm_duplicate().
+
+        Args:
+            text: Cleaned post or article text
+            url: Source URL of the post/article
+            when: Date the post/article was published (None if unknown)
+
+        Returns:
+            Tuple of (fingerprint, merged_incident) — merged_incident is None unless merged
+        """
+        fp = fingerprint(text)
+        matches = self.incidents.find_duplicates(fp, when=when)
+        if not matches:
+            return fp, None
+
+        incident, similarity = matches[0]
+        threshold = DEDUP_SHORT_MERGE_THRESHOLD if fp['words'] < DEDUP_SHORT_TEXT_WORDS else DEDUP_MERGE_THRESHOLD
+        if similarity >= threshold and key_relation(fp['keys'], incident.get('keys')) == 'match':
+            self._merge_incident(incident, similarity, fp, url, when)
+            return fp, incident
+
+        if similarity >= DEDUP_FLAG_THRESHOLD:
+            print(f"⚠️  Possible duplicate ({similarity:.0%}) of: {incident['headline']} — extracting anyway")
+        return fp, None
+
+    def confirm_duplicate(self, fp: Dict, crime_data: Dict, url: str = '', when=None) -> Optional[Dict]:
+        """
+        Re-check an extracted incident against the index using its fields.
+
+        Catches rewrites that share little wording (an FB post vs. the newspaper
+        article about it): same crime type, area and incident date, no conflicting
+        plate/victim name, and either a shared plate/name or similar text/summary.
+
+        Args:
+            fp: Fingerprint from check_duplicate() (summary and victims are added here)
+            crime_data: Extracted crime data
+            url: Source URL of the post/article
+            when: Date the post/article was published (None if unknown)
+
+        Returns:
+            The incident it was merged into, or None
+        """
+        if crime_data.get('summary'):
+            fp['summary_signature'] = minhash_signature(crime_data['summary'])
+        victim_keys = key_tokens('', crime_data.get('victims'))
+        fp['keys']['names'] = sorted(set(fp['keys']['names']) | set(victim_keys['names']))
+
+        matches = self.incidents.find_duplicates(fp, when=when, incident_date=crime_data.get('date'),
+                                                 crime_type=crime_data.get('crimeType'),
+                                                 area=crime_data.get('area'))
+        for incident, similarity in matches:
+            if incident.get('crime_type') != crime_data.get('crimeType') or incident.get('day') is None:
+                continue
+            if not self.incidents.same_place(incident, crime_data.get('area')):
+                continue
+            relation = key_relation(fp['keys'], incident.get('keys'))
+            if relation == 'match' or (relation == 'unknown' and similarity >= DEDUP_CONFIRM_THRESHOLD):
+                self._merge_incident(incident, similarity, fp, url, when)
+                return incident
+        return None
+
+    def _merge_incident(self, incident: Dict, similarity: float, fp: Dict, url: str, when) -> None:
+        self.incidents.merge(incident['id'], url, when=when, keys=fp['keys'])
+        print(f"🔁 Near-duplicate ({similarity:.0%}) of: {incident['headline']}")
+        print(f"   Merged — incident now has {len(incident['urls'])} source URL(s)")
+
+    def remember_incident(self, fp: Dict, crime_data: Dict, url: str = '', when=None) -> None:
+        """Add a newly written incident to the near-duplicate index."""
+        if fp.get('signature'):
+            self.incidents.add(fp, url=url, incident_date=crime_data.get('date'),
+                               headline=crime_data.get('headline', ''), when=when,
+                               crime_type=crime_data.get('crimeType', ''), area=crime_data.get('area', ''))
+
     def _generate_fallback_summary(self, crime_data: Dict, post_text: str) -> str:
         """
         Generate a natural, factual summary when LLM doesn't provide one.
@@ -283,8 +282,14 @@ class FBCrimeExtractor:
         """
         print(f"\n🤖 Processing post ({len(post_text)} chars)...")
 
-        prompt = EXTRACTION_PROMPT.format(post_text=post_text)
+        if PROMPT_MODE == 'dynamic':
+            features = classify_post(post_text)
+            prompt = build_prompt(post_text, features)
+            print(f"🧩 Prompt blocks: {', '.join(selected_blocks(features))}")
+        else:
+            prompt = monolithic_prompt(post_text)
 
+        response_text = ''
         try:
             # Call Ollama LLM
             response = ollama.chat(
@@ -293,23 +298,13 @@ class FBCrimeExtractor:
                     'role': 'user',
                     'content': prompt
                 }],
-                options={
-                    'temperature': 0.1,  # Low temperature for consistent extraction
-                    'num_predict': 500   # Limit response length
-                }
+                options=LLM_OPTIONS,
+                keep_alive=self.keep_alive
             )
 
             # Extract JSON from response
-            response_text = response['message']['content'].strip()
-
-            # Handle code blocks if LLM wraps in markdown
-            if response_text.startswith('```'):
-                # Extract JSON from code block
-                lines = response_text.split('\n')
-                response_text = '\n'.join(lines[1:-1])
-
-            # Parse JSON
-            crime_data = json.loads(response_text)
+            response_text = response['message']['content']
+            crime_data = parse_llm_json(response_text)
 
             # Validate required fields
             if not crime_data.get('crimeType'):
@@ -392,6 +387,70 @@ class FBCrimeExtractor:
             print(f"❌ Error writing to sheet: {e}")
             return False
 
+    def process_post(self, post: str) -> Dict:
+        """
+        Run one FB post through URL extraction, duplicate check, LLM extraction
+        and the sheet write. Does not save the incident index (callers batch that).
+
+        Args:
+            post: Raw FB post text (non-empty)
+
+        Returns:
+            Result dictionary (see process_text)
+        """
+        # Extract FB URL from post text
+        cleaned_post, fb_url = self.extract_url_from_post(post)
+
+        if fb_url:
+            print(f"🔗 Found FB URL: {fb_url[:50]}...")
+
+        # Posts are processed as they are published
+        return self.process_text(cleaned_post, fb_url, when=datetime.now())
+
+    def process_text(self, text: str, url: str = '', when=None) -> Dict:
+        """
+        Duplicate check, LLM extraction and sheet write for one cleaned post/article.
+        Does not save the incident index (callers batch that).
+
+        Args:
+            text: Cleaned post or article text
+            url: Source URL written to the URL column
+            when: Date the post/article was published (None if unknown)
+
+        Returns:
+            Result dictionary: status ('written' | 'merged' | 'skipped' | 'error'),
+            url, headline, crimeType, area and seconds
+        """
+        start = time.perf_counter()
+        result = {'status': 'skipped', 'url': url, 'headline': '', 'crimeType': '', 'area': ''}
+
+        # Skip reposts of an incident we already have
+        fp, merged = self.check_duplicate(text, url, when=when)
+        if merged:
+            result.update(status='merged', headline=merged['headline'])
+        else:
+            crime_data = self.extract_crime_data(text)
+
+            if crime_data is not None:
+                result.update(headline=crime_data.get('headline', ''),
+                              crimeType=crime_data.get('crimeType', ''),
+                              area=crime_data.get('area', ''))
+
+                # Rewrites of a known incident (e.g. the newspaper version of a post)
+                merged = self.confirm_duplicate(fp, crime_data, url, when=when)
+                if merged:
+                    result.update(status='merged', headline=merged['headline'])
+                elif self.write_to_sheet(crime_data, url):
+                    result['status'] = 'written'
+                    self.remember_incident(fp, crime_data, url, when=when)
+                    if self.d1:
+                        self.d1.add_extracted(crime_data, url)
+                else:
+                    result['status'] = 'error'
+
+        result['seconds'] = round(time.perf_counter() - start, 2)
+        return result
+
     def process_posts(self, posts: List[str]) -> Dict:
         """
         Process multiple FB posts in batch.
@@ -407,6 +466,7 @@ class FBCrimeExtractor:
             'processed': 0,
             'written': 0,
             'skipped': 0,
+            'merged': 0,
             'errors': 0
         }
 
@@ -420,27 +480,16 @@ class FBCrimeExtractor:
 
             print(f"\n[{i}/{stats['total']}]")
 
-            # Extract FB URL from post text
-            cleaned_post, fb_url = self.extract_url_from_post(post)
-
-            if fb_url:
-                print(f"🔗 Found FB URL: {fb_url[:50]}...")
-
-            # Extract crime data from cleaned post
-            crime_data = self.extract_crime_data(cleaned_post)
-
-            if crime_data is None:
-                stats['skipped'] += 1
-                continue
-
-            stats['processed'] += 1
-
-            # Write to Google Sheets with FB URL
-            if self.write_to_sheet(crime_data, fb_url):
-                stats['written'] += 1
-            else:
+            result = self.process_post(post)
+            status = result['status']
+            if status in ('written', 'error'):
+                stats['processed'] += 1
+            if status == 'error':
                 stats['errors'] += 1
+            else:
+                stats[status] += 1
 
+        self.incidents.save()
         return stats
 
 
@@ -480,6 +529,7 @@ def main():
         print(f"✅ Successfully processed: {stats['processed']}")
         print(f"📝 Written to sheet: {stats['written']}")
         print(f"⚠️  Skipped (not crimes): {stats['skipped']}")
+        print(f"🔁 Merged (near-duplicates): {stats['merged']}")
         print(f"❌ Errors: {stats['errors']}")
         print("=" * 60)
 
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate incident detection (MinHash + LSH)
+
+The same murder shows up as an Ian Alleyne post, a DJ Sheriff repost with
+different wording and three newspaper articles. Exact-match checks miss those,
+so each post/article is reduced to a fingerprint (see fingerprint()) and looked
+up in an LSH index of recent incidents.
+
+- Signature: NUM_PERM min-hashes over word bigrams (stopwords/URLs stripped),
+  for the post/article text and, once extracted, for the LLM summary
+- LSH: BANDS bands of ROWS_PER_BAND hashes; any shared band = candidate
+  (32 x 2 catches reworded reposts down to ~30% Jaccard). Incidents are also
+  indexed by (crime type, area), so a short FB post and the long article it was
+  rewritten into still meet after extraction
+- Similarity is the best of Jaccard and containment (how much of the shorter
+  text is inside the longer one) over text and summary signatures
+- Key tokens (plates, victim names) are compared separately: different plates or
+  names on both sides mean different incidents, whatever the text similarity
+- Candidates must fall in a day window: incident date against incident date,
+  else reported (post/publish) date against reported date. Nothing is matched on
+  the day the index happened to be built, so a backfill of 2024 articles is
+  windowed by the articles' own dates.
+
+Lookups are a handful of dict hits — well under a millisecond with a year of
+incidents indexed. The index is persisted as JSON between runs
+(incident_index.json) and records every source URL merged into an incident.
+
+Usage:
+    python3 incident_dedup.py --benchmark 10000   # about a year of synthetic incidents
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import time
+import zlib
+from datetime import date, datetime
+
+from extraction_prompt import NAMED_PERSON_RE, PLATE_RE
+
+# MinHash / LSH parameters (NUM_PERM must equal BANDS * ROWS_PER_BAND)
+NUM_PERM = 64
+BANDS = 32
+ROWS_PER_BAND = 2
+SHINGLE_WORDS = 2
+
+# Incidents older than this (by incident date and last-seen date) are pruned on save
+RETENTION_DAYS = 365
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures must stay comparable across runs and machines
+_rng = random.Random(20260101)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+                 for _ in range(NUM_PERM)]
+
+_URL_RE = re.compile(r'https?://\S+|www\.\S+')
+_NAME_RE = re.compile(r"[A-Z][a-z'’]+(?:\s+[A-Z][a-z'’]+)+")
+_TITLES = {'mr', 'mrs', 'ms', 'miss', 'dr', 'pc', 'wpc', 'cpl', 'sgt', 'insp'}
+_NON_WORD_RE = re.compile(r'[^a-z0-9]+')
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'of', 'in', 'on', 'at', 'to', 'for', 'from', 'by', 'with',
+    'was', 'were', 'is', 'are', 'be', 'been', 'has', 'have', 'had', 'he', 'she', 'his', 'her',
+    'they', 'their', 'it', 'its', 'this', 'that', 'who', 'which', 'as', 'after', 'before',
+    'about', 'said', 'says', 'also', 'up', 'out', 'into', 'while', 'when', 'where',
+}
+
+
+def normalize_text(text):
+    """Lowercase, strip URLs/punctuation/stopwords → list of content words"""
+    text = _URL_RE.sub(' ', (text or '').lower())
+    return [w for w in _NON_WORD_RE.sub(' ', text).split() if w not in STOPWORDS]
+
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Set of word n-gram hashes for the normalized text"""
+    words = normalize_text(text)
+    if len(words) < size:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return {zlib.crc32(g.encode('utf-8')) for g in grams}
+
+
+def minhash_signature(text):
+    """MinHash signature (list of NUM_PERM ints) for a post/summary, or None if empty"""
+    return _minhash(shingles(text))
+
+
+def _minhash(hashes):
+    if not hashes:
+        return None
+    p = _MERSENNE_PRIME
+    return [min(((a * h + b) % p) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity = fraction of matching min-hashes"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / NUM_PERM
+
+
+def estimate_containment(sig_a, size_a, sig_b, size_b):
+    """
+    Estimated share of the smaller shingle set contained in the larger one.
+
+    Jaccard understates a short post quoted inside a long article (|A∩B| is
+    small next to |A∪B|); containment recovers it from Jaccard and the set sizes:
+    |A∩B| = J(|A| + |B|) / (1 + J).
+    """
+    if not size_a or not size_b:
+        return 0.0
+    jaccard = estimate_similarity(sig_a, sig_b)
+    return min(1.0, jaccard * (size_a + size_b) / ((1 + jaccard) * min(size_a, size_b)))
+
+
+def _name_words(name):
+    words = [w for w in _NON_WORD_RE.sub(' ', name.lower()).split() if w not in _TITLES]
+    # Surname only — "Johnny Doe" and "John Doe" are the same victim
+    return words[-1:] if words else []
+
+
+def key_tokens(text, victims=None):
+    """
+    Identifying tokens for an incident: licence plates and victim surnames.
+
+    Args:
+        text: Post/article text (plates, and names in "identified as John Doe" form)
+        victims: Extracted 'victims' field, if known (more reliable than the text)
+
+    Returns:
+        {'plates': [...], 'names': [...]}, sorted, lowercase
+    """
+    text = text or ''
+    plates = {re.sub(r'\s+', '', m.group()).lower() for m in PLATE_RE.finditer(text)}
+    names = set()
+    sources = [m.group() for m in NAMED_PERSON_RE.finditer(text)]
+    if victims and str(victims).strip().lower() not in ('null', 'none', 'n/a', 'unknown'):
+        sources.append(str(victims))
+    for source in sources:
+        for name in _NAME_RE.findall(source):
+            names.update(_name_words(name))
+    return {'plates': sorted(plates), 'names': sorted(names)}
+
+
+def key_relation(keys_a, keys_b):
+    """
+    Compare key tokens of two incidents.
+
+    Returns:
+        'conflict' if plates (or names) are given on both sides and share none,
+        'match' if any plate or name is shared, otherwise 'unknown'
+    """
+    keys_a = keys_a or {}
+    keys_b = keys_b or {}
+    relation = 'unknown'
+    for kind in ('plates', 'names'):
+        a, b = set(keys_a.get(kind) or ()), set(keys_b.get(kind) or ())
+        if a and b:
+            if a.isdisjoint(b):
+                return 'conflict'
+            relation = 'match'
+    return relation
+
+
+def normalize_place(value):
+    """'St. James ' / 'st james' → 'st james' (None/null → '')"""
+    value = _NON_WORD_RE.sub(' ', str(value or '').lower()).strip()
+    return '' if value in ('null', 'none', 'n a', 'unknown') else value
+
+
+def fingerprint(text, summary=None, victims=None):
+    """
+    Everything the index needs to compare one post/article.
+
+    Args:
+        text: Cleaned post or article text
+        summary: Extracted summary (after the LLM call), optional
+        victims: Extracted victims field, optional
+
+    Returns:
+        Dict with signature, size (shingle count), words (content words),
+        summary_signature and keys
+    """
+    hashes = shingles(text)
+    return {
+        'signature': _minhash(hashes),
+        'size': len(hashes),
+        'words': len(normalize_text(text)),
+        'summary_signature': minhash_signature(summary) if summary else None,
+        'keys': key_tokens(text, victims),
+    }
+
+
+def _to_day(value):
+    """date / datetime / 'M/D/YYYY' / 'YYYY-MM-DD' → ordinal day number (or None)"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    for fmt in ('%m/%d/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(str(value).strip(), fmt).date().toordinal()
+        except ValueError:
+            continue
+    return None
+
+
+class IncidentIndex:
+    """LSH index of recent incidents, persisted as JSON."""
+
+    def __init__(self, path=None, window_days=3):
+        """
+        Args:
+            path: JSON file to load/save the index (None = in-memory only)
+            window_days: Only incidents dated/reported within this many days can match
+        """
+        self.path = path
+        self.window_days = window_days
+        self.incidents = {}
+        self._buckets = [dict() for _ in range(BANDS)]
+        self._by_place = {}
+        self._next_id = 1
+
+    @classmethod
+    def load(cls, path, window_days=3):
+        index = cls(path, window_days=window_days)
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for incident in data.get('incidents', []):
+                    index._insert(incident)
+                index._next_id = max(data.get('next_id', 1), index._next_id)
+            except (ValueError, KeyError) as e:
+                print(f"⚠️  Could not read incident index {path}: {e} (starting empty)")
+        return index
+
+    def save(self, today=None):
+        """Prune incidents past RETENTION_DAYS and write the index to disk"""
+        if not self.path:
+            return
+        self.prune(today)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'next_id': self._next_id, 'incidents': list(self.incidents.values())}, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _band_keys(signature):
+        for band in range(BANDS):
+            start = band * ROWS_PER_BAND
+            yield band, tuple(signature[start:start + ROWS_PER_BAND])
+
+    @staticmethod
+    def _signatures(incident):
+        return [sig for sig in (incident.get('signature'), incident.get('summary_signature')) if sig]
+
+    @staticmethod
+    def _place_key(incident):
+        if incident.get('crime_type') and incident.get('area'):
+            return incident['crime_type'], incident['area']
+        return None
+
+    def _insert(self, incident):
+        self.incidents[incident['id']] = incident
+        for signature in self._signatures(incident):
+            for band, key in self._band_keys(signature):
+                self._buckets[band].setdefault(key, set()).add(incident['id'])
+        place = self._place_key(incident)
+        if place:
+            self._by_place.setdefault(place, set()).add(incident['id'])
+        self._next_id = max(self._next_id, incident['id'] + 1)
+
+    def _remove(self, incident_id):
+        incident = self.incidents.pop(incident_id)
+        for signature in self._signatures(incident):
+            for band, key in self._band_keys(signature):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    bucket.discard(incident_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+        place = self._place_key(incident)
+        if place and place in self._by_place:
+            self._by_place[place].discard(incident_id)
+            if not self._by_place[place]:
+                del self._by_place[place]
+
+    def _in_window(self, incident, reported_day, incident_day):
+        # Incident dates are the best evidence; before extraction only the date a
+        # post/article was published is known, so compare it with the incident's
+        if incident_day is not None and incident.get('day') is not None:
+            return abs(incident_day - incident['day']) <= self.window_days
+        if reported_day is not None:
+            for other in (incident.get('seen'), incident.get('day')):
+                if other is not None and abs(reported_day - other) <= self.window_days:
+                    return True
+        return False
+
+    @staticmethod
+    def same_place(incident, area):
+        """True if an extracted area names the incident's area"""
+        return bool(incident.get('area')) and incident['area'] == normalize_place(area)
+
+    @staticmethod
+    def similarity(fp, incident):
+        """Best Jaccard/containment between a fingerprint and an indexed incident"""
+        best = 0.0
+        sig, inc_sig = fp.get('signature'), incident.get('signature')
+        if sig and inc_sig:
+            best = max(estimate_similarity(sig, inc_sig),
+                       estimate_containment(sig, fp.get('size'), inc_sig, incident.get('size')))
+        summary, inc_summary = fp.get('summary_signature'), incident.get('summary_signature')
+        for a, b in ((summary, inc_summary), (sig, inc_summary), (summary, inc_sig)):
+            if a and b:
+                best = max(best, estimate_similarity(a, b))
+        return best
+
+    def candidates(self, fp, crime_type=None, area=None):
+        """Ids sharing an LSH band with the fingerprint, or its (crime type, area), any date"""
+        candidates = set()
+        for signature in self._signatures(fp):
+            for band, key in self._band_keys(signature):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    candidates.update(bucket)
+        if crime_type and normalize_place(area):
+            candidates.update(self._by_place.get((crime_type, normalize_place(area)), ()))
+        return candidates
+
+    def find_duplicates(self, fp, when=None, incident_date=None, crime_type=None, area=None):
+        """
+        Look up near-duplicate incidents for a fingerprint.
+
+        Args:
+            fp: From fingerprint()
+            when: Date the post/article was published (None if unknown)
+            incident_date: Extracted incident date, if known
+            crime_type / area: Extracted fields — also pull in incidents of the same
+                type in the same area, whatever their wording
+
+        Returns:
+            List of (incident, similarity), best match first
+        """
+        reported_day = _to_day(when)
+        incident_day = _to_day(incident_date)
+        if reported_day is None and incident_day is None:
+            return []
+
+        matches = []
+        for incident_id in self.candidates(fp, crime_type, area):
+            incident = self.incidents[incident_id]
+            if not self._in_window(incident, reported_day, incident_day):
+                continue
+            matches.append((incident, self.similarity(fp, incident)))
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+    def add(self, fp, url='', incident_date=None, headline='', when=None, crime_type='', area=''):
+        """Index a newly extracted incident. Returns its id."""
+        incident = {
+            'id': self._next_id,
+            'day': _to_day(incident_date),
+            'seen': _to_day(when),
+            'headline': headline,
+            'urls': [url] if url else [],
+            'signature': fp.get('signature'),
+            'size': fp.get('size'),
+            'summary_signature': fp.get('summary_signature'),
+            'keys': fp.get('keys') or {},
+            'crime_type': crime_type or '',
+            'area': normalize_place(area),
+        }
+        self._insert(incident)
+        return incident['id']
+
+    def merge(self, incident_id, url='', when=None, keys=None):
+        """Record another source URL (and any new plates/names) for an existing incident"""
+        incident = self.incidents[incident_id]
+        if url and url not in incident['urls']:
+            incident['urls'].append(url)
+        day = _to_day(when)
+        if day is not None:
+            incident['seen'] = max(incident.get('seen') or day, day)
+        for kind, tokens in (keys or {}).items():
+            incident.setdefault('keys', {})[kind] = sorted(set(incident['keys'].get(kind, [])) | set(tokens))
+        return incident
+
+    def prune(self, today=None):
+        """Drop incidents not dated or seen within RETENTION_DAYS"""
+        # Incidents with neither date can never fall in a window again
+        cutoff = (_to_day(today) or date.today().toordinal()) - RETENTION_DAYS
+        stale = [i for i, inc in self.incidents.items()
+                 if max(inc.get('day') or 0, inc.get('seen') or 0) < cutoff]
+        for incident_id in stale:
+            self._remove(incident_id)
+        return len(stale)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+_BENCH_AREAS = ['Laventille', 'Arima', 'Chaguanas', 'Couva', 'Morvant', 'Point Fortin',
+                'Scarborough', 'San Fernando', 'Diego Martin', 'Sangre Grande']
+_BENCH_TYPES = ['Murder', 'Robbery', 'Shooting', 'Theft', 'Home Invasion', 'Assault']
+_BENCH_WORDS = ('police officers responded report man woman gunmen shot dead wounded vehicle stolen '
+                'house bandits escaped hospital investigation ongoing residents heard gunshots night '
+                'morning street junction bar shop cash phone jewellery suspects arrested detained '
+                'victim relatives community frightened patrol units scene crime officers').split()
+_BENCH_NAMES = ['Ramdass', 'Mohammed', 'Charles', 'Joseph', 'Baptiste', 'Singh', 'Williams', 'Ali']
+
+
+def _synthetic_post(rng, area, crime_type):
+    # Story-specific words (places, names, details) plus the shared crime vocabulary
+    own = [f"w{rng.randrange(50000)}" for _ in range(20)]
+    words = [rng.choice(_BENCH_WORDS if rng.random() < 0.5 else own) for _ in range(rng.randint(25, 120))]
+    words[rng.randrange(len(words)):0] = [crime_type.lower(), 'in', area]
+    if rng.random() < 0.4:
+        words += ['identified', 'as', rng.choice(['John', 'Kevin', 'Lisa']), rng.choice(_BENCH_NAMES)]
+    if rng.random() < 0.3:
+        words += ['plate', f"P{rng.choice('ABCDH')}{rng.choice('ABCDJ')} {rng.randint(1, 9999)}"]
+    return ' '.join(words)
+
+
+def _reword(rng, text):
+    """A repost: same story, ~15% of words swapped, a line added"""
+    words = text.split()
+    for i in rng.sample(range(len(words)), len(words) // 7):
+        words[i] = rng.choice(_BENCH_WORDS)
+    return ' '.join(words + ['share', 'this', 'post'])
+
+
+def benchmark(n, lookups=2000, seed=0):
+    """Index n synthetic incidents spread over a year and time lookups against them"""
+    rng = random.Random(seed)
+    start_day = date(2025, 1, 1).toordinal()
+    index = IncidentIndex(window_days=3)
+    posts = []
+
+    print(f"\n⏱️  Incident dedup benchmark ({n} incidents over 365 days, {lookups} lookups)")
+    start = time.perf_counter()
+    for i in range(n):
+        area, crime_type = rng.choice(_BENCH_AREAS), rng.choice(_BENCH_TYPES)
+        text = _synthetic_post(rng, area, crime_type)
+        day = date.fromordinal(start_day + rng.randrange(365))
+        index.add(fingerprint(text), url=f"https://example.com/{i}", incident_date=day, when=day,
+                  crime_type=crime_type, area=area)
+        posts.append((text, day, crime_type, area))
+    elapsed = time.perf_counter() - start
+    print(f"   {'Fingerprint + index':<28} {n:>7} incidents  {elapsed:7.3f}s  {n / elapsed:>9,.0f}/sec")
+
+    # Half reworded reposts of indexed incidents, half unseen posts
+    queries = []
+    for i in range(lookups):
+        if i % 2 == 0:
+            text, day, crime_type, area = rng.choice(posts)
+            queries.append((_reword(rng, text), day, crime_type, area))
+        else:
+            area, crime_type = rng.choice(_BENCH_AREAS), rng.choice(_BENCH_TYPES)
+            queries.append((_synthetic_post(rng, area, crime_type),
+                            date.fromordinal(start_day + rng.randrange(365)), crime_type, area))
+    fps = [(fingerprint(text), day, crime_type, area) for text, day, crime_type, area in queries]
+
+    for label, extracted in (("Pre-extraction (text only)", False), ("Post-extraction (+type/area)", True)):
+        latencies, raw, in_window = [], [], []
+        for fp, day, crime_type, area in fps:
+            kwargs = {'incident_date': day, 'crime_type': crime_type, 'area': area} if extracted else {}
+            start = time.perf_counter()
+            matches = index.find_duplicates(fp, when=day, **kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            raw.append(len(index.candidates(fp, kwargs.get('crime_type'), kwargs.get('area'))))
+            in_window.append(len(matches))
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"   {label:<28} median {statistics.median(latencies):.3f} ms  p99 {p99:.3f} ms  "
+              f"candidates {statistics.mean(raw):.1f} avg / {max(raw)} max  "
+              f"in window {statistics.mean(in_window):.1f} avg / {max(in_window)} max")
+
+    found = sum(1 for i, (fp, day, _, _) in enumerate(fps)
+                if i % 2 == 0 and any(sim >= 0.5 for _, sim in index.find_duplicates(fp, when=day)))
+    print(f"\n   Reposts found at ≥50% similarity: {found}/{len(fps[::2])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Near-duplicate incident index (MinHash + LSH)')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='Benchmark lookups against N synthetic incidents')
+    parser.add_argument('--lookups', type=int, default=2000, help='benchmark: number of lookups to time')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.error('--benchmark N is required')
+    benchmark(args.benchmark, args.lookups)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Streaming article-link extraction for archive-scraper.py listing pages
+
+Listing pages used to be read whole (response.text decodes the full body) and
+scanned with a broad findall; the Guardian pattern also matched asset, CSS and
+tag links that were then filtered out in Python. Here:
+
+- Each source has ONE compiled bytes pattern that matches only article URL
+  shapes (exclusions are folded into the pattern), shared with is_article_url()
+- The body is scanned chunk by chunk straight from response.iter_content();
+  the tail of each chunk is carried over so a URL split across two chunks is
+  still found exactly once
+- URLs are yielded as they are found (a generator), deduplicated per page
+
+Benchmark (old whole-page findall vs streaming) on saved listing pages:
+    curl -s https://newsday.co.tt/category/news/ > newsday.html
+    python3 link_extractor.py --benchmark NEWSDAY newsday.html
+    python3 link_extractor.py --benchmark all          # synthetic pages if no files given
+"""
+
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+
+CHUNK_SIZE = 64 * 1024
+MAX_URL_LEN = 2048   # Longest URL we expect; also the carry-over kept between chunks
+
+# Article URL shapes per source (CONFIG keys in archive-scraper.py). A match must be
+# followed by a delimiter, so it can't be a prefix of a longer asset/tag URL.
+ARTICLE_PATTERNS = {
+    'TRINIDAD_EXPRESS': (
+        r'https://trinidadexpress\.com/(?:[a-z0-9_-]+/)+article_[a-f0-9-]+\.html'
+    ),
+    'GUARDIAN': (
+        # <section>/<slug>-6.2.2464684.85e290cffb — the Escenic article id is required, so
+        # section, archive, tag and asset pages never match
+        r'https://www\.guardian\.co\.tt/(?:[a-z0-9-]+/)+[a-z0-9][a-z0-9-]*-\d+\.\d+\.\d+\.[0-9a-f]+'
+        r'(?=["\'\s<>?#]|$)'
+    ),
+    'NEWSDAY': (
+        r'https://newsday\.co\.tt/\d{4}/\d{2}/\d{2}/[^"\'\s<>?#/]+/?'
+    ),
+}
+
+_BYTES_PATTERNS = {key: re.compile(pattern.encode('ascii')) for key, pattern in ARTICLE_PATTERNS.items()}
+
+
+def iter_links(chunks, pattern, max_url_len=MAX_URL_LEN):
+    """
+    Yield each distinct match of a bytes pattern across a stream of chunks.
+
+    A match is only accepted once at least one byte follows it in the buffer
+    (so a URL cut off at a chunk boundary is never yielded truncated); the
+    unscanned tail is carried into the next chunk.
+
+    Args:
+        chunks: Iterable of bytes (response.iter_content(), file reads, ...)
+        pattern: Compiled bytes regex
+        max_url_len: Longest match that is guaranteed to survive a chunk boundary
+
+    Yields:
+        URL strings, each once
+    """
+    seen = set()
+    carry = b''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer = carry + chunk
+        limit = len(buffer)
+        safe_end = 0
+        for match in pattern.finditer(buffer):
+            end = match.end()
+            if end >= limit:
+                break   # Might continue in the next chunk
+            safe_end = end
+            url = match.group()
+            if url not in seen:
+                seen.add(url)
+                yield url.decode('ascii', 'replace')
+        carry = buffer[max(safe_end, limit - max_url_len):]
+
+    # End of body: whatever is left is complete
+    for match in pattern.finditer(carry):
+        url = match.group()
+        if url not in seen:
+            seen.add(url)
+            yield url.decode('ascii', 'replace')
+
+
+def extract_links(chunks, source_key):
+    """Stream article URLs for a source (CONFIG key) out of a listing page body"""
+    return iter_links(chunks, _BYTES_PATTERNS[source_key])
+
+
+def response_links(response, source_key, chunk_size=CHUNK_SIZE):
+    """Article URLs from a requests response fetched with stream=True"""
+    return extract_links(response.iter_content(chunk_size=chunk_size), source_key)
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+# The patterns and Python-side filtering archive-scraper.py used before this module
+_OLD_PATTERNS = {
+    'TRINIDAD_EXPRESS': re.compile(r'https://trinidadexpress\.com/[^"\'\s]+/article_[a-f0-9-]+\.html'),
+    'GUARDIAN': re.compile(r'https://www\.guardian\.co\.tt/[^"\'\s]+'),
+    'NEWSDAY': re.compile(r'https://newsday\.co\.tt/\d{4}/\d{2}/\d{2}/[^"\'\s]+'),
+}
+
+
+def _old_extract(chunks, source_key):
+    # requests: .content joins the whole body, .text decodes it
+    text = b''.join(chunks).decode('utf-8', 'replace')
+    urls = set()
+    for url in _OLD_PATTERNS[source_key].findall(text):
+        url = url.strip('\'"')
+        if '/archive/' not in url and '/category/' not in url:
+            urls.add(url)
+    return urls
+
+
+def _file_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _synthetic_page(source_key, articles=120, filler_kb=600):
+    """Listing-page-shaped HTML: article links among nav, tag, asset and script noise"""
+    link = {
+        'TRINIDAD_EXPRESS': 'https://trinidadexpress.com/news/local/story-{i}/article_{i:08x}-aaaa-bbbb.html',
+        'GUARDIAN': 'https://www.guardian.co.tt/news/man-charged-in-story-{i}-6.2.{i:07d}.{i:010x}',
+        'NEWSDAY': 'https://newsday.co.tt/2026/01/{d:02d}/police-probe-story-{i}/',
+    }[source_key]
+    host = {'TRINIDAD_EXPRESS': 'https://trinidadexpress.com',
+            'GUARDIAN': 'https://www.guardian.co.tt',
+            'NEWSDAY': 'https://newsday.co.tt'}[source_key]
+    noise = (f'<link rel="stylesheet" href="{host}/assets/css/site.{{i}}.css">'
+             f'<script src="{host}/static/js/bundle.{{i}}.js"></script>'
+             f'<a href="{host}/category/news/page/{{i}}/">More</a>'
+             f'<a href="{host}/tags/crime-{{i}}">Tag</a>'
+             f'<a href="{host}/news/local">Local</a>'
+             f'<img src="{host}/images/photo-{{i}}.jpg" alt="">'
+             '<div class="promo">' + 'x' * 200 + '</div>\n')
+    parts = ['<html><head><title>News</title></head><body>']
+    filler_per_article = max(1, filler_kb * 1024 // articles // len(noise))
+    for i in range(articles):
+        for j in range(filler_per_article):
+            parts.append(noise.format(i=i * 100 + j))
+        url = link.format(i=i, d=i % 28 + 1)
+        parts.append(f'<article><h2><a href="{url}">Story {i}</a></h2>'
+                     f'<a href="{url}#comments">Comments</a></article>\n')
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def _measure(fn):
+    # CPU first without tracemalloc (its per-allocation hooks would skew the timing)
+    cpu = time.process_time()
+    result = fn()
+    cpu = time.process_time() - cpu
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, cpu, peak
+
+
+def benchmark(source_keys, paths, repeat=5):
+    print(f"\n⏱️  Link extraction benchmark (chunks of {CHUNK_SIZE // 1024}KB, best of {repeat})")
+    for source_key in source_keys:
+        if paths:
+            pages = [(p, lambda p=p: _file_chunks(p)) for p in paths]
+        else:
+            body = _synthetic_page(source_key)
+            pages = [(f"synthetic {len(body) // 1024}KB",
+                      lambda body=body: (body[i:i + CHUNK_SIZE] for i in range(0, len(body), CHUNK_SIZE)))]
+
+        print(f"\n  {source_key}")
+        for name, chunks in pages:
+            runs = {'old': [], 'new': []}
+            for _ in range(repeat):
+                runs['old'].append(_measure(lambda: _old_extract(chunks(), source_key)))
+                runs['new'].append(_measure(lambda: set(extract_links(chunks(), source_key))))
+            old_urls, new_urls = runs['old'][0][0], runs['new'][0][0]
+            for label in ('old', 'new'):
+                cpu = min(r[1] for r in runs[label]) * 1000
+                peak = min(r[2] for r in runs[label]) / 1024
+                urls = len(runs[label][0][0])
+                print(f"    {name:<28} {label}: {cpu:7.2f}ms CPU  {peak:8.0f}KB peak  {urls:>4} URLs")
+            extra = sorted(old_urls - new_urls)
+            if extra:
+                print(f"    old-only URLs (dropped as non-articles): {len(extra)}, e.g. {extra[:3]}")
+            missing = sorted(new_urls - old_urls)
+            if missing:
+                print(f"    new-only URLs: {len(missing)}, e.g. {missing[:3]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming article-link extraction for listing pages')
+    parser.add_argument('--benchmark', metavar='SOURCE', required=True,
+                        choices=list(ARTICLE_PATTERNS) + ['all'],
+                        help='Compare old findall vs streaming for this source')
+    parser.add_argument('files', nargs='*', help='Saved listing pages (default: synthetic pages)')
+    parser.add_argument('--repeat', type=int, default=5)
+
+    args = parser.parse_args()
+    if args.benchmark == 'all' and args.files:
+        print("❌ Saved pages belong to one source — pass a source name, not 'all'")
+        sys.exit(1)
+
+    source_keys = list(ARTICLE_PATTERNS) if args.benchmark == 'all' else [args.benchmark]
+    benchmark(source_keys, args.files, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Prompt Report - dynamic vs monolithic extraction prompt
+
+Runs every sample post through both prompts (see extraction_prompt.py) and
+reports, per post and on average:
+- prompt tokens (Ollama's prompt_eval_count; approximate count in --offline mode)
+- latency (prompt evaluation and total, from Ollama's own timings)
+- field parity: does the dynamic prompt extract the same crimeType, region,
+  area, street, date and victims as the monolithic one?
+
+Usage:
+    python3 prompt_report.py                                   # both sample files, needs Ollama
+    python3 prompt_report.py --offline                         # token counts only, no LLM
+    python3 prompt_report.py facebook-posts.txt --runs 3 --json prompt_report.json
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+from extraction_prompt import (LLM_OPTIONS, approx_tokens, build_prompt, classify_post,
+                               monolithic_prompt, parse_llm_json, selected_blocks)
+
+DEFAULT_FILES = ['sample_fb_posts.txt', 'facebook-posts.txt']
+MODEL_NAME = 'llama3'
+
+# Fields compared for parity (headline/summary wording legitimately differs run to run)
+PARITY_FIELDS = ['crimeType', 'region', 'area', 'street', 'date', 'victims']
+
+# Same pattern FBCrimeExtractor.extract_url_from_post strips before extraction
+FB_URL_RE = re.compile(r'https?://(?:www\.)?(?:facebook\.com|fb\.watch|m\.facebook\.com)/[^\s]+')
+
+
+def load_posts(paths):
+    """Posts separated by blank lines; '#' comment lines and FB URLs removed"""
+    posts = []
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for block in f.read().split('\n\n'):
+                lines = [line for line in block.splitlines() if not line.lstrip().startswith('#')]
+                text = FB_URL_RE.sub('', '\n'.join(lines)).strip()
+                if text:
+                    posts.append(text)
+    return posts
+
+
+def _normalize(value):
+    if value is None:
+        return ''
+    value = str(value).strip().casefold()
+    return '' if value in ('null', 'none', 'n/a', 'unknown') else value
+
+
+def run_prompt(prompt, model):
+    """One extraction call → (parsed fields or None, prompt tokens, prompt seconds, total seconds)"""
+    import ollama
+
+    start = time.perf_counter()
+    response = ollama.chat(model=model, messages=[{'role': 'user', 'content': prompt}],
+                           options=LLM_OPTIONS)
+    wall = time.perf_counter() - start
+
+    # Ollama reports durations in nanoseconds
+    prompt_tokens = response.get('prompt_eval_count') or approx_tokens(prompt)
+    prompt_seconds = (response.get('prompt_eval_duration') or 0) / 1e9
+    total_seconds = (response.get('total_duration') or 0) / 1e9 or wall
+
+    try:
+        data = parse_llm_json(response['message']['content'])
+    except json.JSONDecodeError:
+        data = None
+    return data, prompt_tokens, prompt_seconds, total_seconds
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def build_report(posts, offline=False, runs=1, model=MODEL_NAME):
+    results = []
+    for i, post in enumerate(posts, 1):
+        features = classify_post(post)
+        prompts = {'monolithic': monolithic_prompt(post), 'dynamic': build_prompt(post, features)}
+        row = {
+            'post': i,
+            'chars': len(post),
+            'blocks': selected_blocks(features),
+            'approx_tokens': {mode: approx_tokens(p) for mode, p in prompts.items()},
+        }
+
+        if not offline:
+            print(f"[{i}/{len(posts)}] {post[:60]!r}...", file=sys.stderr)
+            measured = {mode: {'prompt_tokens': [], 'prompt_seconds': [], 'total_seconds': []}
+                        for mode in prompts}
+            extracted = {}
+            for run in range(runs):
+                # Alternate order so neither prompt always benefits from a warm cache
+                order = list(prompts) if (i + run) % 2 else list(reversed(list(prompts)))
+                for mode in order:
+                    data, tokens, prompt_s, total_s = run_prompt(prompts[mode], model)
+                    measured[mode]['prompt_tokens'].append(tokens)
+                    measured[mode]['prompt_seconds'].append(prompt_s)
+                    measured[mode]['total_seconds'].append(total_s)
+                    extracted.setdefault(mode, data)
+
+            row['measured'] = {mode: {k: _mean(v) for k, v in m.items()} for mode, m in measured.items()}
+            mono, dyn = extracted.get('monolithic'), extracted.get('dynamic')
+            row['parsed'] = {'monolithic': mono is not None, 'dynamic': dyn is not None}
+            if mono is not None and dyn is not None:
+                row['parity'] = {field: _normalize(mono.get(field)) == _normalize(dyn.get(field))
+                                 for field in PARITY_FIELDS}
+                row['mismatches'] = {field: [mono.get(field), dyn.get(field)]
+                                     for field, same in row['parity'].items() if not same}
+        results.append(row)
+
+    summary = {
+        'posts': len(results),
+        'avg_approx_tokens': {mode: _mean([r['approx_tokens'][mode] for r in results])
+                              for mode in ('monolithic', 'dynamic')},
+    }
+    if not offline:
+        for key in ('prompt_tokens', 'prompt_seconds', 'total_seconds'):
+            summary[f'avg_{key}'] = {mode: _mean([r['measured'][mode][key] for r in results])
+                                     for mode in ('monolithic', 'dynamic')}
+        compared = [r for r in results if 'parity' in r]
+        summary['parse_failures'] = {mode: sum(1 for r in results if not r['parsed'][mode])
+                                     for mode in ('monolithic', 'dynamic')}
+        summary['field_parity'] = {field: _mean([1.0 if r['parity'][field] else 0.0 for r in compared])
+                                   for field in PARITY_FIELDS}
+    return {'summary': summary, 'posts': results}
+
+
+def _pct_change(before, after):
+    if not before or after is None:
+        return ''
+    return f"({(after - before) / before * 100:+.0f}%)"
+
+
+def print_report(report, offline):
+    summary = report['summary']
+
+    print("\n" + "=" * 60)
+    print("📊 Prompt Report - dynamic vs monolithic")
+    print("=" * 60)
+    for row in report['posts']:
+        tokens = row['approx_tokens']
+        line = f"#{row['post']:>2} {row['chars']:>5} chars  ~{tokens['monolithic']:>4} → ~{tokens['dynamic']:>4} tokens"
+        if not offline:
+            m = row['measured']
+            line += f"  {m['monolithic']['total_seconds']:.1f}s → {m['dynamic']['total_seconds']:.1f}s"
+        print(f"{line}  [{', '.join(row['blocks'])}]")
+        for field, (mono, dyn) in row.get('mismatches', {}).items():
+            print(f"      ≠ {field}: {mono!r} vs {dyn!r}")
+
+    print("-" * 60)
+    avg = summary['avg_approx_tokens']
+    print(f"Posts: {summary['posts']}")
+    print(f"Avg prompt tokens (approx): {avg['monolithic']:.0f} → {avg['dynamic']:.0f} "
+          f"{_pct_change(avg['monolithic'], avg['dynamic'])}")
+
+    if not offline:
+        for key, label in (('prompt_tokens', 'Avg prompt tokens (Ollama)'),
+                           ('prompt_seconds', 'Avg prompt eval time (s)'),
+                           ('total_seconds', 'Avg total latency (s)')):
+            values = summary[f'avg_{key}']
+            if values['monolithic'] is None:
+                continue
+            print(f"{label}: {values['monolithic']:.2f} → {values['dynamic']:.2f} "
+                  f"{_pct_change(values['monolithic'], values['dynamic'])}")
+        failures = summary['parse_failures']
+        print(f"JSON parse failures: monolithic {failures['monolithic']}, dynamic {failures['dynamic']}")
+        print("Field parity (dynamic == monolithic):")
+        for field, rate in summary['field_parity'].items():
+            print(f"   {field}: {'-' if rate is None else f'{rate:.0%}'}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare dynamic vs monolithic extraction prompts')
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES,
+                        help='Post files (blank-line separated)')
+    parser.add_argument('--offline', action='store_true',
+                        help='Token counts and block selection only (no Ollama calls)')
+    parser.add_argument('--runs', type=int, default=1,
+                        help='Extraction runs per prompt per post (latency is averaged)')
+    parser.add_argument('--model', default=MODEL_NAME, help='Ollama model')
+    parser.add_argument('--json', help='Also write the full report to this JSON file')
+
+    args = parser.parse_args()
+
+    posts = load_posts(args.files)
+    if not posts:
+        print("❌ No posts found.")
+        sys.exit(1)
+
+    if not args.offline:
+        try:
+            import ollama
+            ollama.list()
+            # Load the model once so the first timed call isn't paying for it
+            ollama.chat(model=args.model, messages=[{'role': 'user', 'content': 'OK'}],
+                        options={'num_predict': 1})
+        except ImportError:
+            print("❌ ollama not installed (pip3 install ollama) — use --offline for token counts only")
+            sys.exit(1)
+        except Exception as e:
+            print(f"❌ Ollama not available: {e} — use --offline for token counts only")
+            sys.exit(1)
+
+    report = build_report(posts, offline=args.offline, runs=args.runs, model=args.model)
+    print_report(report, args.offline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Local SQLite mirror of the Production worksheet
+
+Any analysis or dedup against Production used to mean a full get_all_values()
+pull (slow, eats Sheets quota). This keeps a typed, indexed copy in SQLite:
+
+- First run: full load of the worksheet
+- Later runs: incremental — only rows beyond the last synced row are fetched
+- Every VERIFY_EVERY syncs (or --verify), one block of older rows is re-fetched and
+  compared by checksum; edited rows are updated, and a mostly-mismatched block
+  (rows inserted/deleted mid-sheet) triggers a full reload
+
+Columns are mapped by header name, so both the extractor's 14-column layout and
+the current Production layout (primaryCrimeType, relatedCrimeTypes, victimCount...)
+load into the same table.
+
+Usage:
+    python3 sheet_mirror.py sync
+    python3 sheet_mirror.py sync --full
+    python3 sheet_mirror.py sync --verify
+    python3 sheet_mirror.py sync --d1 crimes_d1.db     # also refresh the D1 export
+    python3 sheet_mirror.py stats
+    python3 sheet_mirror.py query "SELECT region, COUNT(*) FROM production GROUP BY region"
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+# Configuration
+CREDENTIALS_FILE = '../google-credentials.json'
+SPREADSHEET_NAME = 'Data - Trinidad and Tobago - Crime Reports - Data'
+WORKSHEET_NAME = 'Production'
+DB_FILE = 'production_mirror.db'
+
+VERIFY_EVERY = 5       # Run a checksum verification pass every N syncs
+VERIFY_BLOCK = 1000    # Rows re-fetched per verification pass
+RESYNC_RATIO = 0.1     # Mismatched share of a block that means rows shifted → full reload
+
+# (db column, SQL type, header names it can appear under)
+COLUMNS = [
+    ('date', 'TEXT', ['Date']),
+    ('headline', 'TEXT', ['Headline']),
+    ('crime_type', 'TEXT', ['primaryCrimeType', 'Crime Type']),
+    ('related_crime_types', 'TEXT', ['relatedCrimeTypes', 'Related Crime Types']),
+    ('victim_count', 'INTEGER', ['victimCount', 'Victim Count']),
+    ('street', 'TEXT', ['Street Address', 'Street']),
+    ('plus_code', 'TEXT', ['Plus Code', 'Location']),
+    ('area', 'TEXT', ['Area']),
+    ('region', 'TEXT', ['Region']),
+    ('island', 'TEXT', ['Island']),
+    ('url', 'TEXT', ['URL']),
+    ('source', 'TEXT', ['Source']),
+    ('latitude', 'REAL', ['Latitude', 'Lat']),
+    ('longitude', 'REAL', ['Longitude', 'Long']),
+    ('summary', 'TEXT', ['Summary']),
+    ('story_id', 'TEXT', ['story_id', 'Story_ID']),
+    # Kept verbatim: crime-sync passes them to D1 as-is (date_published/date_updated)
+    ('date_published', 'TEXT', ['Date_Published', 'Date Published']),
+    ('date_updated', 'TEXT', ['Date_Updated', 'Date Updated']),
+]
+
+# Column order write_to_sheet() in fb_crime_extractor.py emits (used if the sheet has no header)
+EXTRACTOR_LAYOUT = ['Date', 'Headline', 'Crime Type', 'Street', 'Plus Code', 'Area', 'Region',
+                    'Island', 'URL', 'Source', 'Lat', 'Long', 'Summary', 'Forward']
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS production (
+    row_number INTEGER PRIMARY KEY,   -- worksheet row (header = 1)
+    {', '.join(f'{name} {sql_type}' for name, sql_type, _ in COLUMNS)},
+    raw TEXT NOT NULL,                -- JSON array of the row as it appears in the sheet
+    checksum TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_production_url ON production(url);
+CREATE INDEX IF NOT EXISTS idx_production_date ON production(date);
+CREATE INDEX IF NOT EXISTS idx_production_area ON production(area);
+CREATE INDEX IF NOT EXISTS idx_production_region ON production(region);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT_SQL = (
+    f"INSERT OR REPLACE INTO production (row_number, {', '.join(c[0] for c in COLUMNS)}, raw, checksum) "
+    f"VALUES ({', '.join('?' * (len(COLUMNS) + 3))})"
+)
+
+
+# ============================================================================
+# ROW CONVERSION
+# ============================================================================
+
+def row_checksum(values):
+    return hashlib.sha1('\x1f'.join(values).encode('utf-8')).hexdigest()[:16]
+
+
+def _normalize_date(value):
+    """'M/D/YYYY' (sheet format) → 'YYYY-MM-DD' so SQL range queries sort correctly"""
+    value = value.strip()
+    for fmt in ('%m/%d/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return value or None
+
+
+def _to_int(value):
+    try:
+        n = int(value)
+        return n if n >= 0 else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def column_map(header):
+    """Map db column → index in the sheet row, by header name (case-insensitive)"""
+    lookup = {h.strip().lower(): i for i, h in enumerate(header)}
+    mapping = {}
+    for name, _, aliases in COLUMNS:
+        for alias in aliases:
+            if alias.lower() in lookup:
+                mapping[name] = lookup[alias.lower()]
+                break
+    return mapping
+
+
+def to_record(row_number, values, mapping):
+    """Convert one sheet row to a typed db record (tuple in _UPSERT_SQL order)"""
+    def get(name):
+        i = mapping.get(name)
+        return values[i].strip() if i is not None and i < len(values) else ''
+
+    record = [row_number]
+    for name, sql_type, _ in COLUMNS:
+        value = get(name)
+        if name == 'date':
+            record.append(_normalize_date(value))
+        elif sql_type == 'INTEGER':
+            record.append(_to_int(value))
+        elif sql_type == 'REAL':
+            record.append(_to_float(value))
+        else:
+            record.append(value or None)
+    record.append(json.dumps(values, ensure_ascii=False))
+    record.append(row_checksum(values))
+    return tuple(record)
+
+
+def _trim(values):
+    """Sheets pads/drops trailing blanks inconsistently — normalise before checksumming"""
+    values = list(values)
+    while values and not values[-1].strip():
+        values.pop()
+    return values
+
+
+# ============================================================================
+# MIRROR
+# ============================================================================
+
+def connect(db_path=DB_FILE):
+    """Open (and initialise) the mirror database. Other tools query it through this."""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+    return conn
+
+
+def _migrate(conn):
+    """Add columns introduced since the mirror was created; the next sync reloads to fill them"""
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(production)")}
+    added = [(name, sql_type) for name, sql_type, _ in COLUMNS if name not in existing]
+    if not added:
+        return
+    with conn:
+        for name, sql_type in added:
+            conn.execute(f"ALTER TABLE production ADD COLUMN {name} {sql_type}")
+        if conn.execute("SELECT 1 FROM production LIMIT 1").fetchone():
+            conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_row', '0')")
+            print(f"ℹ️  Mirror gained columns ({', '.join(n for n, _ in added)}) — next sync is a full reload")
+
+
+def known_urls(conn):
+    """Set of every URL already in Production (for cross-referencing)"""
+    return {r[0].strip() for r in conn.execute("SELECT url FROM production WHERE url IS NOT NULL")}
+
+
+class SheetMirror:
+    def __init__(self, sheet, conn):
+        self.sheet = sheet
+        self.conn = conn
+
+    def _state(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, **values):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+            [(k, str(v)) for k, v in values.items()]
+        )
+
+    def _mapping(self, header):
+        mapping = column_map(header)
+        if 'headline' not in mapping:
+            # No recognisable header — assume the extractor's 14-column layout
+            mapping = column_map(EXTRACTOR_LAYOUT)
+        return mapping
+
+    def _upsert(self, first_row_number, rows, mapping):
+        records = [to_record(first_row_number + i, _trim(values), mapping)
+                   for i, values in enumerate(rows) if any(v.strip() for v in values)]
+        self.conn.executemany(_UPSERT_SQL, records)
+        return len(records)
+
+    def full_sync(self):
+        print("📥 Full load of Production...")
+        values = self.sheet.get_all_values()
+        header, rows = (values[0], values[1:]) if values else ([], [])
+        mapping = self._mapping(header)
+
+        with self.conn:
+            self.conn.execute("DELETE FROM production")
+            count = self._upsert(2, rows, mapping)
+            self._set_state(header=json.dumps(header), last_row=len(rows) + 1, verify_cursor=2)
+        print(f"✅ Loaded {count} rows")
+        return count
+
+    def incremental_sync(self):
+        last_row = int(self._state('last_row', 0))
+        header = json.loads(self._state('header', '[]'))
+
+        current_header = self.sheet.row_values(1)
+        if last_row == 0 or current_header != header:
+            if last_row:
+                print("ℹ️  Header changed since last sync — reloading")
+            return self.full_sync()
+
+        rows = self.sheet.get_values(f"A{last_row + 1}:ZZ")
+        mapping = self._mapping(header)
+        with self.conn:
+            count = self._upsert(last_row + 1, rows, mapping)
+            self._set_state(last_row=last_row + len(rows))
+        if rows:
+            print(f"✅ {count} new rows (rows {last_row + 1}–{last_row + len(rows)})")
+        else:
+            print("✅ No new rows")
+        return count
+
+    def verify_block(self):
+        """Re-fetch one block of older rows and repair any that changed. Returns False if a full reload is needed."""
+        last_row = int(self._state('last_row', 0))
+        if last_row < 2:
+            return True
+        start = int(self._state('verify_cursor', 2))
+        if start > last_row:
+            start = 2
+        end = min(start + VERIFY_BLOCK - 1, last_row)
+
+        print(f"🔎 Verifying rows {start}–{end}...")
+        rows = self.sheet.get_values(f"A{start}:ZZ{end}")
+        rows += [[]] * (end - start + 1 - len(rows))   # Trailing deleted rows come back missing
+
+        stored = dict(self.conn.execute(
+            "SELECT row_number, checksum FROM production WHERE row_number BETWEEN ? AND ?", (start, end)))
+        changed = [(start + i, values) for i, values in enumerate(rows)
+                   if stored.get(start + i) != (row_checksum(_trim(values)) if any(v.strip() for v in values) else None)]
+
+        if len(changed) > RESYNC_RATIO * (end - start + 1):
+            print(f"⚠️  {len(changed)} rows differ — rows were inserted or deleted, reloading")
+            return False
+
+        mapping = self._mapping(json.loads(self._state('header', '[]')))
+        with self.conn:
+            for row_number, values in changed:
+                if any(v.strip() for v in values):
+                    self._upsert(row_number, [values], mapping)
+                else:
+                    self.conn.execute("DELETE FROM production WHERE row_number = ?", (row_number,))
+            self._set_state(verify_cursor=end + 1)
+        print(f"✅ Verified {end - start + 1} rows ({len(changed)} updated)")
+        return True
+
+    def sync(self, full=False, verify=False):
+        start = time.time()
+        sync_count = int(self._state('sync_count', 0)) + 1
+
+        if full:
+            self.full_sync()
+        else:
+            self.incremental_sync()
+            if verify or sync_count % VERIFY_EVERY == 0:
+                if not self.verify_block():
+                    self.full_sync()
+
+        with self.conn:
+            self._set_state(sync_count=sync_count, last_sync=datetime.now().isoformat(timespec='seconds'))
+        print(f"⏱️  Sync finished in {time.time() - start:.1f}s")
+
+
+def open_sheet():
+    """Authorize with the service account and open the Production worksheet"""
+    try:
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+    except ImportError:
+        print("❌ Missing dependencies. Please run:")
+        print("   pip3 install gspread oauth2client")
+        sys.exit(1)
+
+    scope = ['https://spreadsheets.google.com/feeds',
+             'https://www.googleapis.com/auth/drive']
+    try:
+        creds = ServiceAccountCredentials.from_json_keyfile_name(CREDENTIALS_FILE, scope)
+    except FileNotFoundError:
+        print(f"❌ ERROR: Credentials file not found: {CREDENTIALS_FILE}")
+        sys.exit(1)
+    client = gspread.authorize(creds)
+    return client.open(SPREADSHEET_NAME).worksheet(WORKSHEET_NAME)
+
+
+def print_stats(conn):
+    total = conn.execute("SELECT COUNT(*) FROM production").fetchone()[0]
+    first, last = conn.execute("SELECT MIN(date), MAX(date) FROM production WHERE date LIKE '____-__-__'").fetchone()
+    state = dict(conn.execute("SELECT key, value FROM sync_state"))
+    print(f"\n📊 Production mirror: {total} rows ({first} → {last})")
+    print(f"   Last sync: {state.get('last_sync', 'never')} (sync #{state.get('sync_count', 0)}, "
+          f"last row {state.get('last_row', 0)})")
+    print("\n   Top regions:")
+    for region, count in conn.execute(
+            "SELECT region, COUNT(*) FROM production WHERE region IS NOT NULL "
+            "GROUP BY region ORDER BY COUNT(*) DESC LIMIT 5"):
+        print(f"   - {region}: {count}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mirror the Production worksheet into local SQLite')
+    parser.add_argument('command', choices=['sync', 'stats', 'query'])
+    parser.add_argument('sql', nargs='?', help='SQL for the query command')
+    parser.add_argument('--db', default=DB_FILE, help='SQLite database file')
+    parser.add_argument('--full', action='store_true', help='Reload the whole worksheet')
+    parser.add_argument('--verify', action='store_true', help='Run a checksum verification pass now')
+    parser.add_argument('--d1', metavar='FILE', help='sync: also update this D1 export file (see d1_export.py)')
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+
+    if args.command == 'sync':
+        mirror = SheetMirror(open_sheet(), conn)
+        mirror.sync(full=args.full, verify=args.verify)
+        print_stats(conn)
+        if args.d1:
+            import d1_export
+            d1_export.export_mirror(args.d1, args.db).close()
+    elif args.command == 'stats':
+        print_stats(conn)
+    elif args.command == 'query':
+        if not args.sql:
+            parser.error('query needs an SQL statement')
+        start = time.perf_counter()
+        cursor = conn.execute(args.sql)
+        columns = [d[0] for d in cursor.description or []]
+        rows = cursor.fetchall()
+        if columns:
+            print(' | '.join(columns))
+        for row in rows:
+            print(' | '.join('' if v is None else str(v) for v in row))
+        print(f"\n({len(rows)} rows in {(time.perf_counter() - start) * 1000:.1f}ms)")
+
+
+if __name__ == '__main__':
+    main()
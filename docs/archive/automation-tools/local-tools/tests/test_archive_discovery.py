@@ -0,0 +1,200 @@
+import gzip
+import importlib.util
+import os
+import re
+from datetime import datetime
+
+import pytest
+
+from archive_discovery import FEEDS, FeedDiscovery, iter_feed_entries
+from link_extractor import ARTICLE_PATTERNS
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# Feed URL → fixture file (child sitemap URLs are the ones the index fixtures point at)
+DOCUMENTS = {
+    'https://newsday.co.tt/sitemap_index.xml': 'newsday-sitemap-index.xml',
+    'https://newsday.co.tt/post-sitemap1.xml': 'newsday-post-sitemap.xml',
+    'https://newsday.co.tt/post-sitemap2.xml': 'newsday-post-sitemap.xml',
+    'https://newsday.co.tt/page-sitemap.xml': 'newsday-post-sitemap.xml',
+    'https://newsday.co.tt/feed/': 'newsday-feed.xml',
+    'https://trinidadexpress.com/tncms/sitemap/editorial.xml': 'express-sitemap-index.xml',
+    'https://trinidadexpress.com/tncms/sitemap/editorial.xml?year=2025&month=2': 'express-sitemap.xml',
+    'https://trinidadexpress.com/tncms/sitemap/editorial.xml?year=2025&month=3': 'express-sitemap.xml',
+    FEEDS['TRINIDAD_EXPRESS']['rss'][0]: 'express-rss.xml',
+    'https://www.guardian.co.tt/sitemap.xml': 'guardian-sitemap-index.xml',
+    'https://www.guardian.co.tt/sitemap/news-2025-03.xml': 'guardian-sitemap.xml',
+    'https://www.guardian.co.tt/sitemap/news-2024-12.xml': 'guardian-sitemap.xml',
+}
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def _chunks(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        return _chunks(self.body, chunk_size)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeFetch:
+    """fetch(url, stream=True) over the fixture files; overrides map url → FakeResponse"""
+
+    def __init__(self, overrides=None):
+        self.overrides = overrides or {}
+        self.fetched = []
+        self.responses = []
+
+    def __call__(self, url, stream=False):
+        self.fetched.append(url)
+        if url in self.overrides:
+            response = self.overrides[url]
+        elif url in DOCUMENTS:
+            response = FakeResponse(_fixture(DOCUMENTS[url]))
+        else:
+            response = FakeResponse(b'Not found', status_code=404)
+        self.responses.append(response)
+        return response
+
+
+def _discovery(source_key, fetch):
+    article_re = re.compile(ARTICLE_PATTERNS[source_key])
+    return FeedDiscovery(fetch, article_filter=lambda url: article_re.fullmatch(url) is not None, delay=0)
+
+
+# ---------------------------------------------------------------------------- iter_feed_entries
+
+@pytest.mark.parametrize('name, kinds, count', [
+    ('newsday-sitemap-index.xml', {'sitemap'}, 3),
+    ('newsday-post-sitemap.xml', {'url'}, 6),
+    ('newsday-feed.xml', {'url'}, 2),
+    ('express-sitemap-index.xml', {'sitemap'}, 2),
+    ('express-sitemap.xml', {'url'}, 4),
+    ('express-rss.xml', {'url'}, 2),
+    ('guardian-sitemap-index.xml', {'sitemap'}, 2),
+    ('guardian-sitemap.xml', {'url'}, 4),
+])
+def test_iter_feed_entries_fixtures(name, kinds, count):
+    entries = list(iter_feed_entries(_chunks(_fixture(name), 65536)))
+    assert len(entries) == count
+    assert {kind for kind, _, _ in entries} == kinds
+    assert all(url.startswith('https://') and date is not None for _, url, date in entries)
+
+
+@pytest.mark.parametrize('name', ['newsday-post-sitemap.xml', 'express-sitemap.xml', 'newsday-feed.xml'])
+def test_iter_feed_entries_chunk_size_does_not_matter(name):
+    data = _fixture(name)
+    assert list(iter_feed_entries(_chunks(data, 7))) == list(iter_feed_entries([data]))
+
+
+def test_dates_prefer_publication_date_and_parse_rfc822():
+    express = {url: date for _, url, date in iter_feed_entries([_fixture('express-sitemap.xml')])}
+    soldiers = [date for url, date in express.items() if 'soldiers' in url][0]
+    # news:publication_date wins over the later lastmod; timezone dropped
+    assert soldiers == datetime(2025, 3, 2, 19, 30)
+
+    rss = list(iter_feed_entries([_fixture('newsday-feed.xml')]))
+    assert rss[0][2] == datetime(2025, 3, 25, 18, 2, 11)
+
+
+# ---------------------------------------------------------------------------- FeedDiscovery.discover
+
+def test_discover_filters_by_lastmod_and_skips_old_sitemaps():
+    fetch = FakeFetch()
+    found = _discovery('NEWSDAY', fetch).discover(
+        {'sitemaps': FEEDS['NEWSDAY']['sitemaps'], 'rss': []},
+        datetime(2025, 3, 15), datetime(2025, 3, 21))
+
+    # post-sitemap1 (2024) and page-sitemap (Feb) stopped changing before the range
+    assert fetch.fetched == ['https://newsday.co.tt/sitemap_index.xml',
+                             'https://newsday.co.tt/post-sitemap2.xml']
+    assert sorted(found) == [
+        'https://newsday.co.tt/2025/03/15/chefs-boat-stolen-in-carenage-kiss-salesmen-robbed/',
+        'https://newsday.co.tt/2025/03/16/freeport-woman-kidnapped-3-5m-demanded/',
+        'https://newsday.co.tt/2025/03/21/man-hunt-for-suspected-bandit-at-carlton-centre/',
+    ]
+    assert all(response.closed for response in fetch.responses)
+
+
+def test_discover_merges_sitemaps_and_rss_and_drops_non_articles():
+    batches = []
+    fetch = FakeFetch()
+    found = _discovery('TRINIDAD_EXPRESS', fetch).discover(
+        FEEDS['TRINIDAD_EXPRESS'], datetime(2025, 3, 1), datetime(2025, 3, 31), on_batch=batches.append)
+
+    assert len(found) == 4
+    assert 'https://trinidadexpress.com/news/local/' not in found
+    # Each URL is reported once, in the batch of the first document that had it
+    assert sum(len(batch) for batch in batches) == len(found)
+
+
+def test_discover_guardian_sitemap_index():
+    fetch = FakeFetch()
+    found = _discovery('GUARDIAN', fetch).discover(
+        FEEDS['GUARDIAN'], datetime(2025, 3, 1), datetime(2025, 3, 31))
+
+    assert 'https://www.guardian.co.tt/sitemap/news-2024-12.xml' not in fetch.fetched
+    assert len(found) == 3
+    assert 'https://www.guardian.co.tt/news/local' not in found
+
+
+def test_discover_reads_gzipped_sitemaps():
+    url = 'https://newsday.co.tt/post-sitemap2.xml.gz'
+    fetch = FakeFetch({url: FakeResponse(gzip.compress(_fixture('newsday-post-sitemap.xml')))})
+    found = _discovery('NEWSDAY', fetch).discover({'sitemaps': [url]}, datetime(2025, 3, 1), datetime(2025, 3, 31))
+    assert len(found) == 5
+
+
+@pytest.mark.parametrize('response', [
+    FakeResponse(b'<!DOCTYPE html><html><body><h1>Oops</h1></body></html>'),   # 200, no entries
+    FakeResponse(b'<urlset><url><loc>https://newsday.co.tt/2025/03/1'),         # ParseError
+    FakeResponse(b'<?xml version="1.0"?><urlset></urlset>'),                    # valid but empty
+    FakeResponse(b'Service Unavailable', status_code=503),
+], ids=['html-page', 'parse-error', 'empty-urlset', '503'])
+def test_discover_returns_none_so_caller_falls_back_to_html(response):
+    url = FEEDS['NEWSDAY']['sitemaps'][0]
+    fetch = FakeFetch({url: response})
+    found = _discovery('NEWSDAY', fetch).discover({'sitemaps': [url]}, datetime(2025, 3, 1), datetime(2025, 3, 31))
+    assert found is None
+    assert response.closed
+
+
+def test_discover_keeps_entries_read_before_a_dropped_connection():
+    class Dropped(FakeResponse):
+        def iter_content(self, chunk_size=1):
+            data = self.body
+            yield data[:data.index(b'2025/03/21')]
+            raise ConnectionError('Connection reset by peer')
+
+    url = 'https://newsday.co.tt/post-sitemap2.xml'
+    response = Dropped(_fixture('newsday-post-sitemap.xml'))
+    found = _discovery('NEWSDAY', FakeFetch({url: response})).discover(
+        {'sitemaps': [url]}, datetime(2025, 3, 1), datetime(2025, 3, 31))
+    assert len(found) == 3
+    assert response.closed
+
+
+def test_scraper_falls_back_to_html_when_feeds_are_unreadable():
+    for module in ('requests', 'bs4', 'pandas'):
+        pytest.importorskip(module)
+    path = os.path.join(os.path.dirname(FIXTURES), '..', 'archive-scraper.py')
+    spec = importlib.util.spec_from_file_location('archive_scraper', path)
+    archive_scraper = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(archive_scraper)
+
+    scraper = archive_scraper.ArchiveScraper(delay=0)
+    scraper._get = lambda url, stream=False, **kwargs: FakeResponse(b'<html></html>')
+    assert scraper.discover_from_feeds('NEWSDAY', datetime(2025, 3, 1), datetime(2025, 3, 31)) is None
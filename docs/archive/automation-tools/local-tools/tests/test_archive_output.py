@@ -0,0 +1,55 @@
+import csv
+
+from archive_output import OUTPUT_COLUMNS, CSVResultWriter
+
+
+def _rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_resume_skips_saved_urls(tmp_path):
+    path = str(tmp_path / 'review.csv')
+    with CSVResultWriter(path) as writer:
+        writer.write('https://newsday.co.tt/2026/01/02/one/')
+
+    with CSVResultWriter(path) as writer:
+        assert not writer.write('https://newsday.co.tt/2026/01/02/one/')
+        assert writer.write('https://newsday.co.tt/2026/01/03/two/')
+
+    assert [r['URL'] for r in _rows(path)] == ['https://newsday.co.tt/2026/01/02/one/',
+                                               'https://newsday.co.tt/2026/01/03/two/']
+
+
+def test_resume_drops_torn_last_row(tmp_path):
+    path = str(tmp_path / 'review.csv')
+    with CSVResultWriter(path) as writer:
+        writer.write('https://newsday.co.tt/2026/01/02/one/')
+        writer.write('https://newsday.co.tt/2026/01/03/two/')
+
+    # Hard kill in the middle of writing the second row
+    with open(path, 'rb') as f:
+        data = f.read()
+    torn = data[:data.index(b'/2026/01/03/') + 8]
+    with open(path, 'wb') as f:
+        f.write(torn)
+
+    with CSVResultWriter(path) as writer:
+        assert 'https://newsday.co.tt/2026/01' not in writer.seen
+        assert writer.seen == {'https://newsday.co.tt/2026/01/02/one/'}
+        assert writer.write('https://newsday.co.tt/2026/01/03/two/')
+
+    rows = _rows(path)
+    assert [r['URL'] for r in rows] == ['https://newsday.co.tt/2026/01/02/one/',
+                                        'https://newsday.co.tt/2026/01/03/two/']
+    assert all(len(r) == len(OUTPUT_COLUMNS) for r in rows)
+
+
+def test_torn_header_starts_a_fresh_file(tmp_path):
+    path = tmp_path / 'review.csv'
+    path.write_bytes(b'URL,Sour')
+
+    with CSVResultWriter(str(path)) as writer:
+        writer.write('https://newsday.co.tt/2026/01/02/one/')
+
+    assert [r['URL'] for r in _rows(str(path))] == ['https://newsday.co.tt/2026/01/02/one/']
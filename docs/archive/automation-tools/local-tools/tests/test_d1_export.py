@@ -0,0 +1,116 @@
+import glob
+import os
+import sqlite3
+
+import pytest
+
+import sheet_mirror
+from d1_export import SCHEMA, D1Export
+from sheet_mirror import SheetMirror
+
+HEADER = ['Date', 'Headline', 'primaryCrimeType', 'Area', 'Region', 'URL', 'Summary', 'story_id']
+YEAR = 2025
+
+
+def _row(i, summary='Police are investigating.'):
+    return [f"3/{i}/2025", f"Man robbed in Arima {i}", 'Robbery', 'Arima', 'Arima',
+            f"https://example.com/{i}", summary, str(i)]
+
+
+class _Sheet:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_all_values(self):
+        return [HEADER] + [list(r) for r in self.rows]
+
+
+@pytest.fixture
+def mirror(tmp_path):
+    conn = sheet_mirror.connect(str(tmp_path / 'mirror.db'))
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def export(tmp_path):
+    export = D1Export(str(tmp_path / 'crimes_d1.db'))
+    yield export
+    export.close()
+
+
+def _load(mirror, export, rows):
+    SheetMirror(_Sheet(rows), mirror).full_sync()
+    return export.sync_from_mirror(mirror, year=YEAR)
+
+
+def _sql(paths):
+    text = ''
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            text += f.read()
+    return text
+
+
+def test_unchanged_rows_produce_no_sql(mirror, export, tmp_path):
+    out = str(tmp_path / 'batches')
+    rows = [_row(i) for i in range(1, 6)]
+    assert _load(mirror, export, rows)['inserted'] == 5
+    assert _sql(export.write_batches(out, rows_per_file=2)).count('INSERT OR REPLACE INTO crimes (') == 5
+
+    assert _load(mirror, export, rows)['unchanged'] == 5
+    assert export.write_batches(out) == []
+
+    rows[2] = _row(3, summary='Two suspects were arrested.')
+    counts = _load(mirror, export, rows)
+    assert (counts['updated'], counts['unchanged']) == (1, 4)
+    sql = _sql(export.write_batches(out))
+    assert "'2025-3'" in sql and "'2025-1'" not in sql
+    assert sorted(os.listdir(out)) == ['batch_0001.sql', 'batch_0002.sql', 'batch_0003.sql', 'batch_0004.sql']
+
+
+def test_provisional_rows_never_reach_batch_files(mirror, export, tmp_path):
+    out = str(tmp_path / 'batches')
+    story_id = export.add_extracted({'date': '2025-03-09', 'headline': 'Bar robbed in Arima',
+                                     'crimeType': 'Robbery', 'area': 'Arima'}, url='https://example.com/9')
+    assert story_id.startswith('2025-x')
+    assert export.write_batches(out) == []
+
+    # The sheet catches up: same URL under its real story_id replaces the provisional row
+    counts = _load(mirror, export, [_row(i) for i in range(1, 10)])
+    assert counts['replaced'] == 1
+    sql = _sql(export.write_batches(out))
+    assert '-x' not in sql
+    assert "'2025-9'" in sql
+    assert export.stats()['provisional'] == 0
+
+
+def test_batches_keep_remote_fts_keyed_by_crimes_rowid(mirror, export, tmp_path):
+    out = str(tmp_path / 'batches')
+    remote = sqlite3.connect(':memory:')
+    remote.executescript(SCHEMA)
+
+    def apply(paths):
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                remote.executescript(f.read())
+
+    rows = [_row(i) for i in range(1, 6)]
+    _load(mirror, export, rows)
+    apply(export.write_batches(out))
+
+    rows[1] = _row(2, summary='Gunmen escaped in a silver Tiida.')
+    del rows[3]                                     # story 4 removed from the sheet
+    _load(mirror, export, rows)
+    paths = export.write_batches(out)
+    sql = _sql(paths)
+    assert 'DELETE FROM crimes_fts WHERE story_id' not in sql
+    assert sql.count('DELETE FROM crimes_fts WHERE rowid = (SELECT rowid FROM crimes') == 2
+    apply(paths)
+
+    pairs = remote.execute("SELECT c.story_id, f.story_id FROM crimes c "
+                           "LEFT JOIN crimes_fts f ON f.rowid = c.rowid ORDER BY c.story_id").fetchall()
+    assert pairs == [(f"2025-{i}", f"2025-{i}") for i in (1, 2, 3, 5)]
+    assert remote.execute("SELECT COUNT(*) FROM crimes_fts").fetchone()[0] == 4
+    assert remote.execute("SELECT story_id FROM crimes_fts WHERE crimes_fts MATCH 'tiida'").fetchall() == [('2025-2',)]
+    assert len(glob.glob(os.path.join(out, 'batch_*.sql'))) == 2
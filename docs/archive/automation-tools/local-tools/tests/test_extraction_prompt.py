@@ -0,0 +1,37 @@
+import pytest
+
+from extraction_prompt import PLATE_RE, classify_post, selected_blocks
+
+
+@pytest.mark.parametrize('text, plates', [
+    ('A silver Nissan, PCD 4512, was stolen', ['PCD 4512']),
+    ('taxi TCJ1234 and hired car HBX 77', ['TCJ1234', 'HBX 77']),
+    ('rental RAA 909 found burnt', ['RAA 909']),
+    ('PC 1234 Charles responded', []),
+    ('PC1234 and WPC 5678 arrested the suspect', []),
+    ('W/PC 4321 took a report', []),
+    ('PC 1234 saw PBQ 3366 leave', ['PBQ 3366']),
+    ('Police seized 3 guns', []),
+])
+def test_plate_pattern(text, plates):
+    assert [m.group() for m in PLATE_RE.finditer(text)] == plates
+
+
+@pytest.mark.parametrize('post, blocks', [
+    ('Toyota Aqua PDZ 6479 stolen from Belmont last night',
+     ['vehicle', 'relative-date', 'summary-short']),
+    ('A white Nissan Tiida was stolen in Curepe on December 8',
+     ['vehicle', 'text-date', 'summary-short']),
+    ('PC 1234 Charles and WPC 5678 Baptiste responded to a robbery at a bar in Arima on 6/12',
+     ['unnamed-victim', 'numeric-date', 'summary-short']),
+    ('Man shot dead in Laventille, identified as Kevin Charles',
+     ['named-victim', 'summary-short']),
+    ('Rondel Mills, 19, was shot while liming on Friday. Police found PBA 123 abandoned nearby.',
+     ['vehicle', 'named-victim', 'relative-date', 'summary-short']),
+    ('Bandits robbed a mini mart. ' * 10,
+     ['unnamed-victim', 'summary-medium']),
+    ('Shooting in Morvant. ' * 30,
+     ['unnamed-victim', 'summary-detailed']),
+])
+def test_selected_blocks(post, blocks):
+    assert selected_blocks(classify_post(post)) == blocks
@@ -0,0 +1,115 @@
+import http.client
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+import extractor_daemon
+from extractor_daemon import ExtractorDaemon, load_token, make_servers, request
+
+
+class FakeIncidents:
+    def save(self):
+        pass
+
+
+class FakeExtractor:
+    def __init__(self):
+        self.incidents = FakeIncidents()
+        self.posts = []
+
+    def process_post(self, post):
+        self.posts.append(post)
+        return {'status': 'written', 'headline': post[:20], 'seconds': 0}
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    token_file = str(tmp_path / 'token')
+    extractor = FakeExtractor()
+    daemon = ExtractorDaemon(extractor)
+    worker = threading.Thread(target=daemon._worker, daemon=True)
+    worker.start()
+    server, = make_servers(daemon, load_token(token_file, create=True), port=0)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    daemon.port = server.server_address[1]
+    daemon.token_file = token_file
+    yield daemon
+    server.shutdown()
+    server.server_close()
+    daemon.jobs.put(extractor_daemon._STOP)
+    worker.join()
+
+
+def _raw(daemon, method='POST', path='/submit', body=b'{"posts": ["x"]}', headers=None, token=True):
+    conn = http.client.HTTPConnection('127.0.0.1', daemon.port, timeout=10)
+    headers = {'Content-Type': 'application/json', **(headers or {})}
+    if token:
+        headers.setdefault(extractor_daemon.TOKEN_HEADER, load_token(daemon.token_file))
+    try:
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b'{}')
+    finally:
+        conn.close()
+
+
+def test_token_file_is_private_and_stable(tmp_path):
+    path = str(tmp_path / 'token')
+    token = load_token(path, create=True)
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert load_token(path, create=True) == load_token(path) == token
+
+
+def test_client_submits_with_token(daemon):
+    batch = request('POST', '/submit', {'posts': 'first post\n\nsecond post'},
+                    port=daemon.port, token_file=daemon.token_file)
+    assert [r['status'] for r in batch['results']] == ['written', 'written']
+    assert daemon.extractor.posts == ['first post', 'second post']
+    stats = request('GET', '/stats', port=daemon.port, token_file=daemon.token_file)
+    assert stats['totals']['written'] == 2
+
+
+@pytest.mark.parametrize('headers, token, status', [
+    ({}, False, 401),
+    ({extractor_daemon.TOKEN_HEADER: 'wrong'}, True, 401),
+    ({'Host': 'attacker.example:8765'}, True, 403),
+    ({'Host': '127.0.0.1'}, True, 403),
+    ({'Content-Type': 'text/plain'}, True, 415),
+    ({'Content-Type': 'application/x-www-form-urlencoded'}, True, 415),
+], ids=['no-token', 'wrong-token', 'foreign-host', 'host-without-port', 'text-plain', 'form'])
+def test_rejected_requests_queue_nothing(daemon, headers, token, status):
+    assert _raw(daemon, headers=headers, token=token)[0] == status
+    assert daemon.extractor.posts == []
+    assert daemon.batches == {}
+
+
+def test_stats_require_token(daemon):
+    assert _raw(daemon, 'GET', '/stats', body=None, token=False)[0] == 401
+    assert _raw(daemon, 'GET', '/stats', body=None, headers={'Host': f"localhost:{daemon.port}"})[0] == 200
+
+
+@pytest.mark.parametrize('body', [b'[]', b'"x"', b'1', b'null', b'{"posts": 5}', b'{"posts": []}', b'not json'])
+def test_bad_payloads_are_400(daemon, body):
+    assert _raw(daemon, body=body)[0] == 400
+
+
+def test_non_numeric_content_length_is_400(daemon):
+    conn = http.client.HTTPConnection('127.0.0.1', daemon.port, timeout=10)
+    try:
+        conn.putrequest('POST', '/submit')
+        conn.putheader('Content-Type', 'application/json')
+        conn.putheader('Content-Length', 'lots')
+        conn.putheader(extractor_daemon.TOKEN_HEADER, load_token(daemon.token_file))
+        conn.endheaders()
+        assert conn.getresponse().status == 400
+    finally:
+        conn.close()
+
+
+def test_charset_parameter_is_accepted(daemon):
+    status, batch = _raw(daemon, body=b'{"posts": ["one"], "wait": false}',
+                         headers={'Content-Type': 'application/json; charset=utf-8'})
+    assert status == 202 and batch['posts'] == 1
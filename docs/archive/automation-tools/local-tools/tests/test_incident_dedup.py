@@ -0,0 +1,154 @@
+from datetime import date, timedelta
+
+import pytest
+
+from incident_dedup import RETENTION_DAYS, IncidentIndex, fingerprint, key_relation
+
+ARTICLE = ("Police are searching for the gunmen who shot dead a man identified as Kevin Charles on Lady Young "
+           "Road in Morvant last night. Residents heard several gunshots shortly after nine and found the victim "
+           "slumped beside his car. Officers from the Northern Division and Homicide Bureau Region Two responded "
+           "and processed the scene. A silver Nissan Tiida, registration PCD 4512, was seen speeding away towards "
+           "the Beetham Highway. Anyone with information is asked to call 555 or 800-TIPS.")
+POST = ("Man shot dead on Lady Young Road in Morvant last night, police said vehicle plate PCD 4512 "
+        "was seen leaving the scene")
+DAY = date(2025, 3, 10)
+
+
+def _index(text=ARTICLE, day=DAY, **fields):
+    index = IncidentIndex(window_days=3)
+    incident_id = index.add(fingerprint(text), url='https://example.com/original', incident_date=day,
+                            headline='Man shot dead in Morvant', when=day, **fields)
+    return index, index.incidents[incident_id]
+
+
+def _best(index, text, **kwargs):
+    matches = index.find_duplicates(fingerprint(text), **kwargs)
+    return matches[0] if matches else (None, 0.0)
+
+
+# ---------------------------------------------------------------------------- key tokens
+
+@pytest.mark.parametrize('changed', [
+    ARTICLE.replace('PCD 4512', 'PCD 4513'),         # different plate
+    ARTICLE.replace('Kevin Charles', 'Kevin Baptiste'),  # different victim
+], ids=['plate', 'name'])
+def test_key_conflict_outweighs_high_similarity(changed):
+    index, original = _index()
+    incident, similarity = _best(index, changed, when=DAY)
+    assert incident is original and similarity >= 0.9
+    assert key_relation(fingerprint(changed)['keys'], original['keys']) == 'conflict'
+
+
+def test_shared_plate_is_a_match_and_missing_keys_are_unknown():
+    assert key_relation(fingerprint(POST)['keys'], fingerprint(ARTICLE)['keys']) == 'match'
+    assert key_relation(fingerprint('Man shot in Morvant')['keys'], fingerprint(ARTICLE)['keys']) == 'unknown'
+
+
+# ---------------------------------------------------------------------------- day window
+
+@pytest.mark.parametrize('offset, found', [(0, True), (3, True), (-3, True), (4, False), (-30, False)])
+def test_reported_date_window(offset, found):
+    index, original = _index()
+    incident, _ = _best(index, ARTICLE, when=DAY + timedelta(days=offset))
+    assert (incident is original) is found
+
+
+def test_incident_date_is_compared_before_reported_date():
+    index, original = _index()
+    # Article published weeks later about the same incident date
+    assert _best(index, ARTICLE, when=DAY + timedelta(days=40), incident_date=DAY)[0] is original
+    # Published the same day, but the extracted incident date is a week apart
+    assert _best(index, ARTICLE, when=DAY, incident_date=DAY + timedelta(days=7))[0] is None
+
+
+def test_no_dates_means_no_candidates():
+    index, _ = _index()
+    assert index.find_duplicates(fingerprint(ARTICLE)) == []
+
+
+def test_same_type_and_area_is_a_candidate_without_shared_wording():
+    index, original = _index(crime_type='Murder', area='Morvant')
+    rewrite = 'Homicide detectives probing killing of Charles, 34, outside his home.'
+    assert _best(index, rewrite, when=DAY)[0] is None
+    assert _best(index, rewrite, when=DAY, incident_date=DAY, crime_type='Murder', area='morvant ')[0] is original
+
+
+# ---------------------------------------------------------------------------- retention
+
+def test_prune_drops_incidents_older_than_retention():
+    index = IncidentIndex()
+    today = date(2026, 3, 10)
+    old = index.add(fingerprint(ARTICLE), incident_date=today - timedelta(days=RETENTION_DAYS + 1),
+                    crime_type='Murder', area='Morvant')
+    kept = index.add(fingerprint(POST), incident_date=today - timedelta(days=RETENTION_DAYS))
+    reseen = index.add(fingerprint('Bandits rob Arima bar'), incident_date=today - timedelta(days=400))
+    index.merge(reseen, 'https://example.com/follow-up', when=today - timedelta(days=10))
+
+    assert index.prune(today) == 1
+    assert set(index.incidents) == {kept, reseen}
+    assert old not in index.candidates(fingerprint(ARTICLE), 'Murder', 'Morvant')
+    assert not index._by_place
+
+
+def test_save_prunes_and_load_restores(tmp_path):
+    path = str(tmp_path / 'incident_index.json')
+    index = IncidentIndex(path)
+    index.add(fingerprint(ARTICLE), url='https://example.com/a', incident_date=DAY)
+    index.add(fingerprint(POST), incident_date=DAY - timedelta(days=RETENTION_DAYS + 30))
+    index.save(today=DAY)
+
+    loaded = IncidentIndex.load(path)
+    assert [inc['urls'] for inc in loaded.incidents.values()] == [['https://example.com/a']]
+    assert _best(loaded, ARTICLE, when=DAY)[1] == 1.0
+
+
+# ---------------------------------------------------------------------------- extractor merge rules
+
+@pytest.fixture
+def extractor():
+    for module in ('ollama', 'gspread', 'oauth2client'):
+        pytest.importorskip(module)
+    import fb_crime_extractor
+
+    extractor = fb_crime_extractor.FBCrimeExtractor.__new__(fb_crime_extractor.FBCrimeExtractor)
+    extractor.incidents = IncidentIndex(window_days=fb_crime_extractor.DEDUP_WINDOW_DAYS)
+    return extractor
+
+
+def _remember(extractor, text, **crime_data):
+    fp = fingerprint(text)
+    crime_data = {'date': '2025-03-10', 'headline': 'Man shot dead in Morvant', **crime_data}
+    extractor.remember_incident(fp, crime_data, 'https://example.com/original', when=DAY)
+
+
+@pytest.mark.parametrize('changed', [
+    ARTICLE.replace('PCD 4512', 'PCD 4513'),
+    ARTICLE.replace('Kevin Charles', 'Kevin Baptiste'),
+], ids=['plate', 'name'])
+def test_check_duplicate_never_merges_a_key_conflict(extractor, changed):
+    _remember(extractor, ARTICLE)
+    _, merged = extractor.check_duplicate(changed, 'https://example.com/repost', when=DAY)
+    assert merged is None
+
+
+def test_check_duplicate_merges_reworded_long_post(extractor):
+    _remember(extractor, ARTICLE)
+    reworded = ARTICLE.replace('Residents heard several gunshots shortly after nine',
+                               'Neighbours heard shots around nine')
+    _, merged = extractor.check_duplicate(reworded, 'https://example.com/repost', when=DAY)
+    assert merged is not None
+    assert merged['urls'] == ['https://example.com/original', 'https://example.com/repost']
+
+
+def test_short_posts_need_the_stricter_threshold(extractor):
+    import fb_crime_extractor
+
+    _remember(extractor, POST)
+    reworded = POST.replace('Man shot dead', 'Man killed')
+    fp = fingerprint(reworded)
+    similarity = extractor.incidents.find_duplicates(fp, when=DAY)[0][1]
+    assert fp['words'] < fb_crime_extractor.DEDUP_SHORT_TEXT_WORDS
+    assert fb_crime_extractor.DEDUP_MERGE_THRESHOLD <= similarity < fb_crime_extractor.DEDUP_SHORT_MERGE_THRESHOLD
+
+    assert extractor.check_duplicate(reworded, 'https://example.com/repost', when=DAY)[1] is None
+    assert extractor.check_duplicate(POST + ' Share.', 'https://example.com/share', when=DAY)[1] is not None
@@ -0,0 +1,129 @@
+import re
+
+import pytest
+
+import sheet_mirror
+from sheet_mirror import SheetMirror
+
+HEADER = ['Date', 'Headline', 'primaryCrimeType', 'victimCount', 'Area', 'Region', 'URL', 'Summary', 'story_id']
+
+
+def _row(i):
+    return [f"3/{i % 28 + 1}/2025", f"Headline {i}", 'Robbery', '1', 'Arima', 'Arima',
+            f"https://example.com/{i}", f"Summary {i}", str(i)]
+
+
+class FakeWorksheet:
+    """The three gspread Worksheet reads SheetMirror uses, over an in-memory grid"""
+
+    def __init__(self, rows):
+        self.rows = [list(r) for r in rows]
+        self.calls = []
+
+    def row_values(self, row):
+        self.calls.append(('row_values', row))
+        return list(self.rows[row - 1]) if row <= len(self.rows) else []
+
+    def get_values(self, range_name):
+        self.calls.append(('get_values', range_name))
+        start, end = re.fullmatch(r'A(\d+):ZZ(\d*)', range_name).groups()
+        values = [list(r) for r in self.rows[int(start) - 1:int(end) if end else None]]
+        while values and not any(values[-1]):   # Sheets omits trailing empty rows
+            values.pop()
+        return values
+
+    def get_all_values(self):
+        self.calls.append(('get_all_values',))
+        return [list(r) for r in self.rows]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sheet_mirror.connect(str(tmp_path / 'mirror.db'))
+    yield conn
+    conn.close()
+
+
+def _mirror(conn, n=20):
+    sheet = FakeWorksheet([HEADER] + [_row(i) for i in range(1, n + 1)])
+    mirror = SheetMirror(sheet, conn)
+    mirror.sync()
+    sheet.calls.clear()
+    return sheet, mirror
+
+
+def _headlines(conn):
+    return dict(conn.execute("SELECT row_number, headline FROM production"))
+
+
+def test_first_sync_is_a_full_load(conn):
+    sheet = FakeWorksheet([HEADER, _row(1), _row(2)])
+    SheetMirror(sheet, conn).sync()
+    assert sheet.calls == [('row_values', 1), ('get_all_values',)]
+    assert _headlines(conn) == {2: 'Headline 1', 3: 'Headline 2'}
+    assert tuple(conn.execute("SELECT date, victim_count FROM production WHERE row_number = 2").fetchone()) == \
+        ('2025-03-02', 1)
+
+
+def test_appended_rows_are_fetched_from_the_last_synced_row(conn):
+    sheet, mirror = _mirror(conn, n=20)
+    sheet.rows += [_row(21), _row(22)]
+
+    assert mirror.incremental_sync() == 2
+    assert sheet.calls == [('row_values', 1), ('get_values', 'A22:ZZ')]
+    assert _headlines(conn)[23] == 'Headline 22'
+
+    sheet.calls.clear()
+    assert mirror.incremental_sync() == 0
+    assert sheet.calls == [('row_values', 1), ('get_values', 'A24:ZZ')]
+
+
+def test_header_change_forces_a_full_reload(conn):
+    sheet, mirror = _mirror(conn, n=5)
+    sheet.rows[0] = HEADER + ['Date_Published']
+    for i, row in enumerate(sheet.rows[1:], 1):
+        row.append(f"2025-03-{i:02d}")
+
+    mirror.incremental_sync()
+    assert ('get_all_values',) in sheet.calls
+    assert not any(call[0] == 'get_values' for call in sheet.calls)
+    assert conn.execute("SELECT date_published FROM production WHERE row_number = 3").fetchone()[0] == '2025-03-02'
+
+
+def test_edited_row_in_verified_block_is_resynced(conn, monkeypatch):
+    monkeypatch.setattr(sheet_mirror, 'VERIFY_BLOCK', 10)
+    sheet, mirror = _mirror(conn, n=20)
+    sheet.rows[4][1] = 'Headline 4 (updated)'   # worksheet row 5
+
+    mirror.sync(verify=True)
+    assert sheet.calls == [('row_values', 1), ('get_values', 'A22:ZZ'), ('get_values', 'A2:ZZ11')]
+    assert _headlines(conn)[5] == 'Headline 4 (updated)'
+
+    # Next pass moves on to the following block; an edit behind the cursor waits its turn
+    sheet.rows[2][1] = 'Headline 2 (updated)'
+    sheet.calls.clear()
+    mirror.sync(verify=True)
+    assert sheet.calls[-1] == ('get_values', 'A12:ZZ21')
+    assert _headlines(conn)[3] == 'Headline 2'
+
+
+def test_cleared_row_in_verified_block_is_deleted(conn, monkeypatch):
+    monkeypatch.setattr(sheet_mirror, 'VERIFY_BLOCK', 10)
+    sheet, mirror = _mirror(conn, n=20)
+    sheet.rows[6] = [''] * len(HEADER)   # worksheet row 7
+
+    assert mirror.verify_block()
+    assert 7 not in _headlines(conn)
+    assert len(_headlines(conn)) == 19
+
+
+def test_shifted_rows_in_verified_block_force_a_full_reload(conn, monkeypatch):
+    monkeypatch.setattr(sheet_mirror, 'VERIFY_BLOCK', 10)
+    sheet, mirror = _mirror(conn, n=20)
+    del sheet.rows[2]                      # a row deleted mid-sheet shifts everything below
+
+    mirror.sync(verify=True)
+    assert sheet.calls[-1] == ('get_all_values',)
+    headlines = _headlines(conn)
+    assert len(headlines) == 19 and headlines[3] == 'Headline 3'
+    assert 'Headline 2' not in headlines.values()